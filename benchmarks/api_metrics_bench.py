@@ -0,0 +1,56 @@
+"""
+请求统计开销基准：对本地模拟服务器连续请求，比较不挂钩子与挂 APIMetrics 的耗时
+
+用法: python benchmarks/api_metrics_bench.py [--requests 2000]
+"""
+
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.core.api_metrics import APIMetrics, RequestSample  # noqa: E402
+from src.core.bilibili_api import BilibiliAPI  # noqa: E402
+from src.devtools.stub_server import StubServer  # noqa: E402
+
+
+def run_requests(api: BilibiliAPI, count: int) -> float:
+    start = time.perf_counter()
+    for _ in range(count):
+        api.get_room_id_and_csrf({"DedeUserID": "10001", "bili_jct": "x"})
+    return (time.perf_counter() - start) / count * 1e6
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--requests", type=int, default=2000)
+    args = parser.parse_args()
+
+    with StubServer() as server:
+        api = BilibiliAPI(base_url=server.base_url)
+        run_requests(api, 50)  # 预热连接
+
+        plain = run_requests(api, args.requests)
+        metrics = APIMetrics()
+        api.add_request_hook(metrics.record)
+        hooked = run_requests(api, args.requests)
+        api.close()
+
+    stats = metrics.snapshot()["room_id_by_uid"]
+
+    sample = RequestSample("room_id_by_uid", "GET", 200, 0, ttfb=0.01, total=0.012)
+    start = time.perf_counter()
+    for _ in range(100000):
+        metrics.record(sample)
+    record_us = (time.perf_counter() - start) / 100000 * 1e6
+
+    print(f"无钩子:          {plain:8.1f} us/请求")
+    print(f"APIMetrics:      {hooked:8.1f} us/请求  ({hooked - plain:+.1f} us)")
+    print(f"record() 单独:   {record_us:8.2f} us/次")
+    print(f"本地请求 P50 {stats['latency']['p50'] * 1000:.2f}ms, P95 {stats['latency']['p95'] * 1000:.2f}ms")
+
+
+if __name__ == "__main__":
+    main()
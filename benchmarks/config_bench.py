@@ -0,0 +1,73 @@
+"""
+配置写入基准：连续大量 set 时，每次立即保存与合并延迟写入的耗时和写盘次数
+
+用法: python benchmarks/config_bench.py [--sets 2000] [--fsync file]
+"""
+
+import argparse
+import os
+import sys
+import tempfile
+import time
+from unittest import mock
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.core import config_manager as config_module  # noqa: E402
+from src.core.config_manager import ConfigManager  # noqa: E402
+
+
+def run(label: str, sets: int, fsync: str, save_each: bool) -> None:
+    with tempfile.TemporaryDirectory() as tmp:
+        manager = ConfigManager(tmp, flush_delay=0.2, fsync=fsync)
+        writes = []
+        real_write = config_module.atomic_write
+
+        def counting_write(*args, **kwargs):
+            writes.append(args[0])
+            return real_write(*args, **kwargs)
+
+        with mock.patch.object(config_module, "atomic_write", counting_write):
+            start = time.perf_counter()
+            for i in range(sets):
+                manager.set("window_geometry", [i, i, 800, 600])
+                manager.set("last_title", f"标题{i}")
+                if save_each:
+                    manager.save_config()
+            set_ms = (time.perf_counter() - start) * 1000
+
+            # 等待后台合并写入完成
+            deadline = time.time() + 5
+            while manager.is_dirty() and time.time() < deadline:
+                time.sleep(0.01)
+            total_ms = (time.perf_counter() - start) * 1000
+        manager.close()
+
+    print(
+        f"  {label:<16} set耗时 {set_ms:9.1f} ms  "
+        f"落盘完成 {total_ms:9.1f} ms  写盘 {len(writes):5d} 次"
+    )
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="配置写入基准")
+    parser.add_argument("--sets", type=int, default=2000)
+    parser.add_argument(
+        "--fsync",
+        choices=[
+            config_module.FSYNC_NONE,
+            config_module.FSYNC_FILE,
+            config_module.FSYNC_FULL,
+        ],
+        default=config_module.FSYNC_FILE,
+    )
+    args = parser.parse_args()
+
+    print(f"连续 {args.sets * 2} 次 set（fsync={args.fsync}）:")
+    run("每次立即保存", args.sets, args.fsync, save_each=True)
+    run("合并延迟写入", args.sets, args.fsync, save_each=False)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,69 @@
+"""
+开播流程基准：原来的串行"更新标题→开始直播"与 GoLivePipeline 的耗时对比
+
+模拟服务器为每个请求加入固定延迟和随机抖动，两组都使用已建立的连接。
+
+用法: python benchmarks/go_live_bench.py [--rounds 30] [--latency 0.05] [--jitter 0.02]
+"""
+
+import argparse
+import os
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.core.bilibili_api import BilibiliAPI  # noqa: E402
+from src.core.credential import Credential  # noqa: E402
+from src.core.go_live import GoLivePipeline  # noqa: E402
+from src.devtools.stub_server import StubConfig, StubServer  # noqa: E402
+
+
+def sequential(api: BilibiliAPI, credential: Credential, room_id: int) -> float:
+    start = time.perf_counter()
+    api.update_live_title(room_id, "基准测试", credential.csrf, credential)
+    success, _ = api.start_live(room_id, credential.csrf, 86, credential)
+    assert success
+    return time.perf_counter() - start
+
+
+def pipelined(
+    pipeline: GoLivePipeline, credential: Credential, room_id: int
+) -> float:
+    result = pipeline.run(room_id, credential, 86, "基准测试")
+    assert result.success, result.to_dict()
+    return result.elapsed
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--rounds", type=int, default=30)
+    parser.add_argument("--latency", type=float, default=0.05)
+    parser.add_argument("--jitter", type=float, default=0.02)
+    args = parser.parse_args()
+
+    config = StubConfig(latency=args.latency, jitter=args.jitter, seed=1)
+    with StubServer(config=config) as server:
+        cookies, _ = server.state.new_session(10001)
+        credential = Credential(dict(cookies))
+        room_id = server.state.room(10001)["room_id"]
+        api = BilibiliAPI(base_url=server.base_url)
+        api.prewarm([server.base_url], connections=3)
+        pipeline = GoLivePipeline(api)
+
+        seq = [sequential(api, credential, room_id) for _ in range(args.rounds)]
+        pipe = [pipelined(pipeline, credential, room_id) for _ in range(args.rounds)]
+        pipeline.close()
+        api.close()
+
+    for name, samples in (("串行", seq), ("GoLivePipeline", pipe)):
+        print(
+            f"{name:>14}: 中位数 {statistics.median(samples) * 1000:6.1f} ms, "
+            f"P95 {sorted(samples)[int(len(samples) * 0.95) - 1] * 1000:6.1f} ms"
+        )
+    print(f"中位数降低 {(1 - statistics.median(pipe) / statistics.median(seq)) * 100:.0f}%")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,64 @@
+"""
+日志显示基准：逐条 QTextEdit.append + processEvents 与合并刷新的 LogView 对比
+
+用法: QT_QPA_PLATFORM=offscreen python benchmarks/log_view_bench.py [--messages 5000]
+"""
+
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from PySide6.QtWidgets import QApplication, QTextEdit  # noqa: E402
+
+from src.core.log_buffer import LogStore  # noqa: E402
+from src.ui.log_view import LogView  # noqa: E402
+
+
+def bench_legacy(app: QApplication, messages: int) -> float:
+    edit = QTextEdit()
+    edit.setReadOnly(True)
+    edit.show()
+    start = time.perf_counter()
+    for i in range(messages):
+        edit.append(f"直播分区列表已更新并保存到本地文件 {i}")
+        app.processEvents()
+    elapsed = time.perf_counter() - start
+    print(f"QTextEdit逐条刷新: {elapsed * 1000:8.1f} ms, 保留 {edit.document().blockCount()} 行")
+    edit.close()
+    return elapsed
+
+
+def bench_log_view(app: QApplication, messages: int, capacity: int) -> float:
+    view = LogView(LogStore(capacity))
+    view.show()
+    start = time.perf_counter()
+    for i in range(messages):
+        view.append(f"直播分区列表已更新并保存到本地文件 {i}")
+    view.flush()
+    app.processEvents()
+    elapsed = time.perf_counter() - start
+    print(
+        f"LogView合并刷新:   {elapsed * 1000:8.1f} ms, "
+        f"保留 {view.text_edit.blockCount()} 行（上限 {capacity}）"
+    )
+    view.close()
+    return elapsed
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--messages", type=int, default=5000)
+    parser.add_argument("--capacity", type=int, default=2000)
+    args = parser.parse_args()
+
+    app = QApplication.instance() or QApplication(sys.argv)
+    legacy = bench_legacy(app, args.messages)
+    batched = bench_log_view(app, args.messages, args.capacity)
+    print(f"加速 {legacy / batched:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,161 @@
+"""
+分区查找微基准：合成数万个分区，对比线性扫描、正则匹配和索引查找
+
+用法: python benchmarks/partition_bench.py [--themes 20] [--per-theme 2500]
+"""
+
+import argparse
+import os
+import random
+import re
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.core.partition_manager import PartitionManager  # noqa: E402
+
+# 合成分区名使用的汉字及其拼音
+CHAR_PINYIN = {
+    "王": "wang", "者": "zhe", "荣": "rong", "耀": "yao", "英": "ying",
+    "雄": "xiong", "联": "lian", "盟": "meng", "原": "yuan", "神": "shen",
+    "绝": "jue", "地": "di", "求": "qiu", "生": "sheng", "我": "wo",
+    "的": "de", "世": "shi", "界": "jie", "单": "dan", "机": "ji",
+    "游": "you", "戏": "xi", "唱": "chang", "见": "jian", "聊": "liao",
+    "天": "tian", "室": "shi", "户": "hu", "外": "wai", "美": "mei",
+    "食": "shi", "学": "xue", "习": "xi", "虚": "xu", "拟": "ni",
+    "主": "zhu", "播": "bo", "电": "dian", "台": "tai", "情": "qing",
+    "感": "gan", "舞": "wu", "蹈": "dao", "手": "shou", "工": "gong",
+    "绘": "hui", "画": "hua", "科": "ke", "技": "ji", "体": "ti",
+    "育": "yu", "赛": "sai", "事": "shi", "明": "ming", "日": "ri",
+    "方": "fang", "舟": "zhou", "崩": "beng", "坏": "huai", "星": "xing",
+}
+
+
+def make_synthetic_areas(themes: int, per_theme: int, seed: int = 0) -> dict:
+    """生成与 Area/getList 结构一致的合成分区数据"""
+    rng = random.Random(seed)
+    chars = list(CHAR_PINYIN)
+    data = []
+    next_id = 1
+    for theme_index in range(themes):
+        partitions = []
+        for _ in range(per_theme):
+            name = "".join(rng.choice(chars) for _ in range(rng.randint(2, 6)))
+            partitions.append(
+                {
+                    "id": str(next_id),
+                    "parent_id": str(theme_index + 1),
+                    "name": name,
+                    "pinyin": "".join(CHAR_PINYIN[c] for c in name),
+                    "pic": f"https://example.com/{next_id}.png",
+                    "hot_status": 0,
+                    "lock_status": "0",
+                }
+            )
+            next_id += 1
+        data.append(
+            {"id": theme_index + 1, "name": f"主题{theme_index}", "list": partitions}
+        )
+    return {"code": 0, "msg": "success", "data": data}
+
+
+def legacy_get_partition_by_name(partition_data, name, theme_name):
+    """旧实现：先线性查找主题，再逐个扫描分区"""
+    for theme in partition_data:
+        if theme.get("name") == theme_name:
+            for partition in theme.get("list", []):
+                if name in partition.get("name", "") and partition["name"] == name:
+                    return partition.get("id")
+    return None
+
+
+def legacy_search_partitions(partition_data, search_word, theme_name):
+    """旧实现：线性扫描主题内所有分区，逐个匹配汉字子串和拼音正则"""
+    pattern = None
+    if search_word.isalpha():
+        pattern = re.compile("".join(f"{c}.*" for c in search_word.lower()), re.I)
+    for theme in partition_data:
+        if theme.get("name") == theme_name:
+            return [
+                p
+                for p in theme.get("list", [])
+                if search_word in p["name"] or (pattern and pattern.match(p["pinyin"]))
+            ]
+    return []
+
+
+def bench(label: str, fn, queries) -> float:
+    start = time.perf_counter()
+    for query in queries:
+        fn(*query)
+    elapsed = (time.perf_counter() - start) / len(queries) * 1e6
+    print(f"  {label:<28} {elapsed:10.2f} us/次")
+    return elapsed
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="分区查找微基准")
+    parser.add_argument("--themes", type=int, default=20)
+    parser.add_argument("--per-theme", type=int, default=2500)
+    parser.add_argument("--queries", type=int, default=2000)
+    args = parser.parse_args()
+
+    areas = make_synthetic_areas(args.themes, args.per_theme)
+    with tempfile.TemporaryDirectory() as tmp:
+        manager = PartitionManager(os.path.join(tmp, "partition.json"))
+        start = time.perf_counter()
+        manager.update_partition_data(areas)
+        write_ms = (time.perf_counter() - start) * 1000
+        # 索引在首次查询时构建，单独计时
+        start = time.perf_counter()
+        manager.search_all("a", limit=1)
+        index_ms = (time.perf_counter() - start) * 1000
+        total = args.themes * args.per_theme
+        print(f"分区总数 {total}，写入 {write_ms:.1f} ms，建立索引 {index_ms:.1f} ms")
+
+        rng = random.Random(1)
+        records = [(p["name"], t["name"]) for t in areas["data"] for p in t["list"]]
+        lookups = [rng.choice(records) for _ in range(args.queries)]
+        substrings = [(name[:2], theme) for name, theme in lookups]
+
+        def legacy_lookup(name, theme):
+            return legacy_get_partition_by_name(areas["data"], name, theme)
+
+        def legacy_search(word, theme):
+            return legacy_search_partitions(areas["data"], word, theme)
+
+        print("名称 -> ID:")
+        legacy = bench("线性扫描", legacy_lookup, lookups)
+        indexed = bench("索引", manager.get_partition_by_name, lookups)
+        print(f"  加速比 {legacy / indexed:.0f}x")
+
+        print("主题内汉字子串搜索:")
+        legacy = bench("线性扫描", legacy_search, substrings)
+        indexed = bench("n-gram倒排索引", manager.search_partitions, substrings)
+        print(f"  加速比 {legacy / indexed:.1f}x")
+
+        # 拼音首字母查询，如 "王者荣耀" -> "wzr"
+        abbreviations = [
+            ("".join(CHAR_PINYIN[c][0] for c in name[:3]), theme)
+            for name, theme in lookups
+        ]
+        print("主题内拼音首字母搜索:")
+        legacy = bench("逐条正则匹配", legacy_search, abbreviations)
+        matched = bench("拼音匹配器（排序）", manager.search_partitions, abbreviations)
+        top_k = bench(
+            "拼音匹配器（前10）",
+            lambda word, theme: manager.search_partitions(word, theme, limit=10),
+            abbreviations,
+        )
+        print(f"  加速比 {legacy / matched:.1f}x / {legacy / top_k:.1f}x")
+
+        print("跨主题全局搜索（前20）:")
+        bench("首字母", lambda word, theme: manager.search_all(word), abbreviations)
+        bench("汉字", lambda word, theme: manager.search_all(word), substrings)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
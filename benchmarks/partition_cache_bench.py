@@ -0,0 +1,98 @@
+"""
+分区缓存加载基准：对比旧版格式化JSON与二进制mmap缓存的加载耗时、首屏耗时和内存占用
+
+用法: python benchmarks/partition_cache_bench.py [--themes 20] [--per-theme 2500]
+"""
+
+import argparse
+import json
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.partition_bench import make_synthetic_areas  # noqa: E402
+from src.core.partition_manager import PartitionManager  # noqa: E402
+
+
+def legacy_load(path: str) -> list:
+    """旧实现：读取整个JSON文件并取出主题列表"""
+    with open(path, "r", encoding="utf-8") as f:
+        data = json.load(f).get("data", [])
+    return [theme.get("name") for theme in data]
+
+
+def cache_load(path: str) -> list:
+    """新实现：mmap打开二进制缓存并取出主题列表"""
+    manager = PartitionManager(path)
+    themes = manager.get_all_themes()
+    manager.close()
+    return themes
+
+
+def measure(label: str, fn, path: str, runs: int) -> None:
+    samples = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        fn(path)
+        samples.append((time.perf_counter() - start) * 1000)
+
+    tracemalloc.start()
+    result = fn(path)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del result
+    print(f"  {label:<20} {min(samples):8.2f} ms  峰值内存 {peak / 1024:8.0f} KiB")
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="分区缓存加载基准")
+    parser.add_argument("--themes", type=int, default=20)
+    parser.add_argument("--per-theme", type=int, default=2500)
+    parser.add_argument("--runs", type=int, default=10)
+    args = parser.parse_args()
+
+    areas = make_synthetic_areas(args.themes, args.per_theme)
+    with tempfile.TemporaryDirectory() as tmp:
+        json_path = os.path.join(tmp, "legacy.json")
+        with open(json_path, "w", encoding="utf-8") as f:
+            json.dump(areas, f, ensure_ascii=False, indent=2)
+
+        cache_path = os.path.join(tmp, "partition.json")
+        manager = PartitionManager(cache_path)
+        manager.update_partition_data(areas)
+        first_theme = manager.get_all_themes()[0]
+        manager.close()
+
+        print(
+            f"分区总数 {args.themes * args.per_theme}，"
+            f"JSON {os.path.getsize(json_path) / 1024:.0f} KiB，"
+            f"二进制缓存 {os.path.getsize(manager.cache_file) / 1024:.0f} KiB"
+        )
+
+        print("加载并取得主题列表:")
+        measure("格式化JSON", legacy_load, json_path, args.runs)
+        measure("二进制缓存(mmap)", cache_load, cache_path, args.runs)
+
+        def first_partitions(path):
+            manager = PartitionManager(path)
+            partitions = manager.get_theme_partitions(first_theme)
+            manager.close()
+            return partitions
+
+        def legacy_first_partitions(path):
+            with open(path, "r", encoding="utf-8") as f:
+                data = json.load(f).get("data", [])
+            return [p["name"] for p in data[0]["list"]]
+
+        print("加载并取得首个主题的分区列表（首屏）:")
+        measure("格式化JSON", legacy_first_partitions, json_path, args.runs)
+        measure("二进制缓存(mmap)", first_partitions, cache_path, args.runs)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
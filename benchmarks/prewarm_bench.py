@@ -0,0 +1,82 @@
+"""
+开播延迟基准：冷启动与预热连接+DNS缓存后，从"开始直播"到拿到推流码的耗时对比
+
+模拟服务器为每个新连接加入握手延迟，并给域名解析加入人工延迟（通过 localhost 访问）。
+每轮都新建 BilibiliAPI，冷启动组直接开播，预热组先 prewarm 再开播（预热本身不计时，
+对应用户登录后到点击"开始直播"之间的空闲时间）。
+
+用法: python benchmarks/prewarm_bench.py [--rounds 10] [--handshake 0.1] [--dns 0.05]
+"""
+
+import argparse
+import os
+import socket
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.core.bilibili_api import BilibiliAPI  # noqa: E402
+from src.core.credential import Credential  # noqa: E402
+from src.core.warmup import DNSCache  # noqa: E402
+from src.devtools.stub_server import StubConfig, StubServer  # noqa: E402
+
+
+def go_live(api: BilibiliAPI, credential, room_id: int) -> float:
+    """与界面的开播流程一致：更新标题后开始直播"""
+    start = time.perf_counter()
+    assert api.update_live_title(room_id, "预热测试", credential.csrf, credential)
+    success, data = api.start_live(room_id, credential.csrf, 86, credential)
+    assert success and data["rtmp"]["code"]
+    return time.perf_counter() - start
+
+
+def run(base_url: str, server: StubServer, rounds: int, warm: bool) -> list:
+    cookies, _ = server.state.new_session(10001)
+    credential = Credential(dict(cookies))
+    room_id = server.state.room(10001)["room_id"]
+    dns_cache = DNSCache(ttl=300) if warm else None
+    samples = []
+    for _ in range(rounds):
+        api = BilibiliAPI(base_url=base_url)
+        if dns_cache is not None:
+            dns_cache.mount(api.session)
+            api.prewarm([base_url])
+        samples.append(go_live(api, credential, room_id))
+        api.close()
+    return samples
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--rounds", type=int, default=10)
+    parser.add_argument("--handshake", type=float, default=0.1, help="新连接握手延迟（秒）")
+    parser.add_argument("--dns", type=float, default=0.05, help="域名解析延迟（秒）")
+    args = parser.parse_args()
+
+    # 模拟较慢的系统解析器，DNSCache 未命中时调用它
+    system_getaddrinfo = socket.getaddrinfo
+
+    def slow_getaddrinfo(*a, **kw):
+        time.sleep(args.dns)
+        return system_getaddrinfo(*a, **kw)
+
+    socket.getaddrinfo = slow_getaddrinfo
+    config = StubConfig(handshake_latency=args.handshake)
+    with StubServer(config=config) as server:
+        base_url = f"http://localhost:{server.server_address[1]}"
+        cold = run(base_url, server, args.rounds, warm=False)
+        warm = run(base_url, server, args.rounds, warm=True)
+    socket.getaddrinfo = system_getaddrinfo
+
+    for name, samples in (("冷启动", cold), ("预热后", warm)):
+        print(
+            f"{name}: 中位数 {statistics.median(samples) * 1000:7.1f} ms, "
+            f"最大 {max(samples) * 1000:7.1f} ms"
+        )
+    print(f"中位数降低 {(statistics.median(cold) - statistics.median(warm)) * 1000:.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,100 @@
+"""
+二维码渲染基准：对比旧版PIL→PNG→QPixmap路径与直接写入QImage（含缓存）的耗时
+
+用法: python benchmarks/qr_bench.py [--runs 200]
+"""
+
+import argparse
+import io
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+
+import qrcode  # noqa: E402
+from PySide6.QtCore import QByteArray  # noqa: E402
+from PySide6.QtGui import QGuiApplication, QPixmap  # noqa: E402
+
+from src.utils import qr_generator  # noqa: E402
+from src.utils.qr_generator import QRCodeGenerator  # noqa: E402
+
+URL = (
+    "https://account.bilibili.com/h5/account-h5/auth/scan-web"
+    "?navhide=1&callback=close&qrcode_key=0123456789abcdef0123456789abcdef&from="
+)
+
+
+def legacy_pixmap(url: str, size: tuple = (200, 200)) -> QPixmap:
+    """旧实现：PIL生成图像，PNG编码后再由Qt解码并缩放"""
+    qr = qrcode.QRCode(
+        version=1,
+        error_correction=qrcode.constants.ERROR_CORRECT_L,
+        box_size=10,
+        border=4,
+    )
+    qr.add_data(url)
+    qr.make(fit=True)
+    img = qr.make_image(fill_color="black", back_color="white")
+    byte_array = QByteArray()
+    buffer = io.BytesIO()
+    img.save(buffer, format="PNG")
+    byte_array.append(buffer.getvalue())
+    pixmap = QPixmap()
+    pixmap.loadFromData(byte_array, "PNG")
+    return pixmap.scaled(size[0], size[1])
+
+
+def bench(label: str, fn, runs: int) -> float:
+    start = time.perf_counter()
+    for i in range(runs):
+        fn(i)
+    elapsed = (time.perf_counter() - start) / runs * 1000
+    print(f"  {label:<24} {elapsed:8.3f} ms/次")
+    return elapsed
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="二维码渲染基准")
+    parser.add_argument("--runs", type=int, default=200)
+    args = parser.parse_args()
+
+    app = QGuiApplication(sys.argv)  # noqa: F841
+
+    # 每次使用不同的URL，模拟新生成的二维码
+    try:
+        import PIL.Image  # noqa: F401
+    except ImportError:
+        legacy = None
+        print("  未安装Pillow，跳过旧实现")
+    else:
+        legacy = bench(
+            "PIL + PNG往返", lambda i: legacy_pixmap(f"{URL}{i}"), args.runs
+        )
+    direct = bench(
+        "直接写入QImage",
+        lambda i: QRCodeGenerator.generate_qr_pixmap(f"{URL}{i}"),
+        args.runs,
+    )
+    bench(
+        "其中：生成模块矩阵",
+        lambda i: qr_generator.qr_matrix(f"{URL}{i}"),
+        args.runs,
+    )
+    qr_generator._render_qr_image.cache_clear()
+    QRCodeGenerator.generate_qr_pixmap(URL)
+    cached = bench(
+        "缓存命中", lambda i: QRCodeGenerator.generate_qr_pixmap(URL), args.runs
+    )
+    if legacy is not None:
+        print(
+            f"  加速比 {legacy / direct:.1f}x（未命中）"
+            f" / {legacy / cached:.0f}x（命中）"
+        )
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
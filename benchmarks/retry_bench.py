@@ -0,0 +1,79 @@
+"""
+重试与熔断基准：模拟服务器按概率返回500时，关闭/开启重试的成功率和耗时；
+以及主机持续出错时，熔断前后单个请求的失败耗时
+
+用法: python benchmarks/retry_bench.py [--requests 200] [--fail-rate 0.2] [--latency 0.05]
+"""
+
+import argparse
+import os
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.core.bilibili_api import BilibiliAPI  # noqa: E402
+from src.core.credential import Credential  # noqa: E402
+from src.core.retry import CircuitBreaker, CircuitOpen, RetryPolicy  # noqa: E402
+from src.devtools.stub_server import StubConfig, StubServer  # noqa: E402
+
+
+def run(api: BilibiliAPI, credential: Credential, count: int):
+    ok = 0
+    samples = []
+    for _ in range(count):
+        start = time.perf_counter()
+        try:
+            if api.get_live_areas(credential) is not None:
+                ok += 1
+        except CircuitOpen:
+            pass
+        samples.append(time.perf_counter() - start)
+    return ok / count, samples
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--requests", type=int, default=200)
+    parser.add_argument("--fail-rate", type=float, default=0.2)
+    parser.add_argument("--latency", type=float, default=0.05)
+    args = parser.parse_args()
+
+    config = StubConfig(latency=args.latency, seed=1)
+    config.fail_rate["area_list"] = args.fail_rate
+    with StubServer(config=config) as server:
+        cookies, _ = server.state.new_session(10001)
+        credential = Credential(dict(cookies))
+        # 随机错误下熔断器不应打开，阈值设高以只比较重试本身
+        no_retry = BilibiliAPI(
+            base_url=server.base_url,
+            retry_policy=RetryPolicy(max_attempts=1),
+            circuit_breaker=CircuitBreaker(failure_threshold=1000),
+        )
+        with_retry = BilibiliAPI(
+            base_url=server.base_url,
+            circuit_breaker=CircuitBreaker(failure_threshold=1000),
+        )
+        for name, api in (("不重试", no_retry), ("重试", with_retry)):
+            rate, samples = run(api, credential, args.requests)
+            print(
+                f"{name:>6}: 成功率 {rate * 100:5.1f}%, "
+                f"中位数 {statistics.median(samples) * 1000:6.1f} ms, "
+                f"最大 {max(samples) * 1000:6.1f} ms"
+            )
+            api.close()
+
+        # 主机持续返回500：熔断后直接失败，不再等待服务器
+        config.fail_rate["area_list"] = 1.0
+        api = BilibiliAPI(base_url=server.base_url)
+        _, samples = run(api, credential, 20)
+        api.close()
+        print(
+            f"持续出错: 熔断前 {statistics.mean(samples[:2]) * 1000:6.1f} ms/次, "
+            f"熔断后 {statistics.mean(samples[-10:]) * 1000:6.3f} ms/次"
+        )
+
+
+if __name__ == "__main__":
+    main()
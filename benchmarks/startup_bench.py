@@ -0,0 +1,103 @@
+"""
+启动性能基准：各模块导入耗时和启动到首次绘制的耗时
+
+用法:
+    python benchmarks/startup_bench.py                     # 源码运行
+    python benchmarks/startup_bench.py --exe build/main.exe  # Nuitka打包产物
+    python benchmarks/startup_bench.py --budget-ms 1500    # 超出预算时返回非零
+"""
+
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+MODULES = [
+    "requests",
+    "qrcode",
+    "PIL.Image",
+    "PySide6.QtWidgets",
+    "src.core.bilibili_api",
+    "src.core.config_manager",
+    "src.core.partition_manager",
+    "src.utils.qr_generator",
+    "src.ui.main_window",
+    "src.cli",
+]
+
+
+def measure_import(module: str) -> float:
+    """在新进程中导入模块，返回累计导入耗时（毫秒）"""
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=ROOT,
+        capture_output=True,
+        text=True,
+    )
+    if result.returncode != 0:
+        return float("nan")
+    # importtime输出格式: "import time: self [us] | cumulative | name"
+    for line in reversed(result.stderr.splitlines()):
+        parts = line.split("|")
+        if len(parts) == 3 and parts[2].strip() == module:
+            return int(parts[1]) / 1000
+    return float("nan")
+
+
+def measure_first_paint(command: list, env: dict) -> float:
+    """启动程序直到首次绘制完成，返回耗时（毫秒）"""
+    fd, probe_file = tempfile.mkstemp(suffix=".probe")
+    os.close(fd)
+    try:
+        run_env = dict(env, BILI_STARTUP_PROBE=probe_file)
+        start = time.time()
+        subprocess.run(command, cwd=ROOT, env=run_env, timeout=120)
+        with open(probe_file, "r", encoding="utf-8") as f:
+            content = f.read().strip()
+        if not content:
+            return float("nan")
+        return (float(content) - start) * 1000
+    finally:
+        os.remove(probe_file)
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="启动性能基准")
+    parser.add_argument("--runs", type=int, default=5, help="首次绘制测量次数")
+    parser.add_argument("--exe", help="Nuitka打包产物路径（默认测量源码运行）")
+    parser.add_argument(
+        "--offscreen", action="store_true", help="使用offscreen平台（无显示器环境）"
+    )
+    parser.add_argument("--budget-ms", type=float, help="首次绘制耗时中位数预算")
+    args = parser.parse_args()
+
+    print("模块导入耗时（冷启动，含依赖）:")
+    for module in MODULES:
+        print(f"  {module:<32} {measure_import(module):8.1f} ms")
+
+    env = dict(os.environ)
+    if args.offscreen:
+        env["QT_QPA_PLATFORM"] = "offscreen"
+    command = [args.exe] if args.exe else [sys.executable, "main.py"]
+
+    samples = [measure_first_paint(command, env) for _ in range(args.runs)]
+    median = statistics.median(samples)
+    print(f"\n启动到首次绘制（{' '.join(command)}）:")
+    print(
+        f"  中位数 {median:.1f} ms, "
+        f"最小 {min(samples):.1f} ms, 最大 {max(samples):.1f} ms"
+    )
+
+    if args.budget_ms is not None and not median <= args.budget_ms:
+        print(f"超出启动预算 {args.budget_ms:.0f} ms", file=sys.stderr)
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,9 +1,19 @@
+import os
 import sys
+import time
 from PySide6.QtWidgets import QApplication
+from PySide6.QtCore import QTimer
 from PySide6.QtGui import QIcon
 from src.ui.main_window import MainWindow
 
 
+def _report_first_paint(probe_file: str, app: QApplication) -> None:
+    """记录首次绘制完成的时间戳并退出，供启动性能基准脚本使用"""
+    with open(probe_file, "w", encoding="utf-8") as f:
+        f.write(f"{time.time():.6f}\n")
+    app.quit()
+
+
 def main():
     """主程序入口"""
     app = QApplication(sys.argv)
@@ -20,6 +30,11 @@ def main():
     window = MainWindow()
     window.show()
 
+    probe_file = os.environ.get("BILI_STARTUP_PROBE")
+    if probe_file:
+        # 事件循环处理完首次绘制后再记录
+        QTimer.singleShot(0, lambda: _report_first_paint(probe_file, app))
+
     sys.exit(app.exec())
 
 
@@ -0,0 +1,468 @@
+"""
+命令行入口，不依赖Qt，适用于无图形界面的服务器和自动化脚本
+
+用法: python -m src <命令> [参数]
+"""
+
+import argparse
+import json
+import sys
+import threading
+from typing import Optional, Tuple
+
+from src.core.config_manager import ConfigManager, create_config_manager
+from src.core.credential import Credential
+from src.core.deadline import RequestAborted
+
+
+def _load_session(
+    config_manager: ConfigManager, api
+) -> Optional[Tuple[int, str, Credential]]:
+    """读取保存的登录信息，返回(房间号, csrf, 凭据)；凭据已过期时不再发请求"""
+    if not config_manager.load_login_data():
+        print("未登录，请先执行 login 命令", file=sys.stderr)
+        return None
+    loaded = config_manager.load_credential()
+    if loaded is None:
+        print("登录信息已损坏，请重新执行 login 命令", file=sys.stderr)
+        return None
+    room_id, credential = loaded
+    if credential.is_expired():
+        print("登录已过期，请重新执行 login 命令", file=sys.stderr)
+        return None
+    return room_id, credential.csrf, credential
+
+
+def cmd_login(args, config_manager: ConfigManager, api) -> int:
+    """终端扫码登录"""
+    from src.core.qr_login import (
+        STATE_SCANNED,
+        STATE_SUCCESS,
+        PollPolicy,
+        QRLoginScheduler,
+    )
+    from src.utils.qr_generator import TerminalQRRenderer
+
+    finished = threading.Event()
+    renderer = TerminalQRRenderer(
+        ansi=False if args.no_color else None, invert=args.invert
+    )
+    shown = {"qrcode_key": None, "state": None}
+
+    def on_update(session):
+        if session.qrcode_key != shown["qrcode_key"]:
+            status = "请使用B站APP扫描二维码"
+            if shown["qrcode_key"] is not None:
+                status = "二维码即将失效，已自动刷新，请重新扫描"
+            renderer.draw(session.url, status)
+            shown["qrcode_key"] = session.qrcode_key
+        elif session.failures:
+            renderer.set_status(f"{session.error}，正在重试...")
+        elif session.state != shown["state"] and session.state == STATE_SCANNED:
+            renderer.set_status("已扫描，请在手机上确认登录")
+        shown["state"] = session.state
+        if session.finished:
+            finished.set()
+
+    scheduler = QRLoginScheduler(api, PollPolicy(unscanned_interval=args.interval))
+    try:
+        session = scheduler.start_session(on_update)
+        finished.wait()
+    except KeyboardInterrupt:
+        return 130
+    finally:
+        scheduler.stop()
+
+    if session.state != STATE_SUCCESS:
+        print(session.error or "二维码已失效，请重新登录", file=sys.stderr)
+        return 1
+    credential = session.credential
+
+    room_id, csrf = api.get_room_id_and_csrf(credential)
+    if not room_id or not csrf:
+        print("登录成功，但获取房间信息失败", file=sys.stderr)
+        return 1
+
+    config_manager.save_credential(int(room_id), credential)
+    print(f"登录成功！房间号: {room_id}")
+    return 0
+
+
+def _resolve_area_id(args, config_manager: ConfigManager) -> Optional[int]:
+    """由 --area-id 或 --theme/--area（默认上次保存的分区）得到分区ID"""
+    if args.area_id is not None:
+        return args.area_id
+
+    from src.core.partition_manager import PartitionManager
+
+    theme = args.theme or config_manager.get("last_area_theme")
+    area_name = args.area or config_manager.get("last_area_name")
+    if not theme or not area_name:
+        print("请通过 --area-id 或 --theme/--area 指定直播分区", file=sys.stderr)
+        return None
+    partition_manager = PartitionManager(f"{config_manager.config_dir}/partition.json")
+    area_id = partition_manager.get_partition_by_name(area_name, theme)
+    partition_manager.close()
+    if area_id is None:
+        print(f"无法找到分区 '{area_name}' 的ID", file=sys.stderr)
+    return area_id
+
+
+def cmd_start(args, config_manager: ConfigManager, api) -> int:
+    """开始直播并输出推流码"""
+    session = _load_session(config_manager, api)
+    if not session:
+        return 1
+    room_id, _, credential = session
+
+    area_id = _resolve_area_id(args, config_manager)
+    if area_id is None:
+        return 1
+
+    from src.core.go_live import STEP_ROLLBACK, STEP_TITLE, GoLivePipeline
+
+    def on_started(result):
+        # 保存失败时由流程自动下播，避免直播已开始却没有记录推流码
+        config_manager.save_stream_code(result.rtmp_addr, result.rtmp_code)
+        config_manager.record_live_start(room_id, area_id, args.title or "")
+
+    pipeline = GoLivePipeline(api)
+    try:
+        result = pipeline.run(
+            room_id,
+            credential,
+            area_id,
+            args.title or "",
+            require_title=args.require_title,
+            on_started=on_started,
+        )
+    finally:
+        pipeline.close()
+
+    title_step = result.step(STEP_TITLE)
+    if args.title and title_step is not None and title_step.ok:
+        print(f"直播标题已设置为: {args.title}")
+    for warning in result.warnings():
+        print(f"警告: {warning}", file=sys.stderr)
+    if not result.success:
+        print(
+            f"开始直播失败（{result.failed_step}）: {result.message}"
+            + ("，已自动停止直播" if result.rolled_back else ""),
+            file=sys.stderr,
+        )
+        rollback = result.step(STEP_ROLLBACK)
+        if rollback is not None and not rollback.ok:
+            print(f"警告: {rollback.message}", file=sys.stderr)
+        return 1
+
+    print(f"服务器地址：{result.rtmp_addr}")
+    print(f"推流码：{result.rtmp_code}")
+    return 0
+
+
+def cmd_stop(args, config_manager: ConfigManager, api) -> int:
+    """停止直播"""
+    session = _load_session(config_manager, api)
+    if not session:
+        return 1
+    room_id, csrf, cookies = session
+
+    if not api.stop_live(room_id, csrf, cookies):
+        print("停止直播失败", file=sys.stderr)
+        return 1
+    config_manager.clear_stream_code()
+    config_manager.record_live_stop(room_id)
+    print("直播已停止")
+    return 0
+
+
+def cmd_title(args, config_manager: ConfigManager, api) -> int:
+    """更新直播标题"""
+    session = _load_session(config_manager, api)
+    if not session:
+        return 1
+    room_id, csrf, cookies = session
+
+    if not api.update_live_title(room_id, args.title, csrf, cookies):
+        print("直播标题更新失败", file=sys.stderr)
+        return 1
+    print(f"直播标题已更新为: {args.title}")
+    return 0
+
+
+def cmd_code(args, config_manager: ConfigManager, api) -> int:
+    """输出保存的推流码"""
+    stream_code = config_manager.load_stream_code()
+    if not stream_code:
+        print("没有保存的推流码", file=sys.stderr)
+        return 1
+    addr, code = stream_code
+    print(f"服务器地址：{addr}")
+    print(f"推流码：{code}")
+    return 0
+
+
+def cmd_check(args, config_manager: ConfigManager, api) -> int:
+    """校验登录状态，需要时刷新cookie并保存"""
+    from src.core.session_validator import SessionValidator
+
+    session = _load_session(config_manager, api)
+    if not session:
+        return 1
+    room_id, _, credential = session
+
+    validator = SessionValidator(api)
+    if args.force_refresh:
+        status = validator.validate(credential, force=True)
+        new_credential = validator.refresh(credential) if status.valid else None
+    else:
+        status, new_credential = validator.check(credential, force=True)
+    if not status.valid:
+        print(f"登录状态: {status.state} {status.message}", file=sys.stderr)
+        return 1
+    print(f"登录有效: {status.uname} (UID: {status.uid})")
+
+    if new_credential is not None:
+        credential = new_credential
+        config_manager.save_credential(room_id, credential)
+        print("Cookie已刷新并保存")
+    elif args.force_refresh:
+        print("Cookie刷新失败", file=sys.stderr)
+        return 1
+    remaining = credential.expires_in()
+    if remaining is not None:
+        print(f"SESSDATA剩余有效期: {remaining / 86400:.1f} 天")
+    return 0
+
+
+def cmd_accounts(args, config_manager: ConfigManager, api) -> int:
+    """列出或切换保存的账号"""
+    if args.use is not None:
+        if not config_manager.switch_account(args.use):
+            print(f"没有UID为 {args.use} 的账号", file=sys.stderr)
+            return 1
+        print(f"已切换到账号 {args.use}")
+
+    accounts = config_manager.list_accounts()
+    if not accounts:
+        print("没有保存的账号", file=sys.stderr)
+        return 1
+    for account in accounts:
+        marker = "*" if account["active"] else " "
+        print(f"{marker} UID {account['uid']}  房间号 {account['room_id']}")
+    return 0
+
+
+def _load_batch_jobs(args, config_manager: ConfigManager, api) -> Optional[list]:
+    """从 --jobs 文件或保存的账号构建批量任务"""
+    from src.core.batch_controller import RoomJob
+
+    jobs = []
+    if args.jobs:
+        # 文件格式: [{"room_id", "csrf", "cookies", "area_id"?, "title"?}, ...]
+        with open(args.jobs, "r", encoding="utf-8") as f:
+            entries = json.load(f)
+        for entry in entries:
+            credential = Credential.coerce(entry["cookies"])
+            if not credential.csrf and entry.get("csrf"):
+                credential = credential.with_cookies({"bili_jct": entry["csrf"]})
+            jobs.append(
+                RoomJob(
+                    int(entry["room_id"]),
+                    credential,
+                    entry.get("area_id"),
+                    entry.get("title", ""),
+                )
+            )
+        return jobs
+
+    room_ids = args.rooms or [
+        account["room_id"] for account in config_manager.list_accounts()
+    ]
+    for room_id in room_ids:
+        login_data = config_manager.get_account_by_room(room_id)
+        if not login_data:
+            print(f"房间 {room_id} 没有保存的登录信息", file=sys.stderr)
+            return None
+        jobs.append(RoomJob.from_login_data(login_data))
+    return jobs
+
+
+def cmd_batch(args, config_manager: ConfigManager, api) -> int:
+    """对多个房间并发执行开播、改标题或下播"""
+    from src.core.batch_controller import (
+        ACTION_START,
+        ACTION_STOP,
+        ACTION_TITLE,
+        BatchController,
+    )
+
+    jobs = _load_batch_jobs(args, config_manager, api)
+    if not jobs:
+        print("没有可操作的房间", file=sys.stderr)
+        return 1
+
+    if args.action == ACTION_START and any(job.area_id is None for job in jobs):
+        area_id = _resolve_area_id(args, config_manager)
+        if area_id is None:
+            return 1
+        for job in jobs:
+            if job.area_id is None:
+                job.area_id = area_id
+    if args.title:
+        for job in jobs:
+            job.title = job.title or args.title
+    if args.action == ACTION_TITLE and not all(job.title for job in jobs):
+        print("请通过 --title 指定直播标题", file=sys.stderr)
+        return 1
+
+    def report(result):
+        status = "成功" if result.success else "失败"
+        line = f"[{result.room_id}] {status} ({result.elapsed:.2f}s)"
+        if result.message:
+            line += f" {result.message}"
+        if result.data and "rtmp" in result.data:
+            rtmp = result.data["rtmp"]
+            line += f"\n    服务器地址：{rtmp.get('addr')}\n    推流码：{rtmp.get('code')}"
+        print(line, flush=True)
+
+    controller = BatchController(api, args.concurrency)
+    operation = {
+        ACTION_START: controller.start_all,
+        ACTION_TITLE: controller.retitle_all,
+        ACTION_STOP: controller.stop_all,
+    }[args.action]
+    results = operation(jobs, on_result=report)
+
+    jobs_by_room = {job.room_id: job for job in jobs}
+    for result in results:
+        if not result.success:
+            continue
+        job = jobs_by_room[result.room_id]
+        if args.action == ACTION_START:
+            config_manager.record_live_start(job.room_id, job.area_id, job.title)
+        elif args.action == ACTION_STOP:
+            config_manager.record_live_stop(job.room_id)
+
+    failed = sum(1 for result in results if not result.success)
+    print(f"完成 {len(results)} 个房间，失败 {failed} 个")
+    return 1 if failed else 0
+
+
+def build_parser() -> argparse.ArgumentParser:
+    """构建命令行参数解析器"""
+    parser = argparse.ArgumentParser(
+        prog="python -m src", description="B站直播推流码获取工具（命令行版）"
+    )
+    parser.add_argument("--data-dir", default="data", help="数据目录（默认: data）")
+    parser.add_argument(
+        "--storage",
+        choices=["json", "sqlite"],
+        help="存储后端（默认: 数据目录已有SQLite数据库时使用sqlite，否则json）",
+    )
+    parser.add_argument(
+        "--base-url",
+        help="API服务器地址，用于连接本地模拟服务器（默认: 环境变量BILI_API_BASE_URL或B站官方地址）",
+    )
+    parser.add_argument(
+        "--metrics",
+        metavar="FILE",
+        help="退出时把各接口的请求统计写入文件（.prom为Prometheus格式，否则为JSON）",
+    )
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    login_parser = subparsers.add_parser("login", help="终端扫码登录")
+    login_parser.add_argument(
+        "--interval", type=float, default=3.0, help="未扫描时的轮询间隔秒数"
+    )
+    login_parser.add_argument(
+        "--no-color", action="store_true", help="不使用ANSI颜色显示二维码"
+    )
+    login_parser.add_argument(
+        "--invert", action="store_true", help="反色显示（不使用颜色且终端为深色背景时）"
+    )
+    login_parser.set_defaults(func=cmd_login, needs_api=True)
+
+    start_parser = subparsers.add_parser("start", help="开始直播并输出推流码")
+    start_parser.add_argument("--area-id", type=int, help="直播分区ID")
+    start_parser.add_argument("--theme", help="直播分区主题名称")
+    start_parser.add_argument("--area", help="直播分区名称")
+    start_parser.add_argument("--title", help="直播标题（不超过20个字符）")
+    start_parser.add_argument(
+        "--require-title",
+        action="store_true",
+        help="标题更新失败时视为开播失败并自动下播（默认只警告）",
+    )
+    start_parser.set_defaults(func=cmd_start, needs_api=True)
+
+    stop_parser = subparsers.add_parser("stop", help="停止直播")
+    stop_parser.set_defaults(func=cmd_stop, needs_api=True)
+
+    title_parser = subparsers.add_parser("title", help="更新直播标题")
+    title_parser.add_argument("title", help="新标题（不超过20个字符）")
+    title_parser.set_defaults(func=cmd_title, needs_api=True)
+
+    code_parser = subparsers.add_parser("code", help="输出保存的推流码")
+    code_parser.set_defaults(func=cmd_code, needs_api=False)
+
+    check_parser = subparsers.add_parser("check", help="校验登录状态，必要时刷新cookie")
+    check_parser.add_argument(
+        "--force-refresh", action="store_true", help="无论是否临近过期都刷新cookie"
+    )
+    check_parser.set_defaults(func=cmd_check, needs_api=True)
+
+    accounts_parser = subparsers.add_parser("accounts", help="列出或切换保存的账号")
+    accounts_parser.add_argument("--use", type=int, metavar="UID", help="切换到该账号")
+    accounts_parser.set_defaults(func=cmd_accounts, needs_api=False)
+
+    batch_parser = subparsers.add_parser("batch", help="多个房间批量开播/改标题/下播")
+    batch_parser.add_argument("action", choices=["start", "title", "stop"])
+    batch_parser.add_argument(
+        "--rooms", type=int, nargs="+", help="房间号（默认: 所有保存的账号）"
+    )
+    batch_parser.add_argument("--jobs", help="批量任务JSON文件，包含各房间的登录信息")
+    batch_parser.add_argument("--area-id", type=int, help="直播分区ID")
+    batch_parser.add_argument("--theme", help="直播分区主题名称")
+    batch_parser.add_argument("--area", help="直播分区名称")
+    batch_parser.add_argument("--title", help="直播标题（不超过20个字符）")
+    batch_parser.add_argument(
+        "--concurrency", type=int, default=4, help="最大并发房间数（默认: 4）"
+    )
+    batch_parser.set_defaults(func=cmd_batch, needs_api=True)
+
+    return parser
+
+
+def main(argv=None) -> int:
+    """命令行主入口"""
+    args = build_parser().parse_args(argv)
+    config_manager = create_config_manager(args.data_dir, args.storage)
+
+    api = None
+    metrics = None
+    if args.needs_api:
+        # 仅在需要访问网络时才导入requests
+        from src.core.bilibili_api import BilibiliAPI
+
+        # 批量操作时连接池不小于并发数，避免连接被反复丢弃重建
+        api = BilibiliAPI(
+            pool_maxsize=max(8, getattr(args, "concurrency", 0)),
+            base_url=args.base_url,
+        )
+        if args.metrics:
+            from src.core.api_metrics import APIMetrics
+
+            metrics = APIMetrics(keep_recent=0)
+            api.add_request_hook(metrics.record)
+
+    try:
+        return args.func(args, config_manager, api)
+    except RequestAborted as e:
+        print(f"请求中止: {e}", file=sys.stderr)
+        return 1
+    finally:
+        if api is not None:
+            api.close()
+        if metrics is not None:
+            metrics.export(args.metrics)
+        config_manager.close()
@@ -0,0 +1,317 @@
+"""
+API请求指标：按接口统计耗时分布、状态码、业务错误码和流量
+
+通过 BilibiliAPI.add_request_hook(metrics.record) 接入，未接入时请求路径上没有任何统计开销。
+"""
+
+import json
+import threading
+from collections import deque
+from bisect import bisect_left
+from typing import Dict, List, Optional, Tuple
+
+# 耗时直方图的桶上界（秒）
+LATENCY_BUCKETS: Tuple[float, ...] = (
+    0.001,
+    0.0025,
+    0.005,
+    0.01,
+    0.025,
+    0.05,
+    0.1,
+    0.25,
+    0.5,
+    1.0,
+    2.5,
+    5.0,
+    10.0,
+)
+
+METRIC_PREFIX = "bililive_api"
+
+
+class RequestSample:
+    """一次请求的测量结果
+
+    ttfb 为发出请求到解析完响应头的时间（含新建连接时的DNS、TCP和TLS握手），
+    total 为到读完响应体的时间；请求未得到响应时 status 为-1，error 为异常类型名。
+    """
+
+    __slots__ = (
+        "endpoint",
+        "method",
+        "status",
+        "api_code",
+        "error",
+        "ttfb",
+        "total",
+        "bytes_sent",
+        "bytes_received",
+        "retries",
+    )
+
+    def __init__(
+        self,
+        endpoint: str,
+        method: str,
+        status: int = -1,
+        api_code: Optional[int] = None,
+        error: str = "",
+        ttfb: float = 0.0,
+        total: float = 0.0,
+        bytes_sent: int = 0,
+        bytes_received: int = 0,
+        retries: int = 0,
+    ):
+        self.endpoint = endpoint
+        self.method = method
+        self.status = status
+        self.api_code = api_code
+        self.error = error
+        self.ttfb = ttfb
+        self.total = total
+        self.bytes_sent = bytes_sent
+        self.bytes_received = bytes_received
+        self.retries = retries
+
+    @property
+    def failed(self) -> bool:
+        """请求失败：未得到响应、HTTP错误或业务码非0"""
+        return bool(self.error) or self.status >= 400 or bool(self.api_code)
+
+    def __repr__(self) -> str:
+        return (
+            f"<RequestSample {self.method} {self.endpoint} status={self.status} "
+            f"code={self.api_code} {self.total * 1000:.1f}ms>"
+        )
+
+
+class Histogram:
+    """固定桶的累积直方图（与Prometheus的histogram语义一致）"""
+
+    __slots__ = ("bounds", "counts", "sum", "count", "max")
+
+    def __init__(self, bounds: Tuple[float, ...] = LATENCY_BUCKETS):
+        self.bounds = bounds
+        self.counts = [0] * (len(bounds) + 1)  # 最后一个桶为 +Inf
+        self.sum = 0.0
+        self.count = 0
+        self.max = 0.0
+
+    def observe(self, value: float) -> None:
+        self.counts[bisect_left(self.bounds, value)] += 1
+        self.sum += value
+        self.count += 1
+        if value > self.max:
+            self.max = value
+
+    def quantile(self, q: float) -> float:
+        """按桶内线性插值估算分位数"""
+        if not self.count:
+            return 0.0
+        rank = q * self.count
+        seen = 0
+        lower = 0.0
+        for index, bucket_count in enumerate(self.counts):
+            upper = self.bounds[index] if index < len(self.bounds) else self.max
+            if bucket_count and seen + bucket_count >= rank:
+                fraction = (rank - seen) / bucket_count
+                return min(self.max, lower + (upper - lower) * fraction)
+            seen += bucket_count
+            lower = upper
+        return self.max
+
+    def cumulative(self) -> List[Tuple[str, int]]:
+        """返回 (le, 累积计数) 列表，用于导出"""
+        result = []
+        total = 0
+        for index, bucket_count in enumerate(self.counts):
+            total += bucket_count
+            le = _format_float(self.bounds[index]) if index < len(self.bounds) else "+Inf"
+            result.append((le, total))
+        return result
+
+
+class EndpointStats:
+    """单个接口的累计指标"""
+
+    __slots__ = (
+        "requests",
+        "failures",
+        "retries",
+        "bytes_sent",
+        "bytes_received",
+        "statuses",
+        "api_codes",
+        "errors",
+        "latency",
+        "ttfb",
+    )
+
+    def __init__(self):
+        self.requests = 0
+        self.failures = 0
+        self.retries = 0
+        self.bytes_sent = 0
+        self.bytes_received = 0
+        self.statuses: Dict[int, int] = {}
+        self.api_codes: Dict[int, int] = {}
+        self.errors: Dict[str, int] = {}
+        self.latency = Histogram()
+        self.ttfb = Histogram()
+
+    def add(self, sample: RequestSample) -> None:
+        self.requests += 1
+        if sample.failed:
+            self.failures += 1
+        self.retries += sample.retries
+        self.bytes_sent += sample.bytes_sent
+        self.bytes_received += sample.bytes_received
+        self.statuses[sample.status] = self.statuses.get(sample.status, 0) + 1
+        if sample.api_code is not None:
+            self.api_codes[sample.api_code] = self.api_codes.get(sample.api_code, 0) + 1
+        if sample.error:
+            self.errors[sample.error] = self.errors.get(sample.error, 0) + 1
+        self.latency.observe(sample.total)
+        if sample.status > 0:
+            self.ttfb.observe(sample.ttfb)
+
+    def summary(self) -> Dict:
+        return {
+            "requests": self.requests,
+            "failures": self.failures,
+            "retries": self.retries,
+            "bytes_sent": self.bytes_sent,
+            "bytes_received": self.bytes_received,
+            "statuses": {str(k): v for k, v in sorted(self.statuses.items())},
+            "api_codes": {str(k): v for k, v in sorted(self.api_codes.items())},
+            "errors": dict(sorted(self.errors.items())),
+            "latency": {
+                "p50": self.latency.quantile(0.5),
+                "p95": self.latency.quantile(0.95),
+                "p99": self.latency.quantile(0.99),
+                "max": self.latency.max,
+                "mean": self.latency.sum / self.latency.count
+                if self.latency.count
+                else 0.0,
+            },
+            "ttfb": {
+                "p50": self.ttfb.quantile(0.5),
+                "p95": self.ttfb.quantile(0.95),
+            },
+        }
+
+
+class APIMetrics:
+    """线程安全的按接口指标汇总，可导出JSON快照或Prometheus文本格式"""
+
+    def __init__(self, keep_recent: int = 50):
+        self._lock = threading.Lock()
+        self._endpoints: Dict[str, EndpointStats] = {}
+        self._recent: deque = deque(maxlen=keep_recent)
+
+    def record(self, sample: RequestSample) -> None:
+        """记录一次请求，可直接作为 BilibiliAPI 的请求钩子"""
+        with self._lock:
+            stats = self._endpoints.get(sample.endpoint)
+            if stats is None:
+                stats = self._endpoints[sample.endpoint] = EndpointStats()
+            stats.add(sample)
+            self._recent.append(sample)
+
+    __call__ = record
+
+    def reset(self) -> None:
+        with self._lock:
+            self._endpoints.clear()
+            self._recent.clear()
+
+    def recent(self) -> List[RequestSample]:
+        """最近的请求记录（旧的在前）"""
+        with self._lock:
+            return list(self._recent)
+
+    def snapshot(self) -> Dict[str, Dict]:
+        """各接口的汇总指标"""
+        with self._lock:
+            return {
+                name: stats.summary()
+                for name, stats in sorted(self._endpoints.items())
+            }
+
+    def to_json(self, indent: Optional[int] = 2) -> str:
+        return json.dumps(self.snapshot(), ensure_ascii=False, indent=indent)
+
+    def to_prometheus(self) -> str:
+        """导出为Prometheus文本格式"""
+        lines: List[str] = []
+        with self._lock:
+            endpoints = sorted(self._endpoints.items())
+
+            def header(name: str, kind: str, help_text: str) -> str:
+                full = f"{METRIC_PREFIX}_{name}"
+                lines.append(f"# HELP {full} {help_text}")
+                lines.append(f"# TYPE {full} {kind}")
+                return full
+
+            name = header("requests_total", "counter", "Requests by endpoint and HTTP status")
+            for endpoint, stats in endpoints:
+                for status, value in sorted(stats.statuses.items()):
+                    lines.append(
+                        f'{name}{{endpoint="{endpoint}",status="{status}"}} {value}'
+                    )
+
+            name = header("api_codes_total", "counter", "Responses by API code")
+            for endpoint, stats in endpoints:
+                for code, value in sorted(stats.api_codes.items()):
+                    lines.append(f'{name}{{endpoint="{endpoint}",code="{code}"}} {value}')
+
+            name = header("transport_errors_total", "counter", "Requests without a response")
+            for endpoint, stats in endpoints:
+                for error, value in sorted(stats.errors.items()):
+                    lines.append(
+                        f'{name}{{endpoint="{endpoint}",error="{error}"}} {value}'
+                    )
+
+            for metric, attr, help_text in (
+                ("failures_total", "failures", "Failed requests"),
+                ("retries_total", "retries", "Retried attempts"),
+                ("sent_bytes_total", "bytes_sent", "Request body bytes"),
+                ("received_bytes_total", "bytes_received", "Response body bytes"),
+            ):
+                name = header(metric, "counter", help_text)
+                for endpoint, stats in endpoints:
+                    lines.append(
+                        f'{name}{{endpoint="{endpoint}"}} {getattr(stats, attr)}'
+                    )
+
+            for metric, attr, help_text in (
+                ("request_duration_seconds", "latency", "Total request time"),
+                ("ttfb_seconds", "ttfb", "Time to response headers"),
+            ):
+                name = header(metric, "histogram", help_text)
+                for endpoint, stats in endpoints:
+                    histogram = getattr(stats, attr)
+                    for le, value in histogram.cumulative():
+                        lines.append(
+                            f'{name}_bucket{{endpoint="{endpoint}",le="{le}"}} {value}'
+                        )
+                    lines.append(
+                        f'{name}_sum{{endpoint="{endpoint}"}} {_format_float(histogram.sum)}'
+                    )
+                    lines.append(f'{name}_count{{endpoint="{endpoint}"}} {histogram.count}')
+        return "\n".join(lines) + "\n"
+
+    def export(self, path: str) -> None:
+        """写入文件，.prom/.txt 为Prometheus格式，其他为JSON"""
+        content = (
+            self.to_prometheus()
+            if path.endswith((".prom", ".txt"))
+            else self.to_json()
+        )
+        with open(path, "w", encoding="utf-8") as f:
+            f.write(content)
+
+
+def _format_float(value: float) -> str:
+    return repr(float(value))
@@ -0,0 +1,162 @@
+"""
+B站API的asyncio接口
+"""
+
+import asyncio
+import functools
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, Coroutine, Dict, Optional, Tuple
+
+from src.core.bilibili_api import BilibiliAPI
+from src.core.credential import Credential, CredentialLike
+from src.core.deadline import Deadline
+
+
+class AsyncBilibiliAPI:
+    """BilibiliAPI的协程版本
+
+    请求仍由同步客户端发出，但在专用线程池中执行并共享同一个连接池，
+    因此多个互不依赖的请求可以通过 asyncio.gather 并发完成。
+    """
+
+    def __init__(self, api: Optional[BilibiliAPI] = None, max_workers: int = 8):
+        self.api = api or BilibiliAPI(pool_maxsize=max_workers)
+        self._executor = ThreadPoolExecutor(
+            max_workers=max_workers, thread_name_prefix="bilibili-api"
+        )
+
+    async def _call(self, fn, *args, **kwargs) -> Any:
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(
+            self._executor, functools.partial(fn, *args, **kwargs)
+        )
+
+    async def get_qrcode_data(
+        self, deadline: Optional[Deadline] = None
+    ) -> Optional[Dict]:
+        """生成登录二维码的URL和key"""
+        return await self._call(self.api.get_qrcode_data, deadline)
+
+    async def check_qr_login(
+        self, qrcode_key: str, deadline: Optional[Deadline] = None
+    ) -> Tuple[int, Optional[Credential]]:
+        """检查二维码登录状态"""
+        return await self._call(self.api.check_qr_login, qrcode_key, deadline)
+
+    async def get_live_areas(
+        self, cookies: CredentialLike, deadline: Optional[Deadline] = None
+    ) -> Optional[Dict]:
+        """获取直播分区列表"""
+        return await self._call(self.api.get_live_areas, cookies, deadline)
+
+    async def fetch_live_areas(
+        self,
+        cookies: CredentialLike,
+        validators: Optional[Dict] = None,
+        deadline: Optional[Deadline] = None,
+    ) -> Tuple[int, Optional[Dict], Dict]:
+        """条件请求直播分区列表"""
+        return await self._call(
+            self.api.fetch_live_areas, cookies, validators, deadline
+        )
+
+    async def start_live(
+        self,
+        room_id: int,
+        csrf: str,
+        area_v2: int,
+        cookies: CredentialLike,
+        deadline: Optional[Deadline] = None,
+    ) -> Tuple[bool, Optional[Dict]]:
+        """开始直播并获取推流码"""
+        return await self._call(
+            self.api.start_live, room_id, csrf, area_v2, cookies, deadline
+        )
+
+    async def stop_live(
+        self,
+        room_id: int,
+        csrf: str,
+        cookies: CredentialLike,
+        deadline: Optional[Deadline] = None,
+    ) -> bool:
+        """停止直播"""
+        return await self._call(self.api.stop_live, room_id, csrf, cookies, deadline)
+
+    async def update_live_title(
+        self,
+        room_id: int,
+        title: str,
+        csrf: str,
+        cookies: CredentialLike,
+        deadline: Optional[Deadline] = None,
+    ) -> bool:
+        """更新直播标题"""
+        return await self._call(
+            self.api.update_live_title, room_id, title, csrf, cookies, deadline
+        )
+
+    async def get_room_id_and_csrf(
+        self, cookies: CredentialLike, deadline: Optional[Deadline] = None
+    ) -> Tuple[Optional[int], Optional[str]]:
+        """获取用户的直播间ID和CSRF令牌"""
+        return await self._call(self.api.get_room_id_and_csrf, cookies, deadline)
+
+    async def fetch_login_context(
+        self,
+        cookies: CredentialLike,
+        area_validators: Optional[Dict] = None,
+        fetch_areas: bool = True,
+        deadline: Optional[Deadline] = None,
+    ) -> Tuple[Tuple[Optional[int], Optional[str]], Optional[Tuple]]:
+        """登录后并发获取房间信息和分区列表（条件请求）
+
+        fetch_areas 为False时只查询房间信息，分区结果为None。两个请求共用同一个
+        deadline，超时时抛出 RequestTimeout。
+        """
+        if not fetch_areas:
+            return await self.get_room_id_and_csrf(cookies, deadline), None
+        room_info, area_result = await asyncio.gather(
+            self.get_room_id_and_csrf(cookies, deadline),
+            self.fetch_live_areas(cookies, area_validators, deadline),
+        )
+        return room_info, area_result
+
+    def close(self) -> None:
+        """关闭线程池和连接池"""
+        self._executor.shutdown(wait=False)
+        self.api.close()
+
+
+class EventLoopThread:
+    """在后台线程中运行的事件循环
+
+    Qt界面线程不能直接运行asyncio事件循环，通过 submit 把协程投递到这里执行，
+    再用 Future 或后台任务取回结果。
+    """
+
+    def __init__(self, name: str = "asyncio-loop"):
+        self.loop = asyncio.new_event_loop()
+        self._thread = threading.Thread(target=self._run, name=name, daemon=True)
+        self._thread.start()
+
+    def _run(self):
+        asyncio.set_event_loop(self.loop)
+        self.loop.run_forever()
+
+    def submit(self, coro: Coroutine) -> Future:
+        """提交协程，返回线程安全的Future"""
+        return asyncio.run_coroutine_threadsafe(coro, self.loop)
+
+    def run(self, coro: Coroutine, timeout: Optional[float] = None) -> Any:
+        """提交协程并阻塞等待结果（供后台线程调用）"""
+        return self.submit(coro).result(timeout)
+
+    def stop(self) -> None:
+        """停止事件循环"""
+        if self.loop.is_running():
+            self.loop.call_soon_threadsafe(self.loop.stop)
+        self._thread.join(timeout=2)
+        if not self.loop.is_running():
+            self.loop.close()
@@ -0,0 +1,207 @@
+"""
+多房间批量开播、改标题和下播
+"""
+
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import Callable, Dict, List, Optional
+
+from src.core.bilibili_api import BilibiliAPI
+from src.core.credential import Credential
+
+ACTION_START = "start"
+ACTION_STOP = "stop"
+ACTION_TITLE = "title"
+
+
+class RoomJob:
+    """一个房间的批量操作参数"""
+
+    __slots__ = ("room_id", "credential", "area_id", "title")
+
+    def __init__(
+        self,
+        room_id: int,
+        credential: Credential,
+        area_id: Optional[int] = None,
+        title: str = "",
+    ):
+        self.room_id = room_id
+        self.credential = credential
+        self.area_id = area_id
+        self.title = title
+
+    @property
+    def csrf(self) -> str:
+        return self.credential.csrf
+
+    @classmethod
+    def from_login_data(
+        cls,
+        login_data: Dict,
+        area_id: Optional[int] = None,
+        title: str = "",
+    ) -> "RoomJob":
+        """由 ConfigManager.load_login_data 格式的登录数据创建"""
+        return cls(
+            int(login_data["room_id"]),
+            Credential.from_cookie_string(
+                login_data["cookies"], login_data.get("refresh_token", "")
+            ),
+            area_id,
+            title,
+        )
+
+
+class RoomResult:
+    """单个房间的操作结果"""
+
+    __slots__ = ("room_id", "action", "success", "message", "data", "elapsed")
+
+    def __init__(
+        self,
+        room_id: int,
+        action: str,
+        success: bool,
+        message: str = "",
+        data: Optional[Dict] = None,
+        elapsed: float = 0.0,
+    ):
+        self.room_id = room_id
+        self.action = action
+        self.success = success
+        self.message = message
+        self.data = data
+        self.elapsed = elapsed
+
+    def __repr__(self) -> str:
+        status = "成功" if self.success else "失败"
+        return f"<RoomResult {self.room_id} {self.action} {status} {self.message}>"
+
+
+class BatchController:
+    """以有限并发对多个房间执行同一操作
+
+    每个房间的操作互不影响，部分房间失败时其余房间照常完成；
+    结果按输入顺序返回，on_result 在每个房间完成时于调用线程中回调。
+    """
+
+    def __init__(self, api: BilibiliAPI, max_concurrency: int = 4):
+        if max_concurrency < 1:
+            raise ValueError("max_concurrency 必须大于0")
+        self.api = api
+        self.max_concurrency = max_concurrency
+
+    def start_all(
+        self,
+        jobs: List[RoomJob],
+        on_result: Optional[Callable[[RoomResult], None]] = None,
+    ) -> List[RoomResult]:
+        """批量开播（有标题时先更新标题）"""
+        return self._run(ACTION_START, jobs, self._start_one, on_result)
+
+    def stop_all(
+        self,
+        jobs: List[RoomJob],
+        on_result: Optional[Callable[[RoomResult], None]] = None,
+    ) -> List[RoomResult]:
+        """批量下播"""
+        return self._run(ACTION_STOP, jobs, self._stop_one, on_result)
+
+    def retitle_all(
+        self,
+        jobs: List[RoomJob],
+        on_result: Optional[Callable[[RoomResult], None]] = None,
+    ) -> List[RoomResult]:
+        """批量更新直播标题"""
+        return self._run(ACTION_TITLE, jobs, self._retitle_one, on_result)
+
+    def _run(
+        self,
+        action: str,
+        jobs: List[RoomJob],
+        operation: Callable[[RoomJob], RoomResult],
+        on_result: Optional[Callable[[RoomResult], None]],
+    ) -> List[RoomResult]:
+        if not jobs:
+            return []
+        results: List[Optional[RoomResult]] = [None] * len(jobs)
+        workers = min(self.max_concurrency, len(jobs))
+        with ThreadPoolExecutor(
+            max_workers=workers, thread_name_prefix="batch-room"
+        ) as executor:
+            futures = {
+                executor.submit(self._guarded, action, operation, job): index
+                for index, job in enumerate(jobs)
+            }
+            for future in as_completed(futures):
+                result = future.result()
+                results[futures[future]] = result
+                if on_result is not None:
+                    on_result(result)
+        return results
+
+    @staticmethod
+    def _guarded(
+        action: str, operation: Callable[[RoomJob], RoomResult], job: RoomJob
+    ) -> RoomResult:
+        """执行单个房间的操作，异常转为失败结果"""
+        start = time.perf_counter()
+        try:
+            result = operation(job)
+        except Exception as e:
+            result = RoomResult(job.room_id, action, False, str(e))
+        result.elapsed = time.perf_counter() - start
+        return result
+
+    def _start_one(self, job: RoomJob) -> RoomResult:
+        if job.area_id is None:
+            return RoomResult(job.room_id, ACTION_START, False, "未指定直播分区")
+        if job.credential.is_expired():
+            return RoomResult(job.room_id, ACTION_START, False, "登录已过期")
+
+        notes = []
+        if job.title:
+            if not self.api.update_live_title(
+                job.room_id, job.title, job.csrf, job.credential
+            ):
+                notes.append("标题更新失败")
+
+        success, stream_data = self.api.start_live(
+            job.room_id, job.csrf, job.area_id, job.credential
+        )
+        if success and stream_data and "rtmp" in stream_data:
+            return RoomResult(
+                job.room_id, ACTION_START, True, "，".join(notes), stream_data
+            )
+        if success:
+            # 已经开播却拿不到推流地址，下播回滚，不留下无法推流的直播
+            notes.append("未返回推流地址")
+            try:
+                stopped = self.api.stop_live(job.room_id, job.csrf, job.credential)
+            except Exception:
+                stopped = False
+            if stopped:
+                notes.append("已自动停止直播")
+            else:
+                notes.append("回滚下播失败，请手动停止直播")
+            return RoomResult(job.room_id, ACTION_START, False, "，".join(notes))
+        message = stream_data.get("message") if stream_data else "网络错误"
+        notes.append(message or "开播失败")
+        return RoomResult(job.room_id, ACTION_START, False, "，".join(notes))
+
+    def _stop_one(self, job: RoomJob) -> RoomResult:
+        success = self.api.stop_live(job.room_id, job.csrf, job.credential)
+        return RoomResult(
+            job.room_id, ACTION_STOP, success, "" if success else "下播失败"
+        )
+
+    def _retitle_one(self, job: RoomJob) -> RoomResult:
+        if not job.title:
+            return RoomResult(job.room_id, ACTION_TITLE, False, "未指定标题")
+        success = self.api.update_live_title(
+            job.room_id, job.title, job.csrf, job.credential
+        )
+        return RoomResult(
+            job.room_id, ACTION_TITLE, success, "" if success else "标题更新失败"
+        )
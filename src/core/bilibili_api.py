@@ -2,14 +2,126 @@
 B站API相关的核心业务逻辑
 """
 
+import os
+import random
+import re
+import threading
+import time
 import requests
-from typing import Dict, Tuple, Optional
+from http.cookiejar import DefaultCookiePolicy
+from requests.adapters import HTTPAdapter
+from typing import Callable, Dict, List, Tuple, Optional
+
+from src.core.api_metrics import RequestSample
+from src.core.credential import (
+    CODE_NOT_LOGGED_IN,
+    EXPIRED_MESSAGE,
+    Credential,
+    CredentialLike,
+)
+from src.core.deadline import Deadline, RequestAborted, RequestTimeout
+from src.core.retry import CircuitBreaker, RetryBudget, RetryPolicy
+
+
+PASSPORT_BASE_URL = "https://passport.bilibili.com"
+LIVE_BASE_URL = "https://api.live.bilibili.com"
+API_BASE_URL = "https://api.bilibili.com"
+WWW_BASE_URL = "https://www.bilibili.com"
+
+# 默认的(连接超时, 读取超时)，调用方传入 Deadline 时按剩余时间收紧
+DEFAULT_TIMEOUT = (3.05, 10.0)
+
+# 视为主机暂时不可用的异常：计入熔断，可按策略重试
+_TRANSIENT_ERRORS = (
+    RequestTimeout,
+    requests.ConnectionError,
+    requests.exceptions.ChunkedEncodingError,
+)
+
+# 不经过熔断器的接口：下播（含开播失败后的回滚）和确认直播间状态不能因为
+# 同一主机上其他接口的故障而被拦下
+_BREAKER_EXEMPT = frozenset({"stop_live", "room_info"})
+
+# correspond页面中 refresh_csrf 所在的元素
+_REFRESH_CSRF_RE = re.compile(r'<div id="1-name">(.+?)</div>')
+
+
+def _accept_encoding() -> str:
+    """根据已安装的解码库协商压缩格式"""
+    encodings = ["gzip", "deflate"]
+    try:
+        import brotli  # noqa: F401
+    except ImportError:
+        try:
+            import brotlicffi  # noqa: F401
+        except ImportError:
+            return ", ".join(encodings)
+    encodings.append("br")
+    return ", ".join(encodings)
+
+
+def create_session(
+    pool_connections: int = 4, pool_maxsize: int = 8
+) -> requests.Session:
+    """创建带连接池和keep-alive的会话，每个主机维护独立的连接池"""
+    session = requests.Session()
+    # 登录态由调用方显式传入，会话本身不保存任何cookie
+    session.cookies.set_policy(DefaultCookiePolicy(allowed_domains=[]))
+    adapter = HTTPAdapter(
+        pool_connections=pool_connections, pool_maxsize=pool_maxsize
+    )
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    session.headers.update(
+        {"Accept-Encoding": _accept_encoding(), "Connection": "keep-alive"}
+    )
+    return session
+
+
+def _parse_json(response: requests.Response) -> Optional[Dict]:
+    """解析JSON响应体，空响应或非JSON时返回None"""
+    if not response.content:
+        return None
+    try:
+        data = response.json()
+    except ValueError:
+        return None
+    return data if isinstance(data, dict) else None
 
 
 class BilibiliAPI:
     """B站API处理类"""
 
-    def __init__(self):
+    def __init__(
+        self,
+        session: Optional[requests.Session] = None,
+        pool_connections: int = 4,
+        pool_maxsize: int = 8,
+        base_url: Optional[str] = None,
+        timeout: Tuple[float, float] = DEFAULT_TIMEOUT,
+        retry_policy: Optional[RetryPolicy] = None,
+        circuit_breaker: Optional[CircuitBreaker] = None,
+    ):
+        # 所有接口共用同一个会话，复用TCP/TLS连接
+        self.session = session or create_session(pool_connections, pool_maxsize)
+        # 指定base_url（或环境变量BILI_API_BASE_URL）时所有接口都发往该地址，
+        # 用于连接本地模拟服务器
+        base_url = base_url or os.environ.get("BILI_API_BASE_URL")
+        if base_url:
+            base_url = base_url.rstrip("/")
+        self.passport_base = base_url or PASSPORT_BASE_URL
+        self.live_base = base_url or LIVE_BASE_URL
+        self.api_base = base_url or API_BASE_URL
+        self.www_base = base_url or WWW_BASE_URL
+        # 每个请求都带超时，连接卡住时不会无限期阻塞调用方
+        self.timeout = timeout
+        # 临时错误的重试和按主机熔断，RetryPolicy(max_attempts=1) 可关闭重试
+        self.retry_policy = retry_policy or RetryPolicy()
+        self.retry_budget = RetryBudget(
+            self.retry_policy.budget_ratio, self.retry_policy.budget_cap
+        )
+        self.circuit_breaker = circuit_breaker or CircuitBreaker()
+        self._rng = random.Random()
         self.user_agent = "Mozilla/5.0 (X11; Linux x86_64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/96.0.4664.110 Safari/537.36"
         self.headers = {
             "accept": "application/json, text/plain, */*",
@@ -25,82 +137,347 @@ class BilibiliAPI:
             "sec-fetch-site": "same-site",
             "user-agent": self.user_agent,
         }
-
-    def get_qrcode_data(self) -> Optional[Dict]:
+        # 请求钩子，每次请求结束后以 RequestSample 回调（见 api_metrics）
+        self._request_hooks: List[Callable[[RequestSample], None]] = []
+        # 各主机（scheme://host[:port]）最近一次请求的时间，用于判断连接是否空闲
+        self._last_used: Dict[str, float] = {}
+
+    def close(self) -> None:
+        """关闭会话并释放连接池"""
+        self.session.close()
+
+    def add_request_hook(self, hook: Callable[[RequestSample], None]) -> None:
+        """注册请求钩子，如 APIMetrics.record；钩子在发出请求的线程中调用"""
+        self._request_hooks = self._request_hooks + [hook]
+
+    def remove_request_hook(self, hook: Callable[[RequestSample], None]) -> None:
+        self._request_hooks = [h for h in self._request_hooks if h != hook]
+
+    def _request(
+        self,
+        endpoint: str,
+        method: str,
+        url: str,
+        deadline: Optional[Deadline] = None,
+        **kwargs,
+    ) -> Tuple[requests.Response, Optional[Dict]]:
+        """发出请求并解析JSON，返回(响应, JSON数据)
+
+        所有接口都经过这里；网络异常原样抛出，由各接口方法决定如何处理。
+        deadline 已取消或到期时不发请求；超时统一抛出 RequestTimeout，
+        各接口方法不会把 RequestAborted 转换成失败返回值。
+        临时错误按 retry_policy 重试，退避等待可被 deadline 取消；
+        主机熔断时抛出 CircuitOpen（_BREAKER_EXEMPT 中的接口除外）。
+        """
+        host = url[: url.find("/", 8)]
+        breaker = None if endpoint in _BREAKER_EXEMPT else self.circuit_breaker
+        policy = self.retry_policy
+        timeout = kwargs.pop("timeout", self.timeout)
+        self.retry_budget.deposit()
+        attempt = 1
+        while True:
+            if deadline is not None:
+                deadline.check()
+                if isinstance(timeout, tuple):
+                    kwargs["timeout"] = deadline.timeout(*timeout)
+                else:
+                    kwargs["timeout"] = deadline.timeout(timeout, timeout)
+            else:
+                kwargs["timeout"] = timeout
+            if breaker is not None:
+                breaker.before_request(host)
+            error: Optional[Exception] = None
+            try:
+                response, data = self._attempt(endpoint, method, url, attempt, kwargs)
+            except _TRANSIENT_ERRORS as e:
+                if breaker is not None:
+                    breaker.record_failure(host)
+                error = e
+            except BaseException:
+                if breaker is not None:
+                    breaker.release(host)
+                raise
+            else:
+                if response.status_code not in policy.retry_statuses:
+                    if breaker is not None:
+                        breaker.record_success(host)
+                    return response, data
+                if breaker is not None:
+                    breaker.record_failure(host)
+
+            if not self._retry_allowed(method, error, attempt, deadline):
+                if error is not None:
+                    raise error
+                return response, data
+            attempt += 1
+
+    def _retry_allowed(
+        self,
+        method: str,
+        error: Optional[Exception],
+        attempt: int,
+        deadline: Optional[Deadline],
+    ) -> bool:
+        """判断是否重试，允许时等待退避时间后返回True"""
+        policy = self.retry_policy
+        if attempt >= policy.max_attempts or not policy.should_retry(method, error):
+            return False
+        delay = policy.backoff(attempt, self._rng)
+        remaining = deadline.remaining() if deadline is not None else None
+        if remaining is not None and delay >= remaining:
+            return False  # 等待后已没有时间完成请求
+        if not self.retry_budget.withdraw():
+            return False
+        if deadline is None:
+            time.sleep(delay)
+        elif deadline.wait(delay):
+            deadline.check()  # 等待中被取消，抛出 RequestCancelled
+        return True
+
+    def _attempt(
+        self, endpoint: str, method: str, url: str, attempt: int, kwargs: Dict
+    ) -> Tuple[requests.Response, Optional[Dict]]:
+        """发出一次请求，每次尝试（含重试）各记录一个 RequestSample"""
+        self._last_used[url[: url.find("/", 8)]] = time.monotonic()
+        hooks = self._request_hooks
+        if not hooks:
+            response = self._send(endpoint, method, url, kwargs)
+            return response, _parse_json(response)
+
+        sample = RequestSample(endpoint, method, retries=1 if attempt > 1 else 0)
+        start = time.perf_counter()
+        try:
+            response = self._send(endpoint, method, url, kwargs)
+        except Exception as e:
+            sample.error = type(e).__name__
+            sample.total = time.perf_counter() - start
+            self._emit(hooks, sample)
+            raise
+        # 未使用stream时响应体已在request中读完
+        sample.total = time.perf_counter() - start
+        data = _parse_json(response)
+        sample.status = response.status_code
+        sample.ttfb = response.elapsed.total_seconds()
+        sample.bytes_sent = len(response.request.body or b"")
+        sample.bytes_received = int(
+            response.headers.get("Content-Length") or len(response.content)
+        )
+        if data is not None and isinstance(data.get("code"), int):
+            sample.api_code = data["code"]
+        self._emit(hooks, sample)
+        return response, data
+
+    def _send(
+        self, endpoint: str, method: str, url: str, kwargs: Dict
+    ) -> requests.Response:
+        try:
+            return self.session.request(method, url, **kwargs)
+        except requests.Timeout as e:
+            raise RequestTimeout(f"{endpoint} 请求超时") from e
+
+    def idle_hosts(self, base_urls: List[str], idle_timeout: float) -> List[str]:
+        """返回超过idle_timeout秒没有请求的主机"""
+        now = time.monotonic()
+        return [
+            base_url
+            for base_url in base_urls
+            if now - self._last_used.get(base_url.rstrip("/"), float("-inf"))
+            > idle_timeout
+        ]
+
+    def prewarm(
+        self,
+        base_urls: Optional[List[str]] = None,
+        connections: int = 1,
+        timeout: float = 5.0,
+    ) -> Dict[str, Optional[float]]:
+        """预先完成DNS解析和TCP/TLS握手，把连接留在连接池中
+
+        对每个主机并发发出connections个HEAD请求，返回各主机耗时（秒），失败为None。
+        """
+        base_urls = base_urls or [self.live_base, self.passport_base]
+        results: Dict[str, Optional[float]] = {}
+
+        def warm(base_url: str) -> None:
+            start = time.perf_counter()
+            try:
+                self._request(
+                    "prewarm",
+                    "HEAD",
+                    f"{base_url.rstrip('/')}/",
+                    headers={"User-Agent": self.user_agent},
+                    timeout=timeout,
+                    allow_redirects=False,
+                )
+            except Exception:
+                results[base_url] = None
+                return
+            elapsed = time.perf_counter() - start
+            # 同一主机的多个连接取最慢的一个
+            if results.get(base_url, 0.0) is not None:
+                results[base_url] = max(results.get(base_url, 0.0), elapsed)
+
+        threads = [
+            threading.Thread(target=warm, args=(base_url,), daemon=True)
+            for base_url in base_urls
+            for _ in range(max(1, connections))
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        return results
+
+    @staticmethod
+    def _emit(hooks: List[Callable], sample: RequestSample) -> None:
+        for hook in hooks:
+            try:
+                hook(sample)
+            except Exception:
+                pass  # 统计出错不能影响请求本身
+
+    def _auth_headers(self, cookies: CredentialLike) -> Tuple[Credential, Dict]:
+        """返回凭据和带Cookie头的请求头"""
+        credential = Credential.coerce(cookies)
+        headers = dict(self.headers)
+        headers["Cookie"] = credential.cookie_header
+        return credential, headers
+
+    def get_qrcode_data(self, deadline: Optional[Deadline] = None) -> Optional[Dict]:
         """生成登录二维码的URL和key"""
         try:
-            url = "https://passport.bilibili.com/x/passport-login/web/qrcode/generate"
+            url = f"{self.passport_base}/x/passport-login/web/qrcode/generate"
             headers = {"User-Agent": self.user_agent}
-            response = requests.get(url, headers=headers)
-            result = response.json()
-            if result.get("code") == 0:
+            _, result = self._request(
+                "qrcode_generate", "GET", url, deadline, headers=headers
+            )
+            if result and result.get("code") == 0:
                 return result["data"]
             return None
+        except RequestAborted:
+            raise
         except Exception:
             return None
 
-    def get_qrcode(self) -> Dict:
+    def get_qrcode(self, deadline: Optional[Deadline] = None) -> Dict:
         """生成登录二维码的URL和key (保持向后兼容)"""
-        url = "https://passport.bilibili.com/x/passport-login/web/qrcode/generate"
+        url = f"{self.passport_base}/x/passport-login/web/qrcode/generate"
         headers = {"User-Agent": self.user_agent}
-        response = requests.get(url, headers=headers)
+        response, _ = self._request(
+            "qrcode_generate", "GET", url, deadline, headers=headers
+        )
         return response.json()["data"]
 
-    def check_qr_login(self, qrcode_key: str) -> Tuple[int, Optional[Dict]]:
-        """检查二维码扫描后的登录状态，返回(状态码, cookies字典)"""
+    def check_qr_login(
+        self, qrcode_key: str, deadline: Optional[Deadline] = None
+    ) -> Tuple[int, Optional[Credential]]:
+        """检查二维码扫描后的登录状态，返回(状态码, 登录凭据)"""
         try:
-            url = "https://passport.bilibili.com/x/passport-login/web/qrcode/poll"
+            url = f"{self.passport_base}/x/passport-login/web/qrcode/poll"
             headers = {"User-Agent": self.user_agent}
             params = {"qrcode_key": qrcode_key}
-            response = requests.get(url, headers=headers, params=params)
+            response, data = self._request(
+                "qrcode_poll", "GET", url, deadline, headers=headers, params=params
+            )
 
-            if response.status_code != 200:
+            if response.status_code != 200 or data is None:
                 return -1, None
 
-            data = response.json()
             status_code = data.get("data", {}).get("code", -1)
 
             if status_code == 0:  # 登录成功
-                # 从响应头中提取cookies
+                # 从响应头中提取cookies，刷新令牌在响应体中
                 cookies = {}
                 for cookie in response.cookies:
                     cookies[cookie.name] = cookie.value
-                return status_code, cookies
+                refresh_token = data["data"].get("refresh_token", "")
+                return status_code, Credential(cookies, refresh_token)
             else:
                 return status_code, None
 
+        except RequestAborted:
+            raise
         except Exception:
             return -1, None
 
-    def cookies_dict_to_string(self, cookies: Dict) -> str:
+    def cookies_dict_to_string(self, cookies: CredentialLike) -> str:
         """将cookies字典转换为字符串"""
-        return "; ".join([f"{k}={v}" for k, v in cookies.items()])
+        return Credential.coerce(cookies).cookie_header
 
     def cookies_string_to_dict(self, cookie_str: str) -> Dict:
         """将cookie字符串转换为字典"""
-        cookies = {}
-        if cookie_str:
-            for item in cookie_str.split(";"):
-                if "=" in item:
-                    key, value = item.strip().split("=", 1)
-                    cookies[key] = value
-        return cookies
-
-    def get_live_areas(self, cookies: Dict) -> Optional[Dict]:
+        return dict(Credential.from_cookie_string(cookie_str).cookies)
+
+    def get_live_areas(
+        self, cookies: CredentialLike, deadline: Optional[Deadline] = None
+    ) -> Optional[Dict]:
         """获取直播分区列表"""
         try:
-            url = "https://api.live.bilibili.com/room/v1/Area/getList?show_pinyin=1"
-            response = requests.get(url, cookies=cookies, headers=self.headers)
+            _, headers = self._auth_headers(cookies)
+            url = f"{self.live_base}/room/v1/Area/getList?show_pinyin=1"
+            response, data = self._request(
+                "area_list", "GET", url, deadline, headers=headers
+            )
             if response.status_code == 200:
-                return response.json()
+                return data
             return None
+        except RequestAborted:
+            raise
         except Exception:
             return None
 
+    def fetch_live_areas(
+        self,
+        cookies: CredentialLike,
+        validators: Optional[Dict] = None,
+        deadline: Optional[Deadline] = None,
+    ) -> Tuple[int, Optional[Dict], Dict]:
+        """条件请求直播分区列表，返回(HTTP状态码, 分区数据, 缓存校验头)
+
+        validators 为上次响应的 etag/last_modified，服务器返回304时分区数据为None；
+        请求失败时状态码为-1。
+        """
+        _, headers = self._auth_headers(cookies)
+        if validators:
+            if validators.get("etag"):
+                headers["If-None-Match"] = validators["etag"]
+            if validators.get("last_modified"):
+                headers["If-Modified-Since"] = validators["last_modified"]
+
+        try:
+            url = f"{self.live_base}/room/v1/Area/getList?show_pinyin=1"
+            response, data = self._request(
+                "area_list", "GET", url, deadline, headers=headers
+            )
+            new_validators = {
+                "etag": response.headers.get("ETag"),
+                "last_modified": response.headers.get("Last-Modified"),
+            }
+            if response.status_code == 200 and data is not None:
+                return 200, data, new_validators
+            if response.status_code == 200:
+                return -1, None, {}
+            return response.status_code, None, new_validators
+        except RequestAborted:
+            raise
+        except Exception:
+            return -1, None, {}
+
     def start_live(
-        self, room_id: int, csrf: str, area_v2: int, cookies: Dict
+        self,
+        room_id: int,
+        csrf: str,
+        area_v2: int,
+        cookies: CredentialLike,
+        deadline: Optional[Deadline] = None,
     ) -> Tuple[bool, Optional[Dict]]:
-        """开始直播并获取推流码，返回(成功状态, 推流数据)"""
+        """开始直播并获取推流码，返回(成功状态, 推流数据)
+
+        凭据在本地已判断过期时不发请求，直接返回业务码 CODE_NOT_LOGGED_IN。
+        """
+        credential, headers = self._auth_headers(cookies)
+        if credential.is_expired():
+            return False, {"code": CODE_NOT_LOGGED_IN, "message": EXPIRED_MESSAGE}
         data = {
             "room_id": room_id,
             "platform": "android_link",
@@ -111,24 +488,36 @@ class BilibiliAPI:
         }
 
         try:
-            response = requests.post(
-                "https://api.live.bilibili.com/room/v1/Room/startLive",
-                cookies=cookies,
-                headers=self.headers,
+            _, result = self._request(
+                "start_live",
+                "POST",
+                f"{self.live_base}/room/v1/Room/startLive",
+                deadline,
+                headers=headers,
                 data=data,
             )
 
-            result = response.json()
-            if result.get("code") == 0:
+            if result and result.get("code") == 0:
                 return True, result.get("data")
             else:
                 return False, result
 
+        except RequestAborted:
+            raise
         except Exception:
             return False, None
 
-    def stop_live(self, room_id: int, csrf: str, cookies: Dict) -> bool:
+    def stop_live(
+        self,
+        room_id: int,
+        csrf: str,
+        cookies: CredentialLike,
+        deadline: Optional[Deadline] = None,
+    ) -> bool:
         """停止直播，返回成功状态"""
+        credential, headers = self._auth_headers(cookies)
+        if credential.is_expired():
+            return False
         data = {
             "room_id": room_id,
             "platform": "android_link",
@@ -137,25 +526,56 @@ class BilibiliAPI:
         }
 
         try:
-            response = requests.post(
-                "https://api.live.bilibili.com/room/v1/Room/stopLive",
-                cookies=cookies,
-                headers=self.headers,
+            _, result = self._request(
+                "stop_live",
+                "POST",
+                f"{self.live_base}/room/v1/Room/stopLive",
+                deadline,
+                headers=headers,
                 data=data,
             )
+            return bool(result) and result.get("code") == 0
 
-            result = response.json()
-            return result.get("code") == 0
-
+        except RequestAborted:
+            raise
         except Exception:
             return False
 
+    def get_live_status(
+        self, room_id: int, deadline: Optional[Deadline] = None
+    ) -> Optional[int]:
+        """查询直播间状态，返回 live_status（0未开播、1直播中、2轮播中），失败时为None"""
+        try:
+            _, data = self._request(
+                "room_info",
+                "GET",
+                f"{self.live_base}/room/v1/Room/get_info",
+                deadline,
+                headers={"User-Agent": self.user_agent},
+                params={"room_id": room_id},
+            )
+        except RequestAborted:
+            raise
+        except Exception:
+            return None
+        if data and data.get("code") == 0:
+            return (data.get("data") or {}).get("live_status")
+        return None
+
     def update_live_title(
-        self, room_id: int, title: str, csrf: str, cookies: Dict
+        self,
+        room_id: int,
+        title: str,
+        csrf: str,
+        cookies: CredentialLike,
+        deadline: Optional[Deadline] = None,
     ) -> bool:
         """更新直播标题"""
         if len(title) > 20:
             return False
+        credential, headers = self._auth_headers(cookies)
+        if credential.is_expired():
+            return False
 
         data = {
             "room_id": room_id,
@@ -166,43 +586,179 @@ class BilibiliAPI:
         }
 
         try:
-            response = requests.post(
-                "https://api.live.bilibili.com/room/v1/Room/update",
-                headers=self.headers,
-                cookies=cookies,
+            response, result = self._request(
+                "room_update",
+                "POST",
+                f"{self.live_base}/room/v1/Room/update",
+                deadline,
+                headers=headers,
                 data=data,
             )
 
-            if response.status_code == 200:
-                result = response.json()
+            if response.status_code == 200 and result:
                 return result.get("code") == 0
             return False
 
+        except RequestAborted:
+            raise
         except Exception:
             return False
 
     def get_room_id_and_csrf(
-        self, cookies: Dict
+        self, cookies: CredentialLike, deadline: Optional[Deadline] = None
     ) -> Tuple[Optional[int], Optional[str]]:
         """获取用户的直播间ID和CSRF令牌"""
         room_id = None
-        csrf = None
-
-        dede_user_id = cookies.get("DedeUserID")
-        if not dede_user_id:
+        credential = Credential.coerce(cookies)
+        if credential.uid is None:
             return None, None
 
-        url = f"https://api.live.bilibili.com/room/v2/Room/room_id_by_uid?uid={dede_user_id}"
+        url = f"{self.live_base}/room/v2/Room/room_id_by_uid?uid={credential.uid}"
 
         try:
-            response = requests.get(url, headers={"User-Agent": self.user_agent})
-            data = response.json()
+            _, data = self._request(
+                "room_id_by_uid",
+                "GET",
+                url,
+                deadline,
+                headers={"User-Agent": self.user_agent},
+            )
+        except RequestAborted:
+            raise
         except Exception:
             return None, None
         else:
-            if data.get("code") == 0:
+            if data and data.get("code") == 0:
                 room_id = data.get("data", {}).get("room_id")
 
-        csrf = cookies.get("bili_jct")
+        return room_id, credential.csrf or None
 
-        return room_id, csrf
+    def get_nav_info(
+        self, cookies: CredentialLike, deadline: Optional[Deadline] = None
+    ) -> Tuple[int, Optional[Dict]]:
+        """查询登录状态（导航栏接口），返回(业务码, 用户信息)
+
+        业务码0为已登录，-101为未登录或cookie已失效，请求失败时为-1。
+        """
+        _, headers = self._auth_headers(cookies)
+        try:
+            _, data = self._request(
+                "nav",
+                "GET",
+                f"{self.api_base}/x/web-interface/nav",
+                deadline,
+                headers=headers,
+            )
+        except RequestAborted:
+            raise
+        except Exception:
+            return -1, None
+        if data is None:
+            return -1, None
+        return data.get("code", -1), data.get("data")
+
+    def get_cookie_refresh_info(
+        self, cookies: CredentialLike, deadline: Optional[Deadline] = None
+    ) -> Optional[Dict]:
+        """检查cookie是否需要刷新，返回 {"refresh": 是否需要, "timestamp": 毫秒时间戳}"""
+        credential, headers = self._auth_headers(cookies)
+        try:
+            _, data = self._request(
+                "cookie_info",
+                "GET",
+                f"{self.passport_base}/x/passport-login/web/cookie/info",
+                deadline,
+                headers=headers,
+                params={"csrf": credential.csrf},
+            )
+        except RequestAborted:
+            raise
+        except Exception:
+            return None
+        if data and data.get("code") == 0:
+            return data.get("data")
+        return None
+
+    def get_refresh_csrf(
+        self,
+        cookies: CredentialLike,
+        correspond_path: str,
+        deadline: Optional[Deadline] = None,
+    ) -> Optional[str]:
+        """从correspond页面取出刷新cookie所需的 refresh_csrf"""
+        _, headers = self._auth_headers(cookies)
+        try:
+            response, _ = self._request(
+                "correspond",
+                "GET",
+                f"{self.www_base}/correspond/1/{correspond_path}",
+                deadline,
+                headers=headers,
+            )
+        except RequestAborted:
+            raise
+        except Exception:
+            return None
+        if response.status_code != 200:
+            return None
+        match = _REFRESH_CSRF_RE.search(response.text)
+        return match.group(1) if match else None
+
+    def refresh_cookies(
+        self,
+        cookies: CredentialLike,
+        refresh_csrf: str,
+        deadline: Optional[Deadline] = None,
+    ) -> Optional[Credential]:
+        """用刷新令牌换取新cookie，成功时返回新凭据（含新的刷新令牌）"""
+        credential, headers = self._auth_headers(cookies)
+        data = {
+            "csrf": credential.csrf,
+            "refresh_csrf": refresh_csrf,
+            "source": "main_web",
+            "refresh_token": credential.refresh_token,
+        }
+        try:
+            response, result = self._request(
+                "cookie_refresh",
+                "POST",
+                f"{self.passport_base}/x/passport-login/web/cookie/refresh",
+                deadline,
+                headers=headers,
+                data=data,
+            )
+        except RequestAborted:
+            raise
+        except Exception:
+            return None
+        if not result or result.get("code") != 0:
+            return None
+        new_cookies = {cookie.name: cookie.value for cookie in response.cookies}
+        if not new_cookies.get("SESSDATA"):
+            return None
+        refresh_token = (result.get("data") or {}).get("refresh_token", "")
+        return credential.with_cookies(new_cookies, refresh_token)
+
+    def confirm_cookie_refresh(
+        self,
+        cookies: CredentialLike,
+        old_refresh_token: str,
+        deadline: Optional[Deadline] = None,
+    ) -> bool:
+        """用新cookie确认刷新，使旧的刷新令牌失效"""
+        credential, headers = self._auth_headers(cookies)
+        data = {"csrf": credential.csrf, "refresh_token": old_refresh_token}
+        try:
+            _, result = self._request(
+                "confirm_refresh",
+                "POST",
+                f"{self.passport_base}/x/passport-login/web/confirm/refresh",
+                deadline,
+                headers=headers,
+                data=data,
+            )
+        except RequestAborted:
+            raise
+        except Exception:
+            return False
+        return bool(result) and result.get("code") == 0
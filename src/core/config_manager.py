@@ -2,32 +2,113 @@
 配置管理器
 """
 
+import atexit
 import json
 import os
-from typing import Dict, Optional, Any
+import tempfile
+import threading
+from typing import Dict, List, Optional, Any, Tuple
+
+from src.core.credential import Credential
+
+# fsync策略：不同步、同步文件内容、同步文件内容和所在目录
+FSYNC_NONE = "none"
+FSYNC_FILE = "file"
+FSYNC_FULL = "full"
+
+# SQLite存储的数据库文件名，数据目录中存在该文件时默认使用SQLite存储
+SQLITE_DB_NAME = "bililive.db"
+
+
+def uid_from_cookies(cookies_str: str) -> Optional[int]:
+    """从cookie字符串中取出用户UID（DedeUserID）"""
+    for item in cookies_str.split(";"):
+        key, _, value = item.strip().partition("=")
+        if key == "DedeUserID" and value.isdigit():
+            return int(value)
+    return None
+
+
+def atomic_write(path: str, content: str, fsync: str = FSYNC_FILE) -> None:
+    """先写临时文件再重命名，保证文件要么是旧内容要么是完整的新内容
+
+    临时文件名唯一，多个线程同时写同一文件时不会互相覆盖对方的临时文件。
+    """
+    directory, name = os.path.split(path)
+    fd, tmp_path = tempfile.mkstemp(
+        prefix=f"{name}.", suffix=".tmp", dir=directory or "."
+    )
+    try:
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            f.write(content)
+            if fsync != FSYNC_NONE:
+                f.flush()
+                os.fsync(f.fileno())
+        os.replace(tmp_path, path)
+    except BaseException:
+        try:
+            os.remove(tmp_path)
+        except OSError:
+            pass
+        raise
+
+    if fsync == FSYNC_FULL and hasattr(os, "O_DIRECTORY"):
+        # 同步目录项，确保重命名本身落盘（Windows不支持）
+        dir_fd = os.open(os.path.dirname(path) or ".", os.O_RDONLY | os.O_DIRECTORY)
+        try:
+            os.fsync(dir_fd)
+        finally:
+            os.close(dir_fd)
 
 
 class ConfigManager:
-    """配置文件管理器"""
+    """配置文件管理器
+
+    配置项常驻内存，set 只标记为脏并在 flush_delay 秒后由后台线程合并写入，
+    连续多次修改只产生一次写盘；flush 可立即写入。
+    """
 
-    def __init__(self, config_dir: str = "data"):
+    def __init__(
+        self,
+        config_dir: str = "data",
+        flush_delay: float = 1.0,
+        fsync: str = FSYNC_FILE,
+    ):
         self.config_dir = config_dir
         self.cookies_file = os.path.join(config_dir, "cookies.json")
         self.config_file = os.path.join(config_dir, "config.json")
         self.stream_code_file = os.path.join(config_dir, "stream_code.txt")
+        self.flush_delay = flush_delay
+        self.fsync = fsync
 
         # 确保配置目录存在
         os.makedirs(config_dir, exist_ok=True)
 
         # 加载配置到内存
         self._config_data = self.load_config()
+        self._lock = threading.RLock()
+        self._dirty = False
+        self._flush_timer: Optional[threading.Timer] = None
 
-    def save_login_data(self, room_id: int, cookies_str: str, csrf: str) -> bool:
+        # 进程正常退出时写入尚未落盘的修改
+        atexit.register(self.flush)
+
+    def save_login_data(
+        self, room_id: int, cookies_str: str, csrf: str, refresh_token: str = ""
+    ) -> bool:
         """保存登录数据"""
         try:
-            data = {"room_id": room_id, "cookies": cookies_str, "csrf": csrf}
-            with open(self.cookies_file, "w", encoding="utf-8") as f:
-                json.dump(data, f, ensure_ascii=False, indent=2)
+            data = {
+                "room_id": room_id,
+                "cookies": cookies_str,
+                "csrf": csrf,
+                "refresh_token": refresh_token,
+            }
+            atomic_write(
+                self.cookies_file,
+                json.dumps(data, ensure_ascii=False, indent=2),
+                self.fsync,
+            )
             return True
         except Exception:
             return False
@@ -46,6 +127,49 @@ class ConfigManager:
             pass
         return None
 
+    def save_credential(self, room_id: int, credential: Credential) -> bool:
+        """保存房间号和登录凭据"""
+        return self.save_login_data(
+            room_id, credential.cookie_header, credential.csrf, credential.refresh_token
+        )
+
+    def load_credential(self) -> Optional[Tuple[int, Credential]]:
+        """加载当前账号，返回(房间号, 登录凭据)；未登录或数据损坏时返回None"""
+        saved = self.load_login_data()
+        if not saved:
+            return None
+        try:
+            return int(saved["room_id"]), Credential.from_cookie_string(
+                saved["cookies"], saved.get("refresh_token", "")
+            )
+        except (KeyError, TypeError, ValueError):
+            return None
+
+    def list_accounts(self) -> List[Dict]:
+        """列出保存的账号（JSON存储只保存一个账号）"""
+        saved = self.load_login_data()
+        if not saved:
+            return []
+        return [
+            {
+                "uid": uid_from_cookies(saved.get("cookies", "")),
+                "room_id": saved.get("room_id"),
+                "active": True,
+                "updated_at": os.path.getmtime(self.cookies_file),
+            }
+        ]
+
+    def get_account_by_room(self, room_id: int) -> Optional[Dict]:
+        """根据房间号查找账号的登录数据"""
+        saved = self.load_login_data()
+        if saved and str(saved.get("room_id")) == str(room_id):
+            return saved
+        return None
+
+    def switch_account(self, uid: int) -> bool:
+        """切换当前账号，JSON存储只能"切换"到已登录的账号"""
+        return any(account["uid"] == uid for account in self.list_accounts())
+
     def clear_login_data(self) -> bool:
         """清除登录数据"""
         try:
@@ -63,12 +187,22 @@ class ConfigManager:
         """保存推流码"""
         try:
             content = f"服务器地址：{rtmp_addr}\n推流码：{rtmp_code}"
-            with open(self.stream_code_file, "w", encoding="utf-8") as f:
-                f.write(content)
+            atomic_write(self.stream_code_file, content, self.fsync)
             return True
         except Exception:
             return False
 
+    def load_stream_code(self) -> Optional[Tuple[str, str]]:
+        """读取保存的推流码，返回(服务器地址, 推流码)"""
+        try:
+            with open(self.stream_code_file, "r", encoding="utf-8") as f:
+                lines = f.read().splitlines()
+            addr = lines[0].split("：", 1)[1]
+            code = lines[1].split("：", 1)[1]
+            return addr, code
+        except (OSError, IndexError):
+            return None
+
     def clear_stream_code(self) -> bool:
         """清除推流码文件"""
         try:
@@ -78,15 +212,57 @@ class ConfigManager:
         except Exception:
             return False
 
+    def record_live_start(
+        self, room_id: int, area_id: Optional[int] = None, title: str = ""
+    ) -> None:
+        """记录一次开播（JSON存储不保存直播历史）"""
+
+    def record_live_stop(self, room_id: int) -> None:
+        """记录下播（JSON存储不保存直播历史）"""
+
     def save_config(self, config: Optional[Dict] = None) -> bool:
-        """保存配置"""
-        try:
-            data_to_save = config if config is not None else self._config_data
-            with open(self.config_file, "w", encoding="utf-8") as f:
-                json.dump(data_to_save, f, ensure_ascii=False, indent=2)
+        """立即保存配置（给定config时整体替换），与后台写入共用同一把锁"""
+        with self._lock:
+            if config is not None:
+                self._config_data = dict(config)
+                self._dirty = True
+            return self.flush()
+
+    def flush(self) -> bool:
+        """立即写入尚未保存的配置修改"""
+        with self._lock:
+            if self._flush_timer is not None:
+                self._flush_timer.cancel()
+                self._flush_timer = None
+            if not self._dirty:
+                return True
+            try:
+                atomic_write(
+                    self.config_file,
+                    json.dumps(self._config_data, ensure_ascii=False, indent=2),
+                    self.fsync,
+                )
+            except Exception:
+                return False
+            self._dirty = False
             return True
-        except Exception:
-            return False
+
+    def _schedule_flush(self) -> None:
+        """延迟写入，期间的其他修改合并到同一次写盘"""
+        if self._flush_timer is not None:
+            return
+        self._flush_timer = threading.Timer(self.flush_delay, self.flush)
+        self._flush_timer.daemon = True
+        self._flush_timer.start()
+
+    def is_dirty(self) -> bool:
+        """是否有尚未写入文件的修改"""
+        return self._dirty
+
+    def close(self) -> None:
+        """写入所有修改并停止后台写入"""
+        self.flush()
+        atexit.unregister(self.flush)
 
     def load_config(self) -> Dict:
         """加载配置"""
@@ -103,5 +279,32 @@ class ConfigManager:
         return self._config_data.get(key, default)
 
     def set(self, key: str, value: Any) -> None:
-        """设置配置项"""
-        self._config_data[key] = value
+        """设置配置项，值有变化时安排后台写入"""
+        with self._lock:
+            if key in self._config_data and self._config_data[key] == value:
+                return
+            self._config_data[key] = value
+            self._dirty = True
+            self._schedule_flush()
+
+
+def create_config_manager(
+    config_dir: str = "data", backend: Optional[str] = None
+) -> ConfigManager:
+    """按存储后端创建配置管理器
+
+    backend 可为 "json" 或 "sqlite"；未指定时读取环境变量 BILI_CONFIG_BACKEND，
+    仍未指定则在数据目录已有SQLite数据库时使用SQLite，否则使用JSON文件。
+    """
+    backend = backend or os.environ.get("BILI_CONFIG_BACKEND")
+    if backend is None:
+        db_file = os.path.join(config_dir, SQLITE_DB_NAME)
+        backend = "sqlite" if os.path.exists(db_file) else "json"
+
+    if backend == "sqlite":
+        from src.core.sqlite_store import SQLiteConfigManager
+
+        return SQLiteConfigManager(config_dir)
+    if backend == "json":
+        return ConfigManager(config_dir)
+    raise ValueError(f"未知的存储后端: {backend}")
@@ -0,0 +1,132 @@
+"""
+登录凭据：解析后的cookies、csrf、UID、过期时间和预先拼好的Cookie请求头
+"""
+
+import time
+from types import MappingProxyType
+from typing import Dict, Optional, Union
+from urllib.parse import unquote
+
+# 本地判断凭据已过期时 BilibiliAPI 返回的业务码，与B站"账号未登录"一致
+CODE_NOT_LOGGED_IN = -101
+EXPIRED_MESSAGE = "登录已过期，请重新登录"
+
+
+def parse_sessdata_expiry(sessdata: str) -> Optional[float]:
+    """从SESSDATA中取出过期时间戳
+
+    SESSDATA 形如 "<令牌>%2C<过期时间戳>%2C<校验>"，格式不符时返回None。
+    """
+    parts = unquote(sessdata).split(",")
+    if len(parts) >= 2 and parts[1].isdigit():
+        return float(parts[1])
+    return None
+
+
+class Credential:
+    """不可变的登录凭据
+
+    属性在创建后不能修改，cookies 为只读映射；需要新cookie时用 with_cookies
+    创建新凭据。cookie_header 在创建时拼好，每次请求直接作为Cookie头发送，
+    不再经由requests的cookie jar重新编码。refresh_token 为扫码登录时下发的
+    刷新令牌，用于到期前刷新cookie（见 session_validator）。
+    """
+
+    __slots__ = (
+        "cookies",
+        "csrf",
+        "uid",
+        "expires_at",
+        "cookie_header",
+        "refresh_token",
+    )
+
+    def __init__(self, cookies: Dict[str, str], refresh_token: str = ""):
+        cookies = dict(cookies)
+        uid = cookies.get("DedeUserID", "")
+        init = object.__setattr__
+        init(self, "cookies", MappingProxyType(cookies))
+        init(self, "refresh_token", refresh_token or "")
+        init(self, "csrf", cookies.get("bili_jct", ""))
+        init(self, "uid", int(uid) if uid.isdigit() else None)
+        init(self, "expires_at", parse_sessdata_expiry(cookies.get("SESSDATA", "")))
+        init(
+            self, "cookie_header", "; ".join(f"{k}={v}" for k, v in cookies.items())
+        )
+
+    def __setattr__(self, name: str, value) -> None:
+        raise AttributeError(f"Credential 不可修改: {name}")
+
+    def __delattr__(self, name: str) -> None:
+        raise AttributeError(f"Credential 不可修改: {name}")
+
+    def __reduce__(self):
+        # 复制和序列化时经由 __init__ 重新创建
+        return Credential, (dict(self.cookies), self.refresh_token)
+
+    @classmethod
+    def from_cookie_string(
+        cls, cookie_str: str, refresh_token: str = ""
+    ) -> "Credential":
+        """由 "k1=v1; k2=v2" 格式的字符串创建"""
+        cookies = {}
+        for item in (cookie_str or "").split(";"):
+            if "=" in item:
+                key, value = item.strip().split("=", 1)
+                cookies[key] = value
+        return cls(cookies, refresh_token)
+
+    @classmethod
+    def coerce(cls, value: Union["Credential", Dict, str, None]) -> "Credential":
+        """把cookies字典或字符串转为凭据，已是凭据时原样返回"""
+        if isinstance(value, Credential):
+            return value
+        if isinstance(value, str):
+            return cls.from_cookie_string(value)
+        return cls(value or {})
+
+    @property
+    def is_complete(self) -> bool:
+        """是否包含调用直播接口所需的SESSDATA、bili_jct和DedeUserID"""
+        return bool(self.cookies.get("SESSDATA") and self.csrf and self.uid)
+
+    def expires_in(self, now: Optional[float] = None) -> Optional[float]:
+        """距过期的秒数，过期时间未知时返回None"""
+        if self.expires_at is None:
+            return None
+        return self.expires_at - (time.time() if now is None else now)
+
+    def is_expired(self, now: Optional[float] = None, margin: float = 0.0) -> bool:
+        """是否已过期（或将在margin秒内过期）；过期时间未知时视为未过期"""
+        remaining = self.expires_in(now)
+        return remaining is not None and remaining <= margin
+
+    def with_cookies(
+        self, updates: Dict[str, str], refresh_token: Optional[str] = None
+    ) -> "Credential":
+        """返回合并了新cookie的凭据，未给出refresh_token时沿用原令牌"""
+        cookies = dict(self.cookies)
+        cookies.update(updates)
+        if refresh_token is None:
+            refresh_token = self.refresh_token
+        return Credential(cookies, refresh_token)
+
+    def to_cookie_string(self) -> str:
+        return self.cookie_header
+
+    def __eq__(self, other) -> bool:
+        return (
+            isinstance(other, Credential)
+            and self.cookies == other.cookies
+            and self.refresh_token == other.refresh_token
+        )
+
+    def __hash__(self) -> int:
+        # 与 __eq__ 一致：不依赖cookie的插入顺序，并包含刷新令牌
+        return hash((frozenset(self.cookies.items()), self.refresh_token))
+
+    def __repr__(self) -> str:
+        return f"<Credential uid={self.uid} expires_at={self.expires_at}>"
+
+
+CredentialLike = Union[Credential, Dict[str, str]]
@@ -0,0 +1,102 @@
+"""
+请求的截止时间和取消令牌
+"""
+
+import threading
+import time
+import weakref
+from typing import Optional
+
+
+class RequestAborted(Exception):
+    """请求因超时或取消而中止，API方法不会把它转换成 None/False"""
+
+
+class RequestTimeout(RequestAborted):
+    """连接或读取超时，或截止时间在发出请求前已经到达"""
+
+
+class RequestCancelled(RequestAborted):
+    """请求在发出前已被取消"""
+
+
+class Deadline:
+    """截止时间，同时可作为取消令牌
+
+    timeout 为None时没有时间限制，只用于取消。子令牌的剩余时间不超过父令牌，
+    父令牌取消时子令牌随之取消。已经发出的请求无法中途打断，取消只阻止之后的
+    请求并打断 wait 中的等待；在途请求的等待时间由剩余时间换算出的连接/读取超时限定。
+    """
+
+    __slots__ = ("expires_at", "parent", "_cancelled", "_children", "__weakref__")
+
+    def __init__(
+        self, timeout: Optional[float] = None, parent: Optional["Deadline"] = None
+    ):
+        self.expires_at = None if timeout is None else time.monotonic() + timeout
+        self.parent = parent
+        self._cancelled = threading.Event()
+        self._children: "weakref.WeakSet[Deadline]" = weakref.WeakSet()
+        if parent is not None:
+            parent._children.add(self)
+            if parent.cancelled:
+                self._cancelled.set()
+
+    def child(self, timeout: Optional[float] = None) -> "Deadline":
+        """派生一个不晚于本令牌的子令牌"""
+        return Deadline(timeout, self)
+
+    def remaining(self) -> Optional[float]:
+        """剩余秒数（不小于0），没有时间限制时返回None"""
+        remaining = None
+        if self.expires_at is not None:
+            remaining = max(0.0, self.expires_at - time.monotonic())
+        if self.parent is not None:
+            parent_remaining = self.parent.remaining()
+            if parent_remaining is not None and (
+                remaining is None or parent_remaining < remaining
+            ):
+                remaining = parent_remaining
+        return remaining
+
+    @property
+    def expired(self) -> bool:
+        remaining = self.remaining()
+        return remaining is not None and remaining <= 0
+
+    def cancel(self) -> None:
+        self._cancelled.set()
+        for child in list(self._children):
+            child.cancel()
+
+    def wait(self, timeout: float) -> bool:
+        """等待timeout秒（不超过剩余时间），被取消时提前返回True"""
+        remaining = self.remaining()
+        if remaining is not None:
+            timeout = min(timeout, remaining)
+        return self._cancelled.wait(max(0.0, timeout))
+
+    @property
+    def cancelled(self) -> bool:
+        return self._cancelled.is_set() or (
+            self.parent is not None and self.parent.cancelled
+        )
+
+    def check(self) -> None:
+        """已取消或已到期时抛出对应异常"""
+        if self.cancelled:
+            raise RequestCancelled("请求已取消")
+        if self.expired:
+            raise RequestTimeout("已超过截止时间")
+
+    def timeout(self, connect: float, read: float) -> tuple:
+        """按剩余时间收紧 requests 的 (连接超时, 读取超时)"""
+        remaining = self.remaining()
+        if remaining is None:
+            return connect, read
+        return min(connect, remaining), min(read, remaining)
+
+    def __repr__(self) -> str:
+        remaining = self.remaining()
+        left = "无限制" if remaining is None else f"{remaining:.3f}s"
+        return f"<Deadline {left}{' 已取消' if self.cancelled else ''}>"
@@ -0,0 +1,522 @@
+"""
+开播流程：并发执行互不依赖的准备步骤，再开始直播，失败时自动下播回滚
+"""
+
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from concurrent.futures import TimeoutError as FutureTimeoutError
+from typing import Callable, Dict, List, Optional, Tuple
+
+from src.core.bilibili_api import BilibiliAPI
+from src.core.credential import CODE_NOT_LOGGED_IN, Credential
+from src.core.deadline import Deadline, RequestCancelled, RequestTimeout
+from src.core.session_validator import SESSION_INVALID, SessionValidator
+
+STEP_CREDENTIAL = "credential"
+STEP_AREA = "area"
+STEP_TITLE = "title"
+STEP_START = "start_live"
+STEP_CONFIRM = "confirm"
+STEP_ROLLBACK = "rollback"
+
+STATUS_OK = "ok"
+STATUS_FAILED = "failed"
+STATUS_TIMEOUT = "timeout"
+STATUS_SKIPPED = "skipped"
+
+MAX_TITLE_LENGTH = 20
+
+# 直播间 live_status 中表示正在直播的值
+LIVE_STATUS_LIVE = 1
+
+# 开播请求超时后，每次下播与查询直播间状态之间的等待时间（秒）
+LATE_START_GRACE = 1.0
+# 开播请求超时后最多下播几次
+LATE_ROLLBACK_ATTEMPTS = 3
+
+# 各步骤的默认时限（秒）
+DEFAULT_DEADLINES: Dict[str, float] = {
+    STEP_CREDENTIAL: 3.0,
+    STEP_TITLE: 5.0,
+    STEP_START: 10.0,
+    STEP_ROLLBACK: 5.0,
+}
+
+
+class StepResult:
+    """单个步骤的结果"""
+
+    __slots__ = ("name", "status", "message", "data", "elapsed")
+
+    def __init__(
+        self,
+        name: str,
+        status: str,
+        message: str = "",
+        data: Optional[Dict] = None,
+        elapsed: float = 0.0,
+    ):
+        self.name = name
+        self.status = status
+        self.message = message
+        self.data = data
+        self.elapsed = elapsed
+
+    @property
+    def ok(self) -> bool:
+        return self.status == STATUS_OK
+
+    def __repr__(self) -> str:
+        return f"<StepResult {self.name} {self.status} {self.message}>"
+
+
+class GoLiveResult:
+    """一次开播的结果，steps 按执行顺序记录每个步骤"""
+
+    def __init__(self, room_id: int):
+        self.room_id = room_id
+        self.success = False
+        self.steps: Dict[str, StepResult] = {}
+        self.stream_data: Optional[Dict] = None
+        self.failed_step: Optional[str] = None
+        self.rolled_back = False
+        # 开播请求超时后无法确认直播间是否仍在直播，需要提示用户自行检查
+        self.live_unknown = False
+        self.elapsed = 0.0
+
+    def add(self, step: StepResult) -> StepResult:
+        self.steps[step.name] = step
+        return step
+
+    def fail(self, step: StepResult) -> None:
+        if self.failed_step is None:
+            self.failed_step = step.name
+
+    def step(self, name: str) -> Optional[StepResult]:
+        return self.steps.get(name)
+
+    @property
+    def rtmp_addr(self) -> Optional[str]:
+        return ((self.stream_data or {}).get("rtmp") or {}).get("addr")
+
+    @property
+    def rtmp_code(self) -> Optional[str]:
+        return ((self.stream_data or {}).get("rtmp") or {}).get("code")
+
+    @property
+    def login_expired(self) -> bool:
+        """失败原因是否为登录失效，调用方据此提示重新登录"""
+        credential = self.steps.get(STEP_CREDENTIAL)
+        if credential is not None and credential.status == STATUS_FAILED:
+            return True
+        start = self.steps.get(STEP_START)
+        data = (start.data if start else None) or {}
+        return data.get("code") == CODE_NOT_LOGGED_IN or "主播身份校验失败" in (
+            data.get("message") or ""
+        )
+
+    @property
+    def message(self) -> str:
+        """失败步骤的说明，成功时为空"""
+        if self.failed_step is None:
+            return ""
+        return self.steps[self.failed_step].message
+
+    def warnings(self) -> List[str]:
+        """不影响开播结果的步骤失败（如标题更新失败）"""
+        return [
+            f"{step.name}: {step.message}"
+            for step in self.steps.values()
+            if step.status in (STATUS_FAILED, STATUS_TIMEOUT)
+            and step.name != self.failed_step
+            and step.name != STEP_ROLLBACK
+        ]
+
+    def to_dict(self) -> Dict:
+        return {
+            "room_id": self.room_id,
+            "success": self.success,
+            "failed_step": self.failed_step,
+            "rolled_back": self.rolled_back,
+            "live_unknown": self.live_unknown,
+            "elapsed": round(self.elapsed, 4),
+            "steps": {
+                name: {
+                    "status": step.status,
+                    "message": step.message,
+                    "elapsed": round(step.elapsed, 4),
+                }
+                for name, step in self.steps.items()
+            },
+        }
+
+    def __repr__(self) -> str:
+        status = "成功" if self.success else f"失败于{self.failed_step}"
+        return f"<GoLiveResult {self.room_id} {status} {self.elapsed * 1000:.0f}ms>"
+
+
+class GoLivePipeline:
+    """开播事务
+
+    1. 本地检查：凭据是否过期、分区是否有效，失败时不发任何请求
+    2. 并发：登录状态校验、更新标题、开始直播（原先标题和开播串行，需要两次往返）；
+       标题默认不要求，失败只记为警告。require_title 时先等登录校验和标题更新完成，
+       任一失败则不发开播请求，避免直播间开播后又立即下播
+    3. 开播成功后，未返回推流地址或 on_started 回调出错时调用下播回滚
+
+    每个步骤有独立时限，既限制等待时间，也作为 Deadline 传给请求本身，超时的
+    步骤记为 timeout；run 的 deadline 参数可限制整体时间或取消开播。开播请求
+    超时时无法确定是否已经开播，服务器也可能在下播之后才处理完开播：等开播
+    请求结束后下播，隔 late_start_grace 秒查询直播间状态，仍在直播则再次下播；
+    无法确认状态时结果的 live_unknown 为True。回滚不受取消影响。
+    run 是阻塞调用，可在脚本中直接使用，界面中应放到后台线程执行；
+    on_started 在调用 run 的线程中执行。
+    """
+
+    def __init__(
+        self,
+        api: BilibiliAPI,
+        validator: Optional[SessionValidator] = None,
+        deadlines: Optional[Dict[str, float]] = None,
+        verify_session: bool = True,
+        late_start_grace: float = LATE_START_GRACE,
+        late_rollback_attempts: int = LATE_ROLLBACK_ATTEMPTS,
+    ):
+        self.api = api
+        # 复用界面中已有的 SessionValidator 时可直接命中其缓存
+        self.validator = validator or SessionValidator(api)
+        self.deadlines = dict(DEFAULT_DEADLINES)
+        self.deadlines.update(deadlines or {})
+        self.verify_session = verify_session
+        self.late_start_grace = late_start_grace
+        self.late_rollback_attempts = late_rollback_attempts
+        self._executor = ThreadPoolExecutor(
+            max_workers=4, thread_name_prefix="go-live"
+        )
+
+    def close(self) -> None:
+        """不等待超时后仍在进行的请求"""
+        self._executor.shutdown(wait=False)
+
+    def run(
+        self,
+        room_id: int,
+        credential: Credential,
+        area_id: Optional[int],
+        title: str = "",
+        require_title: bool = False,
+        area_validator: Optional[Callable[[int], bool]] = None,
+        on_started: Optional[Callable[[GoLiveResult], None]] = None,
+        deadline: Optional[Deadline] = None,
+    ) -> GoLiveResult:
+        """执行开播，返回结构化结果；不抛出异常"""
+        started = time.perf_counter()
+        result = GoLiveResult(room_id)
+        try:
+            self._run(
+                result,
+                room_id,
+                credential,
+                area_id,
+                title,
+                require_title,
+                area_validator,
+                on_started,
+                deadline,
+            )
+        finally:
+            result.elapsed = time.perf_counter() - started
+        return result
+
+    def _run(
+        self,
+        result: GoLiveResult,
+        room_id: int,
+        credential: Credential,
+        area_id: Optional[int],
+        title: str,
+        require_title: bool,
+        area_validator: Optional[Callable[[int], bool]],
+        on_started: Optional[Callable[[GoLiveResult], None]],
+        deadline: Optional[Deadline],
+    ) -> None:
+        # 本地检查不发请求，失败时直接返回
+        if credential.is_expired():
+            result.fail(
+                result.add(StepResult(STEP_CREDENTIAL, STATUS_FAILED, "登录已过期"))
+            )
+        area = result.add(self._check_area(area_id, area_validator))
+        if not area.ok:
+            result.fail(area)
+        if require_title and len(title) > MAX_TITLE_LENGTH:
+            result.fail(
+                result.add(StepResult(STEP_TITLE, STATUS_FAILED, "标题超过20个字符"))
+            )
+        if result.failed_step is not None:
+            return
+        if deadline is not None and deadline.cancelled:
+            result.fail(result.add(StepResult(STEP_START, STATUS_FAILED, "已取消")))
+            return
+
+        # 登录校验、标题和开播互不依赖，同时发出；开播成功本身即证明登录有效，
+        # 登录校验只用于在开播失败时给出原因。要求标题时开播须等前两者成功
+        pending: Dict[str, Tuple[Future, float]] = {}
+        if self.verify_session:
+            pending[STEP_CREDENTIAL] = self._submit(
+                self._check_credential,
+                credential,
+                self._step_deadline(STEP_CREDENTIAL, deadline),
+            )
+        else:
+            result.add(StepResult(STEP_CREDENTIAL, STATUS_SKIPPED))
+        if title:
+            pending[STEP_TITLE] = self._submit(
+                self._update_title,
+                room_id,
+                title,
+                credential,
+                self._step_deadline(STEP_TITLE, deadline),
+            )
+        else:
+            result.add(StepResult(STEP_TITLE, STATUS_SKIPPED))
+        if require_title:
+            for name, step_submitted in pending.items():
+                result.add(self._wait(name, step_submitted))
+            pending = {}
+            # 登录校验只在确认失效时阻止开播，无法连接时仍由开播请求给出结果
+            check = result.steps[STEP_CREDENTIAL]
+            title_step = result.steps[STEP_TITLE]
+            if check.status == STATUS_FAILED:
+                result.fail(check)
+                return
+            if title_step.status in (STATUS_FAILED, STATUS_TIMEOUT):
+                result.fail(title_step)
+                return
+            if deadline is not None and deadline.cancelled:
+                result.fail(
+                    result.add(StepResult(STEP_START, STATUS_FAILED, "已取消"))
+                )
+                return
+        submitted = self._submit(
+            self.api.start_live,
+            room_id,
+            credential.csrf,
+            area_id,
+            credential,
+            self._step_deadline(STEP_START, deadline),
+        )
+
+        start = result.add(self._wait(STEP_START, submitted, self._start_step))
+        if start.status == STATUS_TIMEOUT:
+            # 客户端超时不代表服务器没有开播
+            self._rollback_uncertain_start(result, submitted[0], room_id, credential)
+        if start.ok:
+            result.stream_data = start.data
+        for name, step_submitted in pending.items():
+            result.add(self._wait(name, step_submitted))
+
+        if not start.ok:
+            check = result.steps.get(STEP_CREDENTIAL)
+            if check is not None and check.status == STATUS_FAILED:
+                result.fail(check)
+            result.fail(start)
+            return
+
+        # 开播后的步骤失败时下播回滚
+        confirm = result.add(self._confirm(result, on_started))
+        if not confirm.ok:
+            result.fail(confirm)
+            self._rollback(result, room_id, credential)
+            return
+        result.success = True
+
+    def _step_deadline(self, name: str, parent: Optional[Deadline]) -> Deadline:
+        return Deadline(self.deadlines.get(name), parent)
+
+    def _submit(self, fn: Callable, *args) -> Tuple[Future, float]:
+        """提交步骤，返回(future, 提交时刻)"""
+        return self._executor.submit(self._timed, fn, *args), time.perf_counter()
+
+    @staticmethod
+    def _timed(fn: Callable, *args):
+        start = time.perf_counter()
+        return fn(*args), time.perf_counter() - start
+
+    def _wait(
+        self,
+        name: str,
+        submitted: Tuple[Future, float],
+        convert: Optional[Callable[[object], StepResult]] = None,
+    ) -> StepResult:
+        """等待步骤完成，从提交时刻起超过时限返回 timeout 结果"""
+        future, submitted_at = submitted
+        deadline = self.deadlines.get(name)
+        remaining = None
+        if deadline is not None:
+            remaining = max(0.0, submitted_at + deadline - time.perf_counter())
+        try:
+            value, elapsed = future.result(timeout=remaining)
+        except (FutureTimeoutError, RequestTimeout):
+            return StepResult(
+                name,
+                STATUS_TIMEOUT,
+                f"超过{deadline:g}秒未完成" if deadline is not None else "请求超时",
+                elapsed=time.perf_counter() - submitted_at,
+            )
+        except RequestCancelled:
+            return StepResult(name, STATUS_FAILED, "已取消")
+        except Exception as e:
+            return StepResult(name, STATUS_FAILED, str(e) or type(e).__name__)
+        step = convert(value) if convert is not None else value
+        step.elapsed = elapsed
+        return step
+
+    def _check_credential(
+        self, credential: Credential, deadline: Deadline
+    ) -> StepResult:
+        status = self.validator.validate(credential, deadline=deadline)
+        if status.state == SESSION_INVALID:
+            return StepResult(STEP_CREDENTIAL, STATUS_FAILED, status.message)
+        # 无法连接时不阻止开播，由开播请求本身给出结果
+        return StepResult(STEP_CREDENTIAL, STATUS_OK, status.message)
+
+    def _update_title(
+        self, room_id: int, title: str, credential: Credential, deadline: Deadline
+    ) -> StepResult:
+        if self.api.update_live_title(
+            room_id, title, credential.csrf, credential, deadline
+        ):
+            return StepResult(STEP_TITLE, STATUS_OK)
+        return StepResult(STEP_TITLE, STATUS_FAILED, "标题更新失败")
+
+    @staticmethod
+    def _check_area(
+        area_id: Optional[int], area_validator: Optional[Callable[[int], bool]]
+    ) -> StepResult:
+        start = time.perf_counter()
+        if area_id is None:
+            step = StepResult(STEP_AREA, STATUS_FAILED, "未指定直播分区")
+        elif area_validator is not None and not area_validator(area_id):
+            step = StepResult(STEP_AREA, STATUS_FAILED, f"未知的直播分区: {area_id}")
+        else:
+            step = StepResult(STEP_AREA, STATUS_OK)
+        step.elapsed = time.perf_counter() - start
+        return step
+
+    @staticmethod
+    def _start_step(value) -> StepResult:
+        success, stream_data = value
+        if success:
+            return StepResult(STEP_START, STATUS_OK, data=stream_data)
+        message = (stream_data or {}).get("message") or "网络错误"
+        return StepResult(STEP_START, STATUS_FAILED, message, data=stream_data)
+
+    def _confirm(
+        self,
+        result: GoLiveResult,
+        on_started: Optional[Callable[[GoLiveResult], None]],
+    ) -> StepResult:
+        start = time.perf_counter()
+        if not (result.rtmp_addr and result.rtmp_code):
+            step = StepResult(STEP_CONFIRM, STATUS_FAILED, "未返回推流地址")
+        else:
+            step = StepResult(STEP_CONFIRM, STATUS_OK)
+            if on_started is not None:
+                try:
+                    on_started(result)
+                except Exception as e:
+                    step = StepResult(
+                        STEP_CONFIRM, STATUS_FAILED, str(e) or type(e).__name__
+                    )
+        step.elapsed = time.perf_counter() - start
+        return step
+
+    def _rollback(
+        self, result: GoLiveResult, room_id: int, credential: Credential
+    ) -> None:
+        # 回滚使用独立的时限，不继承已取消或已到期的开播令牌
+        submitted = self._submit(
+            self.api.stop_live,
+            room_id,
+            credential.csrf,
+            credential,
+            self._step_deadline(STEP_ROLLBACK, None),
+        )
+        step = result.add(
+            self._wait(
+                STEP_ROLLBACK,
+                submitted,
+                lambda stopped: StepResult(
+                    STEP_ROLLBACK,
+                    STATUS_OK if stopped else STATUS_FAILED,
+                    "" if stopped else "回滚下播失败，请手动停止直播",
+                ),
+            )
+        )
+        result.rolled_back = step.ok
+
+    def _rollback_uncertain_start(
+        self,
+        result: GoLiveResult,
+        future: Future,
+        room_id: int,
+        credential: Credential,
+    ) -> None:
+        """开播请求超时后下播，并查询直播间状态确认没有留下直播
+
+        服务器可能在处理开播的同时收到下播，先生效的下播会被之后生效的开播覆盖，
+        所以每次下播后等待 late_start_grace 秒再查询，仍在直播则再次下播。
+        """
+        started = time.perf_counter()
+        try:
+            (success, data), _ = future.result(
+                timeout=self.deadlines.get(STEP_ROLLBACK)
+            )
+        except Exception:
+            success, data = None, None  # 超时或网络错误，服务器可能已处理
+        if success is False and data is not None:
+            return  # 服务器明确拒绝了开播
+
+        live_status = None
+        for _ in range(max(1, self.late_rollback_attempts)):
+            self._stop_quietly(room_id, credential)
+            time.sleep(self.late_start_grace)
+            live_status = self._live_status(room_id)
+            if live_status != LIVE_STATUS_LIVE:
+                break
+
+        if live_status is None:
+            result.live_unknown = True
+            step = StepResult(
+                STEP_ROLLBACK,
+                STATUS_FAILED,
+                "开播请求超时，已尝试下播但无法确认直播间状态，请检查是否仍在直播",
+            )
+        elif live_status == LIVE_STATUS_LIVE:
+            step = StepResult(
+                STEP_ROLLBACK, STATUS_FAILED, "开播请求超时，回滚下播失败，请手动停止直播"
+            )
+        else:
+            step = StepResult(STEP_ROLLBACK, STATUS_OK, "开播请求超时，已确认直播间未在直播")
+        step.elapsed = time.perf_counter() - started
+        result.add(step)
+        result.rolled_back = step.ok
+
+    def _stop_quietly(self, room_id: int, credential: Credential) -> bool:
+        try:
+            return self.api.stop_live(
+                room_id,
+                credential.csrf,
+                credential,
+                self._step_deadline(STEP_ROLLBACK, None),
+            )
+        except Exception:
+            return False
+
+    def _live_status(self, room_id: int) -> Optional[int]:
+        try:
+            return self.api.get_live_status(
+                room_id, self._step_deadline(STEP_ROLLBACK, None)
+            )
+        except Exception:
+            return None
@@ -0,0 +1,141 @@
+"""
+日志环形缓冲区和后台轮转文件输出
+"""
+
+import logging
+import os
+import queue
+import threading
+import time
+from collections import deque
+from logging.handlers import QueueHandler, QueueListener, RotatingFileHandler
+from typing import List, Optional
+
+LEVEL_NAMES = {
+    logging.DEBUG: "调试",
+    logging.INFO: "信息",
+    logging.WARNING: "警告",
+    logging.ERROR: "错误",
+}
+
+
+class LogEntry:
+    """一条日志"""
+
+    __slots__ = ("seq", "created", "level", "message")
+
+    def __init__(self, seq: int, created: float, level: int, message: str):
+        self.seq = seq
+        self.created = created
+        self.level = level
+        self.message = message
+
+    def format(self) -> str:
+        stamp = time.strftime("%H:%M:%S", time.localtime(self.created))
+        return f"{stamp} [{LEVEL_NAMES.get(self.level, self.level)}] {self.message}"
+
+
+class LogBuffer:
+    """固定容量的日志缓冲区，超出容量时丢弃最旧的日志，可在任意线程写入"""
+
+    def __init__(self, capacity: int = 2000):
+        self.capacity = capacity
+        self._entries: deque = deque(maxlen=capacity)
+        self._lock = threading.Lock()
+        self._seq = 0
+
+    @property
+    def last_seq(self) -> int:
+        return self._seq
+
+    def append(self, level: int, message: str) -> LogEntry:
+        with self._lock:
+            self._seq += 1
+            entry = LogEntry(self._seq, time.time(), level, message)
+            self._entries.append(entry)
+        return entry
+
+    def since(self, seq: int) -> List[LogEntry]:
+        """序号大于seq的日志（已被挤出缓冲区的不再返回）"""
+        with self._lock:
+            if seq >= self._seq:
+                return []
+            count = min(self._seq - seq, len(self._entries))
+            return list(self._entries)[-count:]
+
+    def entries(self, min_level: int = logging.NOTSET, text: str = "") -> List[LogEntry]:
+        """按最低级别和关键字过滤的日志"""
+        with self._lock:
+            snapshot = list(self._entries)
+        text = text.lower()
+        return [
+            entry
+            for entry in snapshot
+            if entry.level >= min_level and (not text or text in entry.message.lower())
+        ]
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+class FileLogSink:
+    """后台线程写入的轮转日志文件
+
+    write 只把日志放入队列，格式化和磁盘写入在 QueueListener 线程中完成，
+    不会阻塞界面线程。
+    """
+
+    def __init__(
+        self,
+        path: str,
+        max_bytes: int = 1024 * 1024,
+        backup_count: int = 3,
+    ):
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self.path = path
+        file_handler = RotatingFileHandler(
+            path, maxBytes=max_bytes, backupCount=backup_count, encoding="utf-8"
+        )
+        file_handler.setFormatter(
+            logging.Formatter("%(asctime)s [%(levelname)s] %(message)s")
+        )
+        self._queue: queue.Queue = queue.Queue(-1)
+        self._handler = QueueHandler(self._queue)
+        self._listener = QueueListener(self._queue, file_handler)
+        self._file_handler = file_handler
+        self._listener.start()
+
+    def write(self, entry: LogEntry) -> None:
+        record = logging.LogRecord(
+            "bililive", entry.level, "", 0, entry.message, None, None
+        )
+        record.created = entry.created
+        self._handler.handle(record)
+
+    def close(self) -> None:
+        """写完队列中剩余的日志后关闭文件"""
+        self._listener.stop()
+        self._file_handler.close()
+
+
+class LogStore:
+    """界面日志的存储：环形缓冲区加可选的文件输出"""
+
+    def __init__(self, capacity: int = 2000, sink: Optional[FileLogSink] = None):
+        self.buffer = LogBuffer(capacity)
+        self.sink = sink
+
+    def log(self, level: int, message: str) -> LogEntry:
+        entry = self.buffer.append(level, message)
+        if self.sink is not None:
+            self.sink.write(entry)
+        return entry
+
+    def close(self) -> None:
+        if self.sink is not None:
+            self.sink.close()
+            self.sink = None
@@ -0,0 +1,211 @@
+"""
+分区数据的紧凑二进制缓存
+
+文件格式（小端）:
+    文件头    magic(4s) version(H) theme_count(I) record_count(I) strings_size(I)
+    主题表    theme_count 条定长记录: id, name, first_record, record_count
+    分区表    record_count 条定长记录: id, name, pinyin, theme_index, flags
+    字符串表  所有字符串的UTF-8拼接，记录中以(偏移, 长度)引用
+
+同一主题下的分区连续存放，按主题取分区列表时无需扫描整个文件。
+文件通过mmap映射，记录在访问时才解码。
+"""
+
+import mmap
+import os
+import struct
+from typing import Dict, Iterator, List, Optional, Union
+
+MAGIC = b"BLPC"
+VERSION = 1
+
+_HEADER = struct.Struct("<4sHIII")
+# id_off id_len name_off name_len first_record record_count
+_THEME = struct.Struct("<IHIHII")
+# id_off id_len name_off name_len pinyin_off pinyin_len theme_index flags
+_RECORD = struct.Struct("<IHIHIHHB")
+
+_FLAG_INT_ID = 1  # 原始数据中的ID为整数
+
+
+class PartitionRecord:
+    """分区记录，只保留搜索和开播需要的字段"""
+
+    __slots__ = ("id", "name", "pinyin", "parent", "seq")
+
+    def __init__(self, id, name: str, pinyin: str, parent: int, seq: int):
+        self.id = id
+        self.name = name
+        self.pinyin = pinyin
+        self.parent = parent  # 所属主题的序号
+        self.seq = seq
+
+
+class _StringTable:
+    """构建字符串表，相同字符串只存一份"""
+
+    def __init__(self):
+        self.buffer = bytearray()
+        self._offsets: Dict[str, tuple] = {}
+
+    def add(self, text: str) -> tuple:
+        ref = self._offsets.get(text)
+        if ref is None:
+            data = text.encode("utf-8")
+            ref = (len(self.buffer), len(data))
+            self.buffer += data
+            self._offsets[text] = ref
+        return ref
+
+
+def encode_partitions(partition_data: List[Dict]) -> bytes:
+    """把 Area/getList 的 data 字段编码为二进制缓存"""
+    strings = _StringTable()
+    themes = []
+    records = []
+    for theme_index, theme in enumerate(partition_data):
+        theme_id = strings.add(str(theme.get("id", "")))
+        theme_name = strings.add(theme.get("name", ""))
+        first = len(records)
+        for partition in theme.get("list", []):
+            raw_id = partition.get("id")
+            flags = _FLAG_INT_ID if isinstance(raw_id, int) else 0
+            records.append(
+                _RECORD.pack(
+                    *strings.add("" if raw_id is None else str(raw_id)),
+                    *strings.add(partition.get("name", "")),
+                    *strings.add(partition.get("pinyin", "")),
+                    theme_index,
+                    flags,
+                )
+            )
+        count = len(records) - first
+        themes.append(_THEME.pack(*theme_id, *theme_name, first, count))
+
+    header = _HEADER.pack(
+        MAGIC, VERSION, len(themes), len(records), len(strings.buffer)
+    )
+    return b"".join([header, *themes, *records, bytes(strings.buffer)])
+
+
+class PartitionTable:
+    """只读的分区表视图，底层可以是mmap或bytes"""
+
+    def __init__(self, buffer: Union[bytes, mmap.mmap], mapped_file=None):
+        self._buffer = buffer
+        self._file = mapped_file
+        magic, version, self.theme_count, self.record_count, strings_size = (
+            _HEADER.unpack_from(buffer, 0)
+        )
+        if magic != MAGIC or version != VERSION:
+            raise ValueError("不支持的分区缓存格式")
+        self._themes_offset = _HEADER.size
+        self._records_offset = self._themes_offset + self.theme_count * _THEME.size
+        self._strings_offset = self._records_offset + self.record_count * _RECORD.size
+        if self._strings_offset + strings_size > len(buffer):
+            raise ValueError("分区缓存文件已损坏")
+
+    @classmethod
+    def open(cls, path: str) -> "PartitionTable":
+        """以内存映射方式打开缓存文件"""
+        f = open(path, "rb")
+        try:
+            mapped = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+            return cls(mapped, f)
+        except Exception:
+            f.close()
+            raise
+
+    @classmethod
+    def from_partitions(cls, partition_data: List[Dict]) -> "PartitionTable":
+        """从JSON结构直接构建内存中的分区表"""
+        return cls(encode_partitions(partition_data))
+
+    def close(self) -> None:
+        """释放内存映射"""
+        if isinstance(self._buffer, mmap.mmap):
+            self._buffer.close()
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+    def __len__(self) -> int:
+        return self.record_count
+
+    def _string(self, offset: int, length: int) -> str:
+        start = self._strings_offset + offset
+        return self._buffer[start : start + length].decode("utf-8")
+
+    def _theme_entry(self, index: int) -> tuple:
+        offset = self._themes_offset + index * _THEME.size
+        return _THEME.unpack_from(self._buffer, offset)
+
+    def theme_name(self, index: int) -> str:
+        """主题名称"""
+        entry = self._theme_entry(index)
+        return self._string(entry[2], entry[3])
+
+    def theme_id(self, index: int) -> str:
+        """主题ID"""
+        entry = self._theme_entry(index)
+        return self._string(entry[0], entry[1])
+
+    def theme_names(self) -> List[str]:
+        """所有主题名称"""
+        return [self.theme_name(i) for i in range(self.theme_count)]
+
+    def theme_range(self, index: int) -> range:
+        """主题下分区的记录序号范围"""
+        entry = self._theme_entry(index)
+        return range(entry[4], entry[4] + entry[5])
+
+    def record(self, seq: int) -> PartitionRecord:
+        """解码单条分区记录"""
+        offset = self._records_offset + seq * _RECORD.size
+        (id_off, id_len, name_off, name_len, py_off, py_len, parent, flags) = (
+            _RECORD.unpack_from(self._buffer, offset)
+        )
+        raw_id = self._string(id_off, id_len)
+        partition_id = int(raw_id) if flags & _FLAG_INT_ID else raw_id
+        return PartitionRecord(
+            partition_id,
+            self._string(name_off, name_len),
+            self._string(py_off, py_len),
+            parent,
+            seq,
+        )
+
+    def records(self, seqs: Optional[range] = None) -> Iterator[PartitionRecord]:
+        """按序号解码分区记录"""
+        for seq in seqs if seqs is not None else range(self.record_count):
+            yield self.record(seq)
+
+    def to_partition_data(self) -> List[Dict]:
+        """还原为 Area/getList 的 data 结构（仅包含缓存的字段）"""
+        data = []
+        for index in range(self.theme_count):
+            theme_id = self.theme_id(index)
+            data.append(
+                {
+                    "id": int(theme_id) if theme_id.isdigit() else theme_id,
+                    "name": self.theme_name(index),
+                    "list": [
+                        {
+                            "id": record.id,
+                            "parent_id": theme_id,
+                            "name": record.name,
+                            "pinyin": record.pinyin,
+                        }
+                        for record in self.records(self.theme_range(index))
+                    ],
+                }
+            )
+        return data
+
+
+def write_cache(path: str, data: bytes) -> None:
+    """原子地写入缓存文件"""
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(data)
+    os.replace(tmp_path, path)
@@ -2,107 +2,319 @@
 分区搜索相关功能
 """
 
+import hashlib
 import json
-import re
 import os
-from typing import List, Dict, Optional
+import time
+from typing import List, Dict, Optional, Set, Tuple
+
+from src.core.partition_cache import (
+    PartitionRecord,
+    PartitionTable,
+    encode_partitions,
+    write_cache,
+)
+from src.core.pinyin_matcher import PinyinMatcher
+
+# 子串搜索倒排索引使用的n-gram长度
+NGRAM_SIZE = 2
+
+
+def _ngrams(text: str, n: int = NGRAM_SIZE) -> Set[str]:
+    """切分文本的n-gram集合，短于n的文本整体作为一个gram"""
+    if len(text) <= n:
+        return {text} if text else set()
+    return {text[i : i + n] for i in range(len(text) - n + 1)}
 
 
 class PartitionManager:
-    """直播分区管理器"""
+    """直播分区管理器
+
+    分区数据保存为紧凑的二进制缓存（partition.bin）并通过mmap加载，
+    旧版的 partition.json 仍可导入，首次加载时自动迁移。
+    """
 
     def __init__(self, partition_file: str = "data/partition.json"):
         self.partition_file = partition_file
-        self.partition_data = None
+        base_path = os.path.splitext(partition_file)[0]
+        self.cache_file = base_path + ".bin"
+        self.meta_file = base_path + ".meta.json"
+        self.cache_meta: Dict = {}
+
+        self._table: Optional[PartitionTable] = None
+        self._theme_names: List[str] = []
+        self._theme_index: Dict[str, int] = {}
+        self._partition_data: Optional[List[Dict]] = None
+        self._reset_index()
+
         self.load_partition_data()
 
+    def _reset_index(self) -> None:
+        """清空索引，下次查询时重新构建"""
+        self._indexed = False
+        self._records: List[PartitionRecord] = []
+        self._name_index: Dict[Tuple[str, str], PartitionRecord] = {}
+        self._id_index: Dict[str, PartitionRecord] = {}
+        self._unigram_index: Dict[str, Set[int]] = {}
+        self._ngram_index: Dict[str, Set[int]] = {}
+        self._matcher = PinyinMatcher([])
+
+    @property
+    def partition_data(self) -> List[Dict]:
+        """Area/getList 结构的分区数据（兼容旧接口，按需生成）"""
+        if self._partition_data is None:
+            self._partition_data = self._table.to_partition_data()
+        return self._partition_data
+
     def load_partition_data(self) -> None:
-        """加载分区数据"""
+        """加载分区数据，优先使用二进制缓存"""
+        self._close_table()
+        table = None
+        if os.path.exists(self.cache_file) and not self._json_is_newer():
+            try:
+                table = PartitionTable.open(self.cache_file)
+            except (OSError, ValueError):
+                table = None
+        if table is None:
+            table = self._import_json()
+        self._set_table(table)
+        self.cache_meta = self._load_cache_meta()
+
+    def _json_is_newer(self) -> bool:
+        """JSON文件是否比二进制缓存新（例如被手动替换）"""
+        try:
+            return os.path.getmtime(self.partition_file) > os.path.getmtime(
+                self.cache_file
+            )
+        except OSError:
+            return False
+
+    def _import_json(self) -> PartitionTable:
+        """导入旧版JSON分区文件并迁移为二进制缓存"""
         try:
             with open(self.partition_file, "r", encoding="utf-8") as f:
-                self.partition_data = json.load(f).get("data", [])
+                partition_data = json.load(f).get("data", [])
         except FileNotFoundError:
-            self.partition_data = []
+            partition_data = []
+
+        encoded = encode_partitions(partition_data)
+        if partition_data:
+            try:
+                write_cache(self.cache_file, encoded)
+            except OSError:
+                pass
+        return PartitionTable(encoded)
+
+    def _set_table(self, table: PartitionTable) -> None:
+        self._table = table
+        self._theme_names = table.theme_names()
+        self._theme_index = {}
+        for index, name in enumerate(self._theme_names):
+            self._theme_index.setdefault(name, index)
+        self._partition_data = None
+        self._reset_index()
+
+    def _close_table(self) -> None:
+        if self._table is not None:
+            self._table.close()
+            self._table = None
+
+    def close(self) -> None:
+        """释放缓存文件的内存映射"""
+        self._close_table()
+
+    def _ensure_index(self) -> None:
+        """首次查询时构建名称、ID和子串搜索索引"""
+        if self._indexed:
+            return
+        self._indexed = True
+
+        self._records = list(self._table.records())
+        for record in self._records:
+            theme_name = self._theme_names[record.parent]
+            self._name_index.setdefault((theme_name, record.name), record)
+            self._id_index.setdefault(str(record.id), record)
+
+            for char in set(record.name):
+                self._unigram_index.setdefault(char, set()).add(record.seq)
+            for gram in _ngrams(record.name):
+                self._ngram_index.setdefault(gram, set()).add(record.seq)
+
+        self._matcher = PinyinMatcher(
+            (record.name, record.pinyin) for record in self._records
+        )
+
+    def _substring_candidates(self, search_word: str) -> Set[int]:
+        """通过倒排索引找出名称包含search_word的分区序号"""
+        if len(search_word) < NGRAM_SIZE:
+            return set(self._unigram_index.get(search_word, ()))
+
+        # 从最稀有的gram开始求交集，尽早缩小候选集
+        postings = sorted(
+            (self._ngram_index.get(gram, set()) for gram in _ngrams(search_word)),
+            key=len,
+        )
+        candidates = set(postings[0])
+        for posting in postings[1:]:
+            if not candidates:
+                break
+            candidates &= posting
+        # n-gram只保证必要条件，还需确认真正的子串关系
+        return {seq for seq in candidates if search_word in self._records[seq].name}
+
+    def _load_cache_meta(self) -> Dict:
+        """加载缓存元数据（下载时间、内容哈希、HTTP校验头）"""
+        try:
+            with open(self.meta_file, "r", encoding="utf-8") as f:
+                return json.load(f)
+        except (FileNotFoundError, ValueError):
+            return {}
+
+    def _save_cache_meta(self) -> None:
+        """保存缓存元数据"""
+        with open(self.meta_file, "w", encoding="utf-8") as f:
+            json.dump(self.cache_meta, f, ensure_ascii=False)
+
+    @staticmethod
+    def _content_hash(partition_data: List) -> str:
+        """计算分区数据的内容哈希，与字段顺序和格式无关"""
+        canonical = json.dumps(
+            partition_data, ensure_ascii=False, sort_keys=True, separators=(",", ":")
+        )
+        return hashlib.sha256(canonical.encode("utf-8")).hexdigest()
+
+    def is_cache_fresh(self, ttl: float) -> bool:
+        """本地分区缓存是否仍在有效期内"""
+        if not self._table.theme_count:
+            return False
+        fetched_at = self.cache_meta.get("fetched_at", 0)
+        return time.time() - fetched_at < ttl
+
+    def cache_validators(self) -> Dict:
+        """获取用于条件请求的校验头"""
+        return {
+            "etag": self.cache_meta.get("etag"),
+            "last_modified": self.cache_meta.get("last_modified"),
+        }
+
+    def mark_cache_fresh(self, validators: Optional[Dict] = None) -> None:
+        """服务器确认数据未变化时刷新缓存时间"""
+        self.cache_meta["fetched_at"] = time.time()
+        if validators:
+            self.cache_meta.update({k: v for k, v in validators.items() if v})
+        self._save_cache_meta()
 
     def get_all_themes(self) -> List[str]:
         """获取所有分区主题名称"""
-        if not self.partition_data:
-            return []
-        return [theme.get("name", "") for theme in self.partition_data]
+        return list(self._theme_names)
 
     def get_theme_partitions(self, theme_name: str) -> List[str]:
         """获取指定主题下的所有分区名称"""
-        if not self.partition_data:
+        theme_index = self._theme_index.get(theme_name)
+        if theme_index is None:
             return []
+        return [
+            record.name
+            for record in self._table.records(self._table.theme_range(theme_index))
+        ]
+
+    def _record_dict(self, record: PartitionRecord, score: Optional[int] = None):
+        result = {
+            "name": record.name,
+            "id": record.id,
+            "pinyin": record.pinyin,
+            "theme": self._theme_names[record.parent],
+        }
+        if score is not None:
+            result["score"] = score
+        return result
+
+    def get_partition_by_id(self, partition_id) -> Optional[Dict]:
+        """根据分区ID获取分区信息"""
+        self._ensure_index()
+        record = self._id_index.get(str(partition_id))
+        return self._record_dict(record) if record else None
 
-        for theme in self.partition_data:
-            if theme.get("name") == theme_name:
-                partition_list = theme.get("list", [])
-                return [partition.get("name", "") for partition in partition_list]
-        return []
+    def search_partitions(
+        self, search_word: str, theme_name: str, limit: Optional[int] = None
+    ) -> List[Dict]:
+        """在指定主题内搜索分区，按匹配程度排序
 
-    def search_partitions(self, search_word: str, theme_name: str) -> List[Dict]:
-        """搜索分区"""
-        if not self.partition_data or not search_word:
+        支持汉字子串、全拼前缀、首字母缩写（如 wzry）及音节前缀组合（如 wangzry）。
+        """
+        theme_index = self._theme_index.get(theme_name)
+        if theme_index is None or not search_word:
             return []
+        self._ensure_index()
 
-        results = []
-        input_pattern = self._get_pinyin_pattern(search_word)
-
-        for theme in self.partition_data:
-            if theme.get("name") == theme_name:
-                partition_list = theme.get("list", [])
-                for partition in partition_list:
-                    name = partition.get("name", "")
-                    pinyin_str = partition.get("pinyin", "")
-
-                    # 检查是否匹配汉字或拼音
-                    if search_word in name or self._match_pinyin(
-                        pinyin_str, input_pattern
-                    ):
-                        results.append(
-                            {
-                                "name": name,
-                                "id": partition.get("id"),
-                                "pinyin": pinyin_str,
-                            }
-                        )
-                break
+        # 同一主题的分区序号是连续的
+        theme_range = self._table.theme_range(theme_index)
+        span = (theme_range.start, theme_range.stop)
+        candidates = None
+        if not search_word.isascii():
+            # 汉字查询先用倒排索引缩小候选集
+            candidates = [
+                seq
+                for seq in self._substring_candidates(search_word)
+                if span[0] <= seq < span[1]
+            ]
+
+        return [
+            self._record_dict(self._records[seq], score)
+            for score, seq in self._matcher.search(
+                search_word, limit, candidates, span
+            )
+        ]
 
-        return results
+    def search_all(
+        self, search_word: str, limit: int = 20, offset: int = 0
+    ) -> List[Dict]:
+        """跨主题全局搜索分区，结果按匹配程度排序并标注所属主题，支持分页"""
+        if not search_word or limit <= 0:
+            return []
+        self._ensure_index()
+
+        candidates = None
+        if not search_word.isascii():
+            candidates = self._substring_candidates(search_word)
+
+        ranked = self._matcher.search(search_word, offset + limit, candidates)
+        return [
+            self._record_dict(self._records[seq], score)
+            for score, seq in ranked[offset:]
+        ]
 
     def get_partition_by_name(self, name: str, theme_name: str) -> Optional[int]:
         """根据分区名称获取分区ID"""
-        search_results = self.search_partitions(name, theme_name)
-        for result in search_results:
-            if result["name"] == name:
-                return result["id"]
-        return None
-
-    def _get_pinyin_pattern(self, input_word: str) -> Optional[re.Pattern]:
-        """获取拼音首字母的正则表达式"""
-        if not input_word.isalpha():
-            return None
-
-        input_lower = input_word.lower()
-        pattern = re.compile("".join(f"{c}.*" for c in input_lower), re.IGNORECASE)
-        return pattern
-
-    def _match_pinyin(self, word: str, pattern: Optional[re.Pattern]) -> bool:
-        """判断是否匹配拼音首字母"""
-        if pattern and pattern.match(word):
-            return True
-        return False
-
-    def update_partition_data(self, new_data: Dict) -> None:
-        """更新分区数据并保存到文件"""
+        self._ensure_index()
+        record = self._name_index.get((theme_name, name))
+        return record.id if record else None
+
+    def update_partition_data(
+        self, new_data: Dict, validators: Optional[Dict] = None
+    ) -> bool:
+        """更新分区数据并保存到缓存文件，内容未变化时跳过写入，返回数据是否有变化"""
 
         # 确保data目录存在
-        os.makedirs(os.path.dirname(self.partition_file), exist_ok=True)
+        os.makedirs(os.path.dirname(self.cache_file) or ".", exist_ok=True)
+
+        partition_data = new_data.get("data", [])
+        content_hash = self._content_hash(partition_data)
+        if content_hash == self.cache_meta.get("sha256") and os.path.exists(
+            self.cache_file
+        ):
+            self.mark_cache_fresh(validators)
+            return False
 
-        # 保存新数据到文件
-        with open(self.partition_file, "w", encoding="utf-8") as f:
-            json.dump(new_data, f, ensure_ascii=False, indent=2)
+        # 先换上内存中的新表再释放旧的内存映射（Windows下被映射的文件无法替换），
+        # 写入失败时查询仍使用新数据，下次更新会重新写入
+        encoded = encode_partitions(partition_data)
+        old_table = self._table
+        self._set_table(PartitionTable(encoded))
+        if old_table is not None:
+            old_table.close()
+        write_cache(self.cache_file, encoded)
 
-        # 重新加载数据到内存
-        self.partition_data = new_data.get("data", [])
+        self.cache_meta["sha256"] = content_hash
+        self.mark_cache_fresh(validators)
+        return True
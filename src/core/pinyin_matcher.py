@@ -0,0 +1,310 @@
+"""
+拼音匹配器：支持汉字子串、全拼前缀、首字母缩写和音节前缀组合的排序搜索
+"""
+
+import heapq
+import re
+from bisect import bisect_right
+from functools import lru_cache
+from typing import Iterable, List, Optional, Tuple
+
+# 汉语拼音音节表，用于把分区的全拼切分为音节（ü 记作 v）
+PINYIN_SYLLABLES = frozenset(
+    """
+    a ai an ang ao
+    ba bai ban bang bao bei ben beng bi bian biao bie bin bing bo bu
+    ca cai can cang cao ce cen ceng cha chai chan chang chao che chen cheng chi
+    chong chou chu chua chuai chuan chuang chui chun chuo ci cong cou cu cuan cui
+    cun cuo
+    da dai dan dang dao de dei den deng di dia dian diao die ding diu dong dou du
+    duan dui dun duo
+    e ei en eng er
+    fa fan fang fei fen feng fo fou fu
+    ga gai gan gang gao ge gei gen geng gong gou gu gua guai guan guang gui gun guo
+    ha hai han hang hao he hei hen heng hong hou hu hua huai huan huang hui hun huo
+    ji jia jian jiang jiao jie jin jing jiong jiu ju juan jue jun
+    ka kai kan kang kao ke kei ken keng kong kou ku kua kuai kuan kuang kui kun kuo
+    la lai lan lang lao le lei leng li lia lian liang liao lie lin ling liu lo long
+    lou lu luan lue lun luo lv lve
+    ma mai man mang mao me mei men meng mi mian miao mie min ming miu mo mou mu
+    na nai nan nang nao ne nei nen neng ni nian niang niao nie nin ning niu nong
+    nou nu nuan nue nuo nv nve
+    o ou
+    pa pai pan pang pao pei pen peng pi pian piao pie pin ping po pou pu
+    qi qia qian qiang qiao qie qin qing qiong qiu qu quan que qun
+    ran rang rao re ren reng ri rong rou ru rua ruan rui run ruo
+    sa sai san sang sao se sen seng sha shai shan shang shao she shei shen sheng
+    shi shou shu shua shuai shuan shuang shui shun shuo si song sou su suan sui sun
+    suo
+    ta tai tan tang tao te teng ti tian tiao tie ting tong tou tu tuan tui tun tuo
+    wa wai wan wang wei wen weng wo wu
+    xi xia xian xiang xiao xie xin xing xiong xiu xu xuan xue xun
+    ya yan yang yao ye yi yin ying yo yong you yu yuan yue yun
+    za zai zan zang zao ze zei zen zeng zha zhai zhan zhang zhao zhe zhei zhen
+    zheng zhi zhong zhou zhu zhua zhuai zhuan zhuang zhui zhun zhuo zi zong zou zu
+    zuan zui zun zuo
+    """.split()
+)
+_MAX_SYLLABLE_LEN = max(len(s) for s in PINYIN_SYLLABLES)
+
+# 匹配得分，越高越靠前
+SCORE_EXACT = 100
+SCORE_NAME_PREFIX = 90
+SCORE_INITIALS_PREFIX = 85
+SCORE_PINYIN_PREFIX = 80
+SCORE_SYLLABLE_PREFIX = 75
+SCORE_NAME_CONTAINS = 70
+SCORE_INITIALS_CONTAINS = 65
+SCORE_SYLLABLE_CONTAINS = 60
+SCORE_SUBSEQUENCE = 30
+
+
+def _letter_mask(text: str) -> int:
+    """字母位掩码，用于快速排除不可能匹配的候选"""
+    mask = 0
+    for char in text:
+        if "a" <= char <= "z":
+            mask |= 1 << (ord(char) - 97)
+    return mask
+
+
+def _name_tokens(name: str) -> List[str]:
+    """把分区名切分为汉字（单字）和连续的ASCII字母数字串"""
+    tokens = []
+    ascii_run = ""
+    for char in name:
+        if char.isascii():
+            if char.isalnum():
+                ascii_run += char.lower()
+            elif ascii_run:
+                tokens.append(ascii_run)
+                ascii_run = ""
+        else:
+            if ascii_run:
+                tokens.append(ascii_run)
+                ascii_run = ""
+            if char.isalpha():
+                tokens.append(char)
+    if ascii_run:
+        tokens.append(ascii_run)
+    return tokens
+
+
+def split_syllables(name: str, pinyin: str) -> Tuple[str, ...]:
+    """按分区名把全拼切分为音节：每个汉字对应一个音节，英文数字原样对应
+
+    无法与分区名对齐时退化为最长音节贪心切分。
+    """
+    pinyin = "".join(c for c in pinyin.lower() if c.isalnum())
+    if not pinyin:
+        return ()
+    tokens = _name_tokens(name)
+
+    @lru_cache(maxsize=None)
+    def align(token_index: int, pos: int) -> Optional[Tuple[str, ...]]:
+        if token_index == len(tokens):
+            return () if pos == len(pinyin) else None
+        token = tokens[token_index]
+        if token.isascii():
+            if pinyin.startswith(token, pos):
+                rest = align(token_index + 1, pos + len(token))
+                if rest is not None:
+                    return (token,) + rest
+            return None
+        for length in range(min(_MAX_SYLLABLE_LEN, len(pinyin) - pos), 0, -1):
+            syllable = pinyin[pos : pos + length]
+            if syllable in PINYIN_SYLLABLES:
+                rest = align(token_index + 1, pos + length)
+                if rest is not None:
+                    return (syllable,) + rest
+        return None
+
+    syllables = align(0, 0)
+    if syllables is not None:
+        return syllables
+
+    # 贪心切分兜底
+    result = []
+    pos = 0
+    while pos < len(pinyin):
+        for length in range(min(_MAX_SYLLABLE_LEN, len(pinyin) - pos), 0, -1):
+            if pinyin[pos : pos + length] in PINYIN_SYLLABLES:
+                break
+        else:
+            length = 1
+        result.append(pinyin[pos : pos + length])
+        pos += length
+    return tuple(result)
+
+
+def _match_syllable_prefixes(
+    query: str, syllables: Tuple[str, ...], start: int
+) -> bool:
+    """query能否由从start开始的连续音节各取一段非空前缀拼接而成，如 wzry、wangzry"""
+    if not query:
+        return True
+    if start >= len(syllables):
+        return False
+    syllable = syllables[start]
+    for length in range(min(len(syllable), len(query)), 0, -1):
+        if syllable[:length] == query[:length] and _match_syllable_prefixes(
+            query[length:], syllables, start + 1
+        ):
+            return True
+    return False
+
+
+def _is_subsequence(query: str, text: str) -> bool:
+    it = iter(text)
+    return all(char in it for char in query)
+
+
+class PinyinMatcher:
+    """预计算每个条目的拼音音节、首字母和字母掩码，对查询打分排序"""
+
+    __slots__ = (
+        "names",
+        "pinyins",
+        "syllables",
+        "initials",
+        "masks",
+        "_joined",
+        "_offsets",
+        "_joined_names",
+        "_name_offsets",
+    )
+
+    def __init__(self, entries: Iterable[Tuple[str, str]]):
+        self.names: List[str] = []
+        self.pinyins: List[str] = []
+        self.syllables: List[Tuple[str, ...]] = []
+        self.initials: List[str] = []
+        self.masks: List[int] = []
+        for name, pinyin in entries:
+            syllables = split_syllables(name, pinyin or "")
+            self.names.append(name)
+            self.pinyins.append("".join(syllables))
+            self.syllables.append(syllables)
+            self.initials.append("".join(s[0] for s in syllables))
+            self.masks.append(_letter_mask(self.pinyins[-1]))
+
+        # 所有全拼按行拼接，预筛选时由正则引擎在C层一次扫描整个区间
+        self._joined = "\n".join(self.pinyins) + "\n"
+        self._offsets: List[int] = []
+        offset = 0
+        for pinyin in self.pinyins:
+            self._offsets.append(offset)
+            offset += len(pinyin) + 1
+        self._offsets.append(offset)
+        # 小写名称同样按行拼接，用于名称本身的子串匹配（如 "CS:GO"）
+        self._joined_names = "\n".join(name.lower() for name in self.names) + "\n"
+        self._name_offsets: List[int] = []
+        offset = 0
+        for name in self.names:
+            self._name_offsets.append(offset)
+            offset += len(name) + 1
+        self._name_offsets.append(offset)
+
+    def __len__(self) -> int:
+        return len(self.names)
+
+    def score(self, index: int, query: str) -> int:
+        """计算单个条目的匹配得分，0表示不匹配"""
+        name = self.names[index]
+        if not query.isascii():
+            if name == query:
+                return SCORE_EXACT
+            if name.startswith(query):
+                return SCORE_NAME_PREFIX
+            return SCORE_NAME_CONTAINS if query in name else 0
+
+        query = query.lower()
+        lower_name = name.lower()
+        if query in lower_name:
+            if lower_name == query:
+                return SCORE_EXACT
+            if lower_name.startswith(query):
+                return SCORE_NAME_PREFIX
+            return SCORE_NAME_CONTAINS
+        # 查询中的字母必须都出现在拼音里
+        if _letter_mask(query) & ~self.masks[index]:
+            return 0
+
+        pinyin = self.pinyins[index]
+        initials = self.initials[index]
+        syllables = self.syllables[index]
+        if pinyin == query or initials == query:
+            return SCORE_EXACT
+        if initials.startswith(query):
+            return SCORE_INITIALS_PREFIX
+        if pinyin.startswith(query):
+            return SCORE_PINYIN_PREFIX
+        if _match_syllable_prefixes(query, syllables, 0):
+            return SCORE_SYLLABLE_PREFIX
+        if query in initials:
+            return SCORE_INITIALS_CONTAINS
+        for start in range(1, len(syllables)):
+            if syllables[start][0] == query[0] and _match_syllable_prefixes(
+                query, syllables, start
+            ):
+                return SCORE_SYLLABLE_CONTAINS
+        if _is_subsequence(query, pinyin):
+            return SCORE_SUBSEQUENCE
+        return 0
+
+    def _prefilter(self, query: str, start: int, end: int) -> List[int]:
+        """找出[start, end)区间内名称包含query或全拼包含query子序列的条目
+
+        除名称子串外，所有拼音匹配规则都要求query是全拼的子序列，
+        两者都不满足的条目无需逐条打分。
+        """
+        pattern = re.compile("[^\n]*?".join(re.escape(c) for c in query))
+        indices = set()
+        for match in pattern.finditer(
+            self._joined, self._offsets[start], self._offsets[end]
+        ):
+            indices.add(bisect_right(self._offsets, match.start()) - 1)
+        if "\n" not in query:
+            joined = self._joined_names
+            stop = self._name_offsets[end]
+            pos = joined.find(query, self._name_offsets[start], stop)
+            while pos != -1:
+                index = bisect_right(self._name_offsets, pos) - 1
+                indices.add(index)
+                pos = joined.find(query, self._name_offsets[index + 1], stop)
+        return sorted(indices)
+
+    def search(
+        self,
+        query: str,
+        limit: Optional[int] = None,
+        candidates: Optional[Iterable[int]] = None,
+        span: Optional[Tuple[int, int]] = None,
+    ) -> List[Tuple[int, int]]:
+        """搜索并排序，返回[(得分, 条目序号)]；limit给定时用堆只保留前k个
+
+        candidates 指定候选条目；span 指定连续的条目区间[start, end)，
+        英文查询时可在该区间内批量预筛选。
+        """
+        if not query:
+            return []
+        if candidates is not None:
+            indices = candidates
+        else:
+            start, end = span if span is not None else (0, len(self.names))
+            if query.isascii():
+                indices = self._prefilter(query.lower(), start, end)
+            else:
+                indices = range(start, end)
+
+        scored = []
+        for index in indices:
+            score = self.score(index, query)
+            if score:
+                # 得分高优先，同分时名称短、原始顺序靠前的优先
+                scored.append((-score, len(self.names[index]), index))
+        if limit is not None:
+            ranked = heapq.nsmallest(limit, scored)
+        else:
+            ranked = sorted(scored)
+        return [(-neg_score, index) for neg_score, _, index in ranked]
@@ -0,0 +1,322 @@
+"""
+二维码登录轮询：自适应间隔的状态机和可同时驱动多个登录会话的调度器
+"""
+
+import heapq
+import itertools
+import random
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, List, Optional, Tuple
+
+from src.core.bilibili_api import BilibiliAPI
+from src.core.credential import Credential
+from src.core.deadline import Deadline, RequestCancelled
+
+# check_qr_login 返回的状态码
+QR_SUCCESS = 0
+QR_SCANNED = 86090  # 已扫描，等待确认
+QR_UNSCANNED = 86101  # 未扫描
+QR_EXPIRED = 86038  # 二维码已失效
+QR_ERROR = -1  # 请求失败
+
+# 二维码有效期（秒）
+QR_LIFETIME = 180
+
+# 会话状态
+STATE_PENDING = "pending"  # 正在获取二维码
+STATE_WAITING = "waiting"  # 等待扫描
+STATE_SCANNED = "scanned"  # 已扫描，等待确认
+STATE_SUCCESS = "success"
+STATE_EXPIRED = "expired"
+STATE_FAILED = "failed"
+STATE_CANCELLED = "cancelled"
+
+FINAL_STATES = frozenset(
+    {STATE_SUCCESS, STATE_EXPIRED, STATE_FAILED, STATE_CANCELLED}
+)
+
+
+class PollPolicy:
+    """轮询策略参数"""
+
+    __slots__ = (
+        "unscanned_interval",
+        "scanned_interval",
+        "backoff_base",
+        "backoff_cap",
+        "max_failures",
+        "jitter",
+        "refresh_margin",
+        "max_refreshes",
+        "request_timeout",
+    )
+
+    def __init__(
+        self,
+        unscanned_interval: float = 3.0,
+        scanned_interval: float = 0.5,
+        backoff_base: float = 1.0,
+        backoff_cap: float = 15.0,
+        max_failures: int = 6,
+        jitter: float = 0.2,
+        refresh_margin: float = 10.0,
+        max_refreshes: int = 3,
+        request_timeout: float = 10.0,
+    ):
+        self.unscanned_interval = unscanned_interval  # 未扫描时慢速轮询
+        self.scanned_interval = scanned_interval  # 扫描后快速轮询，尽快拿到登录结果
+        self.backoff_base = backoff_base  # 连续失败时的退避基数
+        self.backoff_cap = backoff_cap
+        self.max_failures = max_failures  # 连续失败超过该次数后放弃
+        self.jitter = jitter  # 间隔的随机抖动比例，避免多个会话同时请求
+        self.refresh_margin = refresh_margin  # 距失效多少秒时提前换新二维码
+        self.max_refreshes = max_refreshes  # 最多自动换新二维码的次数
+        self.request_timeout = request_timeout  # 单次请求的时限，超时按临时错误退避
+
+
+class QRLoginSession:
+    """单个二维码登录会话的状态机
+
+    不做任何网络请求，只根据请求结果更新状态并给出下一次动作的延迟，
+    由 QRLoginScheduler 或其他驱动方执行请求。
+    """
+
+    def __init__(
+        self,
+        session_id: int,
+        policy: Optional[PollPolicy] = None,
+        rng: Optional[random.Random] = None,
+    ):
+        self.id = session_id
+        self.policy = policy or PollPolicy()
+        self._rng = rng or random.Random()
+
+        self.state = STATE_PENDING
+        self.qrcode_key: Optional[str] = None
+        self.url: Optional[str] = None
+        self.issued_at = 0.0
+        self.status_code: Optional[int] = None
+        self.credential: Optional[Credential] = None
+        self.error = ""
+        self.failures = 0
+        self.refreshes = 0
+        # 取消会话时一并取消，阻止尚未发出的请求
+        self.cancel_token = Deadline()
+
+    @property
+    def finished(self) -> bool:
+        return self.state in FINAL_STATES
+
+    @property
+    def can_refresh(self) -> bool:
+        """是否还能自动换新二维码"""
+        return self.refreshes < self.policy.max_refreshes
+
+    def refresh_at(self) -> float:
+        """需要换新二维码的时间点"""
+        return self.issued_at + QR_LIFETIME - self.policy.refresh_margin
+
+    def expires_at(self) -> float:
+        return self.issued_at + QR_LIFETIME
+
+    def needs_qrcode(self, now: float) -> bool:
+        """下一步是否应获取新的二维码而不是轮询"""
+        if self.state == STATE_PENDING:
+            return True
+        # 只在未扫描时提前换码，已扫描的二维码等用户确认；
+        # 换码次数用完后继续轮询，直到二维码失效
+        return (
+            self.state == STATE_WAITING
+            and self.can_refresh
+            and now >= self.refresh_at()
+        )
+
+    def set_qrcode(self, qr_data: Optional[Dict], now: float) -> Optional[float]:
+        """处理获取二维码的结果，返回下一步的延迟（None表示会话结束）"""
+        if self.finished:
+            return None
+        if not qr_data or "url" not in qr_data or "qrcode_key" not in qr_data:
+            return self.record_failure("获取二维码数据失败")
+        if self.qrcode_key is not None:
+            self.refreshes += 1
+        self.qrcode_key = qr_data["qrcode_key"]
+        self.url = qr_data["url"]
+        self.issued_at = now
+        self.state = STATE_WAITING
+        self.status_code = QR_UNSCANNED
+        self.failures = 0
+        return self.next_delay(now)
+
+    def handle_poll(
+        self, status_code: int, credential: Optional[Credential], now: float
+    ) -> Optional[float]:
+        """处理一次轮询结果，返回下一步的延迟（None表示会话结束）"""
+        if self.finished:
+            return None
+        self.status_code = status_code
+        if status_code == QR_SUCCESS and credential:
+            self.state = STATE_SUCCESS
+            self.credential = credential
+            return None
+        if status_code == QR_UNSCANNED and now >= self.expires_at():
+            status_code = QR_EXPIRED  # 服务器未报失效时按本地有效期判断
+            self.status_code = status_code
+        if status_code == QR_EXPIRED:
+            if not self.can_refresh:
+                self.state = STATE_EXPIRED
+                return None
+            self.state = STATE_PENDING
+            self.failures = 0
+            return 0.0
+        if status_code == QR_SCANNED:
+            self.state = STATE_SCANNED
+        elif status_code == QR_UNSCANNED:
+            self.state = STATE_WAITING
+        else:
+            return self.record_failure("检查登录状态失败")
+        self.failures = 0
+        return self.next_delay(now)
+
+    def record_failure(self, error: str) -> Optional[float]:
+        """临时错误：退避后重试，连续失败过多时放弃"""
+        self.failures += 1
+        self.error = error
+        if self.failures > self.policy.max_failures:
+            self.state = STATE_FAILED
+            return None
+        return self._jittered(
+            min(
+                self.policy.backoff_cap,
+                self.policy.backoff_base * 2 ** (self.failures - 1),
+            )
+        )
+
+    def next_delay(self, now: float) -> float:
+        """按当前状态计算到下一次请求的延迟"""
+        if self.state == STATE_PENDING:
+            return 0.0
+        if self.state == STATE_SCANNED:
+            return self._jittered(self.policy.scanned_interval)
+        # 未扫描时不晚于换码时间点，不能再换码时不晚于失效时间点
+        delay = self._jittered(self.policy.unscanned_interval)
+        deadline = self.refresh_at() if self.can_refresh else self.expires_at()
+        return max(0.0, min(delay, deadline - now))
+
+    def _jittered(self, delay: float) -> float:
+        jitter = self.policy.jitter
+        return delay * self._rng.uniform(1 - jitter, 1 + jitter)
+
+    def cancel(self) -> None:
+        self.cancel_token.cancel()
+        if not self.finished:
+            self.state = STATE_CANCELLED
+
+
+class QRLoginScheduler:
+    """用一个调度线程驱动任意多个登录会话
+
+    调度线程按到期时间维护最小堆，到期的会话交给线程池执行请求，
+    同一会话同一时刻只有一个请求在途。on_update 在线程池线程中回调，
+    界面代码需要自行转到界面线程。
+    """
+
+    def __init__(
+        self,
+        api: BilibiliAPI,
+        policy: Optional[PollPolicy] = None,
+        max_workers: int = 4,
+    ):
+        self.api = api
+        self.policy = policy or PollPolicy()
+        self._executor = ThreadPoolExecutor(
+            max_workers=max_workers, thread_name_prefix="qr-login"
+        )
+        self._ids = itertools.count(1)
+        self._heap: List[Tuple[float, int, QRLoginSession]] = []
+        self._listeners: Dict[int, Callable[[QRLoginSession], None]] = {}
+        self._cond = threading.Condition()
+        self._stopped = False
+        self._thread = threading.Thread(
+            target=self._run, name="qr-login-scheduler", daemon=True
+        )
+        self._thread.start()
+
+    def start_session(
+        self, on_update: Callable[[QRLoginSession], None]
+    ) -> QRLoginSession:
+        """开始新的登录会话，状态或二维码变化时回调 on_update"""
+        session = QRLoginSession(next(self._ids), self.policy)
+        with self._cond:
+            self._listeners[session.id] = on_update
+            self._schedule(session, 0.0)
+        return session
+
+    def cancel(self, session: QRLoginSession) -> None:
+        """取消会话，在途请求的结果会被丢弃"""
+        with self._cond:
+            session.cancel()
+            self._listeners.pop(session.id, None)
+
+    def active_sessions(self) -> int:
+        with self._cond:
+            return len(self._listeners)
+
+    def stop(self) -> None:
+        """停止调度线程并取消所有会话"""
+        with self._cond:
+            self._stopped = True
+            self._listeners.clear()
+            self._cond.notify()
+        self._thread.join(timeout=2)
+        self._executor.shutdown(wait=False)
+
+    def _schedule(self, session: QRLoginSession, delay: float) -> None:
+        heapq.heappush(self._heap, (time.monotonic() + delay, session.id, session))
+        self._cond.notify()
+
+    def _run(self) -> None:
+        while True:
+            with self._cond:
+                while not self._stopped:
+                    if self._heap:
+                        timeout = self._heap[0][0] - time.monotonic()
+                        if timeout <= 0:
+                            break
+                    else:
+                        timeout = None
+                    self._cond.wait(timeout)
+                if self._stopped:
+                    return
+                _, _, session = heapq.heappop(self._heap)
+                if session.finished or session.id not in self._listeners:
+                    continue
+            self._executor.submit(self._step, session)
+
+    def _step(self, session: QRLoginSession) -> None:
+        """执行会话的一次请求并安排下一次"""
+        deadline = session.cancel_token.child(self.policy.request_timeout)
+        try:
+            now = time.monotonic()
+            if session.needs_qrcode(now):
+                delay = session.set_qrcode(self.api.get_qrcode_data(deadline), now)
+            else:
+                status_code, credential = self.api.check_qr_login(
+                    session.qrcode_key, deadline
+                )
+                delay = session.handle_poll(status_code, credential, time.monotonic())
+        except RequestCancelled:
+            return
+        except Exception as e:
+            delay = session.record_failure(str(e))
+
+        with self._cond:
+            listener = self._listeners.get(session.id)
+            if listener is None or self._stopped:
+                return
+            if delay is None:
+                self._listeners.pop(session.id, None)
+            else:
+                self._schedule(session, delay)
+        listener(session)
@@ -0,0 +1,197 @@
+"""
+请求重试策略、重试预算和按主机的熔断器
+
+由 BilibiliAPI._request 使用：幂等的 GET/HEAD 在连接错误、超时和5xx时重试；
+POST（开播、下播、改标题等）只在请求确定没有发出（连接阶段失败）时重试，
+避免服务器已处理时重复执行。
+"""
+
+import random
+import threading
+import time
+from typing import Dict, FrozenSet, Optional
+
+import requests
+from urllib3.exceptions import NewConnectionError
+
+from src.core.deadline import RequestAborted, RequestTimeout
+
+IDEMPOTENT_METHODS: FrozenSet[str] = frozenset({"GET", "HEAD", "OPTIONS"})
+
+# 熔断器状态
+CIRCUIT_CLOSED = "closed"
+CIRCUIT_OPEN = "open"
+CIRCUIT_HALF_OPEN = "half_open"
+
+
+class CircuitOpen(RequestAborted):
+    """主机的熔断器处于打开状态，请求未发出"""
+
+    def __init__(self, host: str, retry_after: float):
+        super().__init__(f"{host} 暂时不可用，{retry_after:.1f}秒后重试")
+        self.host = host
+        self.retry_after = retry_after
+
+
+class RetryPolicy:
+    """重试策略参数"""
+
+    __slots__ = (
+        "max_attempts",
+        "backoff_base",
+        "backoff_cap",
+        "retry_statuses",
+        "budget_ratio",
+        "budget_cap",
+    )
+
+    def __init__(
+        self,
+        max_attempts: int = 3,
+        backoff_base: float = 0.2,
+        backoff_cap: float = 2.0,
+        retry_statuses: FrozenSet[int] = frozenset({500, 502, 503, 504}),
+        budget_ratio: float = 0.2,
+        budget_cap: float = 10.0,
+    ):
+        self.max_attempts = max_attempts  # 含首次请求的总次数，1表示不重试
+        self.backoff_base = backoff_base  # 第n次重试前等待 [0, base*2^(n-1)] 内的随机时间
+        self.backoff_cap = backoff_cap
+        # 412是风控拦截，重试只会加重，不在其中
+        self.retry_statuses = retry_statuses
+        self.budget_ratio = budget_ratio  # 每个请求为预算增加的重试次数
+        self.budget_cap = budget_cap  # 预算上限，也是初始可用的重试次数
+
+    def backoff(self, retry: int, rng: random.Random) -> float:
+        """第retry次重试前的等待时间（full jitter）"""
+        return rng.uniform(
+            0, min(self.backoff_cap, self.backoff_base * 2 ** (retry - 1))
+        )
+
+    def should_retry(self, method: str, error: Optional[Exception]) -> bool:
+        """判断失败是否可以重试；error为None表示收到了可重试的状态码"""
+        if isinstance(error, RequestAborted) and not isinstance(error, RequestTimeout):
+            return False  # 已取消或已熔断
+        if method in IDEMPOTENT_METHODS:
+            return True
+        return error is not None and not_sent(error)
+
+
+def not_sent(error: Exception) -> bool:
+    """请求是否确定没有发到服务器（连接建立阶段失败）"""
+    if isinstance(error, RequestTimeout):
+        error = error.__cause__
+    if isinstance(error, requests.ConnectTimeout):
+        return True
+    if isinstance(error, requests.ConnectionError) and error.args:
+        reason = getattr(error.args[0], "reason", None)
+        return isinstance(reason, NewConnectionError)
+    return False
+
+
+class RetryBudget:
+    """重试预算（令牌桶）
+
+    每个请求存入 ratio 个令牌，每次重试取出一个，令牌不足时不再重试。
+    服务端大面积故障时重试量被限制在正常请求量的 ratio 倍以内，不会放大故障。
+    """
+
+    def __init__(self, ratio: float = 0.2, cap: float = 10.0):
+        self.ratio = ratio
+        self.cap = cap
+        self._tokens = cap
+        self._lock = threading.Lock()
+
+    def deposit(self) -> None:
+        with self._lock:
+            self._tokens = min(self.cap, self._tokens + self.ratio)
+
+    def withdraw(self) -> bool:
+        with self._lock:
+            if self._tokens < 1:
+                return False
+            self._tokens -= 1
+            return True
+
+    @property
+    def tokens(self) -> float:
+        return self._tokens
+
+
+class _HostCircuit:
+    __slots__ = ("state", "failures", "opened_at", "probing")
+
+    def __init__(self):
+        self.state = CIRCUIT_CLOSED
+        self.failures = 0
+        self.opened_at = 0.0
+        self.probing = False
+
+
+class CircuitBreaker:
+    """按主机的熔断器
+
+    连续 failure_threshold 次失败（连接错误、超时、5xx）后打开，reset_timeout 秒内
+    该主机的请求直接抛出 CircuitOpen；之后进入半开状态，只放行一个探测请求，
+    成功则关闭，失败则重新打开。
+    """
+
+    def __init__(self, failure_threshold: int = 5, reset_timeout: float = 10.0):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self._hosts: Dict[str, _HostCircuit] = {}
+        self._lock = threading.Lock()
+
+    def state(self, host: str) -> str:
+        with self._lock:
+            circuit = self._hosts.get(host)
+            return circuit.state if circuit else CIRCUIT_CLOSED
+
+    def before_request(self, host: str) -> None:
+        """熔断时抛出 CircuitOpen，否则允许发出请求"""
+        with self._lock:
+            circuit = self._hosts.get(host)
+            if circuit is None or circuit.state == CIRCUIT_CLOSED:
+                return
+            now = time.monotonic()
+            if circuit.state == CIRCUIT_OPEN:
+                retry_after = circuit.opened_at + self.reset_timeout - now
+                if retry_after > 0:
+                    raise CircuitOpen(host, retry_after)
+                circuit.state = CIRCUIT_HALF_OPEN
+                circuit.probing = False
+            # 半开状态只允许一个探测请求
+            if circuit.probing:
+                raise CircuitOpen(host, self.reset_timeout)
+            circuit.probing = True
+
+    def record_success(self, host: str) -> None:
+        with self._lock:
+            circuit = self._hosts.get(host)
+            if circuit is not None:
+                circuit.state = CIRCUIT_CLOSED
+                circuit.failures = 0
+                circuit.probing = False
+
+    def record_failure(self, host: str) -> None:
+        with self._lock:
+            circuit = self._hosts.setdefault(host, _HostCircuit())
+            circuit.failures += 1
+            if (
+                circuit.state == CIRCUIT_HALF_OPEN
+                or circuit.failures >= self.failure_threshold
+            ):
+                circuit.state = CIRCUIT_OPEN
+                circuit.opened_at = time.monotonic()
+                circuit.probing = False
+
+    def release(self, host: str) -> None:
+        """请求因与主机无关的原因中止时释放半开状态的探测名额"""
+        with self._lock:
+            circuit = self._hosts.get(host)
+            if circuit is not None:
+                circuit.probing = False
+
+    def reset(self) -> None:
+        with self._lock:
+            self._hosts.clear()
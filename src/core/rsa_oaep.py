@@ -0,0 +1,76 @@
+"""
+纯Python实现的RSA-OAEP（SHA-256）公钥加密，仅用于生成cookie刷新所需的 correspondPath
+
+只需要用固定公钥加密一小段文本，不值得为此引入加密库依赖。
+"""
+
+import base64
+import hashlib
+import os
+from typing import Callable, Tuple
+
+_HASH = hashlib.sha256
+_HASH_LEN = 32
+
+
+def _read_der(data: bytes, offset: int) -> Tuple[int, bytes, int]:
+    """读取一个DER元素，返回(标签, 内容, 下一个元素的偏移)"""
+    tag = data[offset]
+    length = data[offset + 1]
+    offset += 2
+    if length & 0x80:
+        size = length & 0x7F
+        length = int.from_bytes(data[offset : offset + size], "big")
+        offset += size
+    return tag, data[offset : offset + length], offset + length
+
+
+def load_public_key(pem: str) -> Tuple[int, int]:
+    """解析 SubjectPublicKeyInfo 格式的PEM公钥，返回(模数n, 公钥指数e)"""
+    body = "".join(
+        line for line in pem.strip().splitlines() if not line.startswith("-----")
+    )
+    der = base64.b64decode(body)
+    _, spki, _ = _read_der(der, 0)
+    _, _, offset = _read_der(spki, 0)  # 跳过算法标识
+    _, bit_string, _ = _read_der(spki, offset)
+    _, rsa_key, _ = _read_der(bit_string[1:], 0)  # 第一个字节为未使用位数
+    _, modulus, offset = _read_der(rsa_key, 0)
+    _, exponent, _ = _read_der(rsa_key, offset)
+    return int.from_bytes(modulus, "big"), int.from_bytes(exponent, "big")
+
+
+def _mgf1(seed: bytes, length: int) -> bytes:
+    output = b""
+    counter = 0
+    while len(output) < length:
+        output += _HASH(seed + counter.to_bytes(4, "big")).digest()
+        counter += 1
+    return output[:length]
+
+
+def _xor(a: bytes, b: bytes) -> bytes:
+    return bytes(x ^ y for x, y in zip(a, b))
+
+
+def oaep_encrypt(
+    public_key: Tuple[int, int],
+    message: bytes,
+    label: bytes = b"",
+    randbytes: Callable[[int], bytes] = os.urandom,
+) -> bytes:
+    """RSAES-OAEP加密（RFC 8017，SHA-256和MGF1-SHA-256）"""
+    n, e = public_key
+    k = (n.bit_length() + 7) // 8
+    if len(message) > k - 2 * _HASH_LEN - 2:
+        raise ValueError("消息过长")
+
+    padding = b"\x00" * (k - len(message) - 2 * _HASH_LEN - 2)
+    data_block = _HASH(label).digest() + padding + b"\x01" + message
+    seed = randbytes(_HASH_LEN)
+    masked_db = _xor(data_block, _mgf1(seed, k - _HASH_LEN - 1))
+    masked_seed = _xor(seed, _mgf1(masked_db, _HASH_LEN))
+    encoded = b"\x00" + masked_seed + masked_db
+
+    cipher = pow(int.from_bytes(encoded, "big"), e, n)
+    return cipher.to_bytes(k, "big")
@@ -0,0 +1,231 @@
+"""
+登录状态的后台校验和cookie自动刷新
+
+流程参考B站网页端：先用导航栏接口确认cookie仍然有效，再查询是否需要刷新；
+需要刷新时用RSA-OAEP加密时间戳得到 correspondPath，取回 refresh_csrf，
+用刷新令牌换取新cookie，最后确认刷新使旧令牌失效。
+"""
+
+import threading
+import time
+from functools import lru_cache
+from typing import Callable, Dict, Optional, Tuple
+
+from src.core.bilibili_api import BilibiliAPI
+from src.core.credential import CODE_NOT_LOGGED_IN, Credential
+from src.core.deadline import Deadline, RequestAborted
+from src.core.rsa_oaep import load_public_key, oaep_encrypt
+
+SESSION_VALID = "valid"
+SESSION_INVALID = "invalid"  # 服务器确认cookie已失效，需要重新登录
+SESSION_UNKNOWN = "unknown"  # 网络错误等，无法判断
+
+BILIBILI_PUBLIC_KEY = """-----BEGIN PUBLIC KEY-----
+MIGfMA0GCSqGSIb3DQEBAQUAA4GNADCBiQKBgQDLgd2OAkcGVtoE3ThUREbio0Eg
+Uc/prcajMKXvkCKFCWhJYJcLkcM2DKKcSeFpD/j6Boy538YXnR6VhcuUJOhH2x71
+nzPjfdTcqMz7djHum0qSZA0AyCBDABUqCrfNgCiJ00Ra7GmRj+YCK1NJEuewlb40
+JNrRuoEUXpabUzGB8QIDAQAB
+-----END PUBLIC KEY-----"""
+
+
+@lru_cache(maxsize=1)
+def _bilibili_key() -> Tuple[int, int]:
+    return load_public_key(BILIBILI_PUBLIC_KEY)
+
+
+def correspond_path(timestamp_ms: int) -> str:
+    """加密 "refresh_<毫秒时间戳>" 得到 correspond 页面路径"""
+    return oaep_encrypt(_bilibili_key(), f"refresh_{timestamp_ms}".encode()).hex()
+
+
+class SessionStatus:
+    """一次登录状态检查的结果"""
+
+    __slots__ = ("state", "uid", "uname", "checked_at", "message")
+
+    def __init__(
+        self,
+        state: str,
+        uid: Optional[int] = None,
+        uname: str = "",
+        message: str = "",
+    ):
+        self.state = state
+        self.uid = uid
+        self.uname = uname
+        self.checked_at = time.time()
+        self.message = message
+
+    @property
+    def valid(self) -> bool:
+        return self.state == SESSION_VALID
+
+    def __repr__(self) -> str:
+        return f"<SessionStatus {self.state} uid={self.uid} {self.message}>"
+
+
+class SessionValidator:
+    """校验登录状态并在cookie临近过期或服务器要求时刷新
+
+    validate 的结果按凭据缓存 ttl 秒（无法判断的结果不缓存）。start 后由后台线程
+    立即检查一次，之后每 interval 秒检查一次；回调在后台线程中执行。
+    """
+
+    def __init__(
+        self,
+        api: BilibiliAPI,
+        ttl: float = 300.0,
+        interval: float = 1800.0,
+        refresh_margin: float = 3 * 24 * 3600,
+        on_status: Optional[Callable[[Credential, SessionStatus], None]] = None,
+        on_refreshed: Optional[Callable[[Credential, Credential], None]] = None,
+    ):
+        self.api = api
+        self.ttl = ttl
+        self.interval = interval
+        self.refresh_margin = refresh_margin  # SESSDATA剩余有效期低于该值时主动刷新
+        self.on_status = on_status
+        self.on_refreshed = on_refreshed
+        self._cache: Dict[str, Tuple[float, SessionStatus]] = {}
+        self._lock = threading.Lock()
+        self._wake = threading.Event()
+        self._stopped = False
+        self._thread: Optional[threading.Thread] = None
+
+    def validate(
+        self,
+        credential: Credential,
+        force: bool = False,
+        deadline: Optional[Deadline] = None,
+    ) -> SessionStatus:
+        """检查凭据是否仍然有效，超时或取消时返回 SESSION_UNKNOWN"""
+        key = credential.cookie_header
+        now = time.monotonic()
+        if not force:
+            with self._lock:
+                cached = self._cache.get(key)
+            if cached is not None and now - cached[0] < self.ttl:
+                return cached[1]
+
+        if credential.is_expired():
+            status = SessionStatus(
+                SESSION_INVALID, credential.uid, message="SESSDATA已过期"
+            )
+        else:
+            try:
+                code, data = self.api.get_nav_info(credential, deadline)
+            except RequestAborted as e:
+                return SessionStatus(SESSION_UNKNOWN, credential.uid, message=str(e))
+            if code == 0 and data and data.get("isLogin"):
+                status = SessionStatus(
+                    SESSION_VALID, data.get("mid"), data.get("uname", "")
+                )
+            elif code == CODE_NOT_LOGGED_IN or (code == 0 and data is not None):
+                status = SessionStatus(
+                    SESSION_INVALID, credential.uid, message="账号未登录"
+                )
+            else:
+                return SessionStatus(
+                    SESSION_UNKNOWN, credential.uid, message="无法连接服务器"
+                )
+
+        with self._lock:
+            self._cache = {key: (now, status)}  # 只保留当前凭据的结果
+        return status
+
+    def needs_refresh(
+        self, credential: Credential, deadline: Optional[Deadline] = None
+    ) -> Tuple[bool, Optional[Dict]]:
+        """是否需要刷新，返回(需要刷新, cookie/info 接口数据)"""
+        if not credential.refresh_token:
+            return False, None
+        info = self.api.get_cookie_refresh_info(credential, deadline)
+        if credential.is_expired(margin=self.refresh_margin):
+            return True, info
+        return bool(info and info.get("refresh")), info
+
+    def refresh(
+        self,
+        credential: Credential,
+        info: Optional[Dict] = None,
+        deadline: Optional[Deadline] = None,
+    ) -> Optional[Credential]:
+        """执行cookie刷新，成功时返回新凭据；超时或取消时抛出 RequestAborted"""
+        if not credential.refresh_token:
+            return None
+        if info is None:
+            info = self.api.get_cookie_refresh_info(credential, deadline)
+        timestamp = (info or {}).get("timestamp") or int(time.time() * 1000)
+        refresh_csrf = self.api.get_refresh_csrf(
+            credential, correspond_path(timestamp), deadline
+        )
+        if not refresh_csrf:
+            return None
+        new_credential = self.api.refresh_cookies(credential, refresh_csrf, deadline)
+        if new_credential is None:
+            return None
+        # 确认失败不影响新cookie的使用，旧令牌会在服务器端自然过期
+        try:
+            self.api.confirm_cookie_refresh(
+                new_credential, credential.refresh_token, deadline
+            )
+        except RequestAborted:
+            pass
+        return new_credential
+
+    def check(
+        self,
+        credential: Credential,
+        force: bool = False,
+        deadline: Optional[Deadline] = None,
+    ) -> Tuple[SessionStatus, Optional[Credential]]:
+        """校验并在需要时刷新，返回(状态, 新凭据或None)"""
+        status = self.validate(credential, force, deadline)
+        if not status.valid:
+            return status, None
+        needed, info = self.needs_refresh(credential, deadline)
+        if not needed:
+            return status, None
+        return status, self.refresh(credential, info, deadline)
+
+    def start(self, get_credential: Callable[[], Optional[Credential]]) -> None:
+        """启动后台检查线程，get_credential 返回当前凭据（未登录时为None）"""
+        if self._thread is not None:
+            return
+        self._thread = threading.Thread(
+            target=self._run,
+            args=(get_credential,),
+            name="session-validator",
+            daemon=True,
+        )
+        self._thread.start()
+
+    def trigger(self) -> None:
+        """让后台线程立即检查一次"""
+        self._wake.set()
+
+    def stop(self) -> None:
+        self._stopped = True
+        self._wake.set()
+        if self._thread is not None:
+            self._thread.join(timeout=2)
+
+    def _run(self, get_credential: Callable[[], Optional[Credential]]) -> None:
+        while not self._stopped:
+            credential = get_credential()
+            if credential is not None:
+                try:
+                    self._check_and_notify(credential)
+                except Exception:
+                    pass  # 下个周期重试
+            self._wake.wait(self.interval)
+            self._wake.clear()
+
+    def _check_and_notify(self, credential: Credential) -> None:
+        status, new_credential = self.check(credential)
+        if self._stopped:
+            return
+        if self.on_status is not None:
+            self.on_status(credential, status)
+        if new_credential is not None and self.on_refreshed is not None:
+            self.on_refreshed(credential, new_credential)
@@ -0,0 +1,431 @@
+"""
+基于SQLite的配置存储，支持多账号、按房间的设置和推流码以及直播历史
+"""
+
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+from contextlib import contextmanager
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+from src.core.config_manager import SQLITE_DB_NAME, ConfigManager, uid_from_cookies
+
+logger = logging.getLogger(__name__)
+
+SCHEMA_VERSION = 2
+
+# 全局设置使用的作用域，房间设置的作用域为 "room:<房间号>"
+GLOBAL_SCOPE = ""
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS meta (
+    key   TEXT PRIMARY KEY,
+    value TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS accounts (
+    uid        INTEGER PRIMARY KEY,
+    room_id    INTEGER NOT NULL,
+    cookies    TEXT NOT NULL,
+    csrf       TEXT NOT NULL,
+    is_active  INTEGER NOT NULL DEFAULT 0,
+    updated_at REAL NOT NULL,
+    refresh_token TEXT NOT NULL DEFAULT ''
+);
+CREATE INDEX IF NOT EXISTS idx_accounts_room_id ON accounts(room_id);
+CREATE TABLE IF NOT EXISTS settings (
+    scope TEXT NOT NULL,
+    key   TEXT NOT NULL,
+    value TEXT NOT NULL,
+    PRIMARY KEY (scope, key)
+);
+CREATE TABLE IF NOT EXISTS stream_codes (
+    room_id    INTEGER PRIMARY KEY,
+    rtmp_addr  TEXT NOT NULL,
+    rtmp_code  TEXT NOT NULL,
+    updated_at REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS live_sessions (
+    id         INTEGER PRIMARY KEY AUTOINCREMENT,
+    room_id    INTEGER NOT NULL,
+    area_id    INTEGER,
+    title      TEXT,
+    started_at REAL NOT NULL,
+    stopped_at REAL
+);
+CREATE INDEX IF NOT EXISTS idx_live_sessions_room_id
+    ON live_sessions(room_id, started_at);
+"""
+
+_UPSERT_SETTING = (
+    "INSERT INTO settings (scope, key, value) VALUES (?, ?, ?) "
+    "ON CONFLICT(scope, key) DO UPDATE SET value = excluded.value"
+)
+
+
+def _room_scope(room_id: int) -> str:
+    return f"room:{room_id}"
+
+
+def _login_row(row: Optional[Tuple]) -> Optional[Dict]:
+    """accounts表的一行转为 load_login_data 格式"""
+    if row is None:
+        return None
+    room_id, cookies, csrf, refresh_token = row
+    return {
+        "room_id": room_id,
+        "cookies": cookies,
+        "csrf": csrf,
+        "refresh_token": refresh_token,
+    }
+
+
+class SQLiteConfigManager(ConfigManager):
+    """SQLite版配置管理器，接口与 ConfigManager 相同
+
+    数据库使用WAL模式，所有修改都在事务中立即提交，不再整文件重写。
+    首次打开时自动迁移 cookies.json、config.json 和 stream_code.txt。
+    """
+
+    def __init__(self, config_dir: str = "data", db_name: str = SQLITE_DB_NAME):
+        os.makedirs(config_dir, exist_ok=True)
+        self.db_file = os.path.join(config_dir, db_name)
+        self._db_lock = threading.RLock()
+        # 手动管理事务；语句按SQL文本缓存在连接中，重复执行时无需重新编译
+        self._conn = sqlite3.connect(
+            self.db_file, check_same_thread=False, isolation_level=None
+        )
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(_SCHEMA)
+
+        super().__init__(config_dir)
+        self._migrate_legacy_files()
+        self._upgrade_schema()
+
+        # 全局设置常驻内存，读取时不访问数据库
+        self._config_data = self._load_scope(GLOBAL_SCOPE)
+
+    @contextmanager
+    def _transaction(self) -> Iterator[sqlite3.Connection]:
+        """持有锁执行一个写事务，异常时回滚"""
+        with self._db_lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                yield self._conn
+            except BaseException:
+                self._conn.execute("ROLLBACK")
+                raise
+            self._conn.execute("COMMIT")
+
+    def _migrate_legacy_files(self) -> None:
+        """一次性导入旧版JSON和文本文件中的数据"""
+        row = self._conn.execute(
+            "SELECT value FROM meta WHERE key = 'schema_version'"
+        ).fetchone()
+        if row is not None:
+            return
+
+        legacy_config = super().load_config()
+        legacy_login = super().load_login_data()
+        legacy_code = super().load_stream_code()
+
+        with self._transaction() as conn:
+            conn.executemany(
+                _UPSERT_SETTING,
+                [
+                    (GLOBAL_SCOPE, key, json.dumps(value, ensure_ascii=False))
+                    for key, value in legacy_config.items()
+                ],
+            )
+            if legacy_login:
+                try:
+                    self._upsert_account(
+                        conn,
+                        int(legacy_login["room_id"]),
+                        legacy_login["cookies"],
+                        legacy_login["csrf"],
+                        legacy_login.get("refresh_token", ""),
+                    )
+                except (KeyError, TypeError, ValueError):
+                    legacy_login = None
+            if legacy_login and legacy_code:
+                conn.execute(
+                    "INSERT OR REPLACE INTO stream_codes VALUES (?, ?, ?, ?)",
+                    (int(legacy_login["room_id"]), *legacy_code, time.time()),
+                )
+            conn.execute(
+                "INSERT INTO meta (key, value) VALUES ('schema_version', ?)",
+                (str(SCHEMA_VERSION),),
+            )
+
+    def _upgrade_schema(self) -> None:
+        """升级旧版本创建的数据库"""
+        columns = {
+            row[1] for row in self._conn.execute("PRAGMA table_info(accounts)")
+        }
+        if "refresh_token" in columns:
+            return
+        # 版本1没有 refresh_token 列
+        with self._transaction() as conn:
+            conn.execute(
+                "ALTER TABLE accounts ADD COLUMN refresh_token TEXT NOT NULL DEFAULT ''"
+            )
+            conn.execute(
+                "UPDATE meta SET value = ? WHERE key = 'schema_version'",
+                (str(SCHEMA_VERSION),),
+            )
+
+    def _load_scope(self, scope: str) -> Dict:
+        with self._db_lock:
+            rows = self._conn.execute(
+                "SELECT key, value FROM settings WHERE scope = ?", (scope,)
+            ).fetchall()
+        return {key: json.loads(value) for key, value in rows}
+
+    @staticmethod
+    def _upsert_account(
+        conn, room_id: int, cookies_str: str, csrf: str, refresh_token: str = ""
+    ) -> None:
+        # 没有UID的cookie（理论上不会出现）用房间号的负数占位，避免与真实UID冲突
+        uid = uid_from_cookies(cookies_str) or -room_id
+        conn.execute("UPDATE accounts SET is_active = 0 WHERE is_active = 1")
+        conn.execute(
+            "INSERT INTO accounts"
+            " (uid, room_id, cookies, csrf, is_active, updated_at, refresh_token)"
+            " VALUES (?, ?, ?, ?, 1, ?, ?) ON CONFLICT(uid) DO UPDATE SET"
+            " room_id = excluded.room_id, cookies = excluded.cookies,"
+            " csrf = excluded.csrf, is_active = 1, updated_at = excluded.updated_at,"
+            " refresh_token = excluded.refresh_token",
+            (uid, room_id, cookies_str, csrf, time.time(), refresh_token),
+        )
+
+    def _active_room_id(self) -> Optional[int]:
+        with self._db_lock:
+            row = self._conn.execute(
+                "SELECT room_id FROM accounts WHERE is_active = 1"
+            ).fetchone()
+        return row[0] if row else None
+
+    # 账号
+
+    def save_login_data(
+        self, room_id: int, cookies_str: str, csrf: str, refresh_token: str = ""
+    ) -> bool:
+        """保存登录数据并设为当前账号"""
+        try:
+            with self._transaction() as conn:
+                self._upsert_account(conn, room_id, cookies_str, csrf, refresh_token)
+            return True
+        except sqlite3.Error:
+            return False
+
+    def load_login_data(self) -> Optional[Dict]:
+        """加载当前账号的登录数据"""
+        with self._db_lock:
+            row = self._conn.execute(
+                "SELECT room_id, cookies, csrf, refresh_token FROM accounts"
+                " WHERE is_active = 1"
+            ).fetchone()
+        return _login_row(row)
+
+    def clear_login_data(self) -> bool:
+        """删除当前账号的登录数据及其推流码"""
+        try:
+            with self._transaction() as conn:
+                conn.execute(
+                    "DELETE FROM stream_codes WHERE room_id IN ("
+                    " SELECT room_id FROM accounts WHERE is_active = 1)"
+                )
+                conn.execute("DELETE FROM accounts WHERE is_active = 1")
+            return True
+        except sqlite3.Error:
+            return False
+
+    def list_accounts(self) -> List[Dict]:
+        """列出所有保存的账号"""
+        with self._db_lock:
+            rows = self._conn.execute(
+                "SELECT uid, room_id, is_active, updated_at FROM accounts"
+                " ORDER BY updated_at DESC"
+            ).fetchall()
+        return [
+            {
+                "uid": uid,
+                "room_id": room_id,
+                "active": bool(active),
+                "updated_at": updated_at,
+            }
+            for uid, room_id, active, updated_at in rows
+        ]
+
+    def switch_account(self, uid: int) -> bool:
+        """切换当前账号"""
+        with self._transaction() as conn:
+            if not conn.execute(
+                "SELECT 1 FROM accounts WHERE uid = ?", (uid,)
+            ).fetchone():
+                return False
+            conn.execute("UPDATE accounts SET is_active = (uid = ?)", (uid,))
+        return True
+
+    def get_account_by_room(self, room_id: int) -> Optional[Dict]:
+        """根据房间号查找账号的登录数据"""
+        with self._db_lock:
+            row = self._conn.execute(
+                "SELECT room_id, cookies, csrf, refresh_token FROM accounts"
+                " WHERE room_id = ?",
+                (room_id,),
+            ).fetchone()
+        return _login_row(row)
+
+    # 推流码
+
+    def save_stream_code(self, rtmp_addr: str, rtmp_code: str) -> bool:
+        """保存当前账号房间的推流码"""
+        room_id = self._active_room_id()
+        if room_id is None:
+            return False
+        try:
+            with self._transaction() as conn:
+                conn.execute(
+                    "INSERT OR REPLACE INTO stream_codes VALUES (?, ?, ?, ?)",
+                    (room_id, rtmp_addr, rtmp_code, time.time()),
+                )
+            return True
+        except sqlite3.Error:
+            return False
+
+    def load_stream_code(self) -> Optional[Tuple[str, str]]:
+        """读取当前账号房间的推流码"""
+        with self._db_lock:
+            row = self._conn.execute(
+                "SELECT s.rtmp_addr, s.rtmp_code FROM stream_codes s"
+                " JOIN accounts a ON a.room_id = s.room_id WHERE a.is_active = 1"
+            ).fetchone()
+        return (row[0], row[1]) if row else None
+
+    def clear_stream_code(self) -> bool:
+        """清除当前账号房间的推流码"""
+        room_id = self._active_room_id()
+        if room_id is None:
+            return True
+        try:
+            with self._transaction() as conn:
+                conn.execute("DELETE FROM stream_codes WHERE room_id = ?", (room_id,))
+            return True
+        except sqlite3.Error:
+            return False
+
+    # 设置
+
+    def load_config(self) -> Dict:
+        """加载全局设置"""
+        return self._load_scope(GLOBAL_SCOPE)
+
+    def save_config(self, config: Optional[Dict] = None) -> bool:
+        """保存全局设置（给定config时整体替换）"""
+        if config is None:
+            return True
+        try:
+            with self._transaction() as conn:
+                conn.execute("DELETE FROM settings WHERE scope = ?", (GLOBAL_SCOPE,))
+                conn.executemany(
+                    _UPSERT_SETTING,
+                    [
+                        (GLOBAL_SCOPE, key, json.dumps(value, ensure_ascii=False))
+                        for key, value in config.items()
+                    ],
+                )
+            self._config_data = dict(config)
+            return True
+        except sqlite3.Error:
+            return False
+
+    def flush(self) -> bool:
+        """每次修改都已提交，无需额外写入"""
+        return True
+
+    def set(self, key: str, value: Any) -> None:
+        """设置全局配置项并立即提交"""
+        if key in self._config_data and self._config_data[key] == value:
+            return
+        with self._transaction() as conn:
+            conn.execute(
+                _UPSERT_SETTING,
+                (GLOBAL_SCOPE, key, json.dumps(value, ensure_ascii=False)),
+            )
+        self._config_data[key] = value
+
+    def get_room_setting(self, room_id: int, key: str, default: Any = None) -> Any:
+        """获取房间设置项"""
+        with self._db_lock:
+            row = self._conn.execute(
+                "SELECT value FROM settings WHERE scope = ? AND key = ?",
+                (_room_scope(room_id), key),
+            ).fetchone()
+        return json.loads(row[0]) if row else default
+
+    def set_room_setting(self, room_id: int, key: str, value: Any) -> None:
+        """设置房间设置项"""
+        with self._transaction() as conn:
+            conn.execute(
+                _UPSERT_SETTING,
+                (_room_scope(room_id), key, json.dumps(value, ensure_ascii=False)),
+            )
+
+    # 直播历史
+
+    def record_live_start(
+        self, room_id: int, area_id: Optional[int] = None, title: str = ""
+    ) -> None:
+        """记录一次开播；直播历史只是辅助数据，写入失败只记录日志，不影响开播"""
+        try:
+            with self._transaction() as conn:
+                conn.execute(
+                    "INSERT INTO live_sessions (room_id, area_id, title, started_at)"
+                    " VALUES (?, ?, ?, ?)",
+                    (room_id, area_id, title, time.time()),
+                )
+        except sqlite3.Error as e:
+            logger.warning("记录房间 %s 的开播历史失败: %s", room_id, e)
+
+    def record_live_stop(self, room_id: int) -> None:
+        """为房间最近一次未结束的直播记录下播时间，写入失败只记录日志"""
+        try:
+            with self._transaction() as conn:
+                conn.execute(
+                    "UPDATE live_sessions SET stopped_at = ? WHERE id = ("
+                    " SELECT id FROM live_sessions"
+                    " WHERE room_id = ? AND stopped_at IS NULL"
+                    " ORDER BY started_at DESC LIMIT 1)",
+                    (time.time(), room_id),
+                )
+        except sqlite3.Error as e:
+            logger.warning("记录房间 %s 的下播历史失败: %s", room_id, e)
+
+    def list_live_sessions(self, room_id: int, limit: int = 20) -> List[Dict]:
+        """查询房间最近的直播记录"""
+        with self._db_lock:
+            rows = self._conn.execute(
+                "SELECT area_id, title, started_at, stopped_at FROM live_sessions"
+                " WHERE room_id = ? ORDER BY started_at DESC LIMIT ?",
+                (room_id, limit),
+            ).fetchall()
+        return [
+            {
+                "area_id": area_id,
+                "title": title,
+                "started_at": started_at,
+                "stopped_at": stopped_at,
+            }
+            for area_id, title, started_at, stopped_at in rows
+        ]
+
+    def close(self) -> None:
+        """关闭数据库连接"""
+        super().close()
+        with self._db_lock:
+            self._conn.close()
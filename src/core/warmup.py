@@ -0,0 +1,289 @@
+"""
+连接预热：会话级DNS缓存和后台保持连接池可用
+
+开播时的第一个请求如果要现做DNS解析、TCP和TLS握手，这段时间全部算在用户
+等待里。登录后提前解析并建立连接放入 requests 的连接池，之后在连接可能被
+服务器因空闲关闭前重新预热。
+"""
+
+import socket
+import sys
+import threading
+import time
+from typing import Callable, Dict, List, Optional, Tuple
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.connection import HTTPConnection, HTTPSConnection
+from urllib3.connectionpool import HTTPConnectionPool, HTTPSConnectionPool
+from urllib3.exceptions import (
+    ConnectTimeoutError,
+    NameResolutionError,
+    NewConnectionError,
+)
+from urllib3.util.connection import allowed_gai_family
+from urllib3.util.timeout import _DEFAULT_TIMEOUT
+
+from src.core.bilibili_api import BilibiliAPI
+
+_AddrInfo = List[Tuple]
+
+
+class DNSCache:
+    """按TTL缓存域名解析结果
+
+    标准库拿不到DNS记录本身的TTL，这里统一按 ttl 秒过期；解析失败的结果缓存
+    negative_ttl 秒。过期后重新解析失败时继续使用旧结果，避免DNS抖动导致开播失败。
+    只对 mount 过的 requests 会话生效，不影响进程中的其他网络请求。
+    """
+
+    def __init__(
+        self,
+        ttl: float = 300.0,
+        negative_ttl: float = 5.0,
+        resolver: Optional[Callable[..., _AddrInfo]] = None,
+    ):
+        self.ttl = ttl
+        self.negative_ttl = negative_ttl
+        self._resolver = resolver
+        self._cache: Dict[Tuple, Tuple[float, Optional[_AddrInfo]]] = {}
+        self._lock = threading.Lock()
+        self._pool_classes: Optional[Dict[str, type]] = None
+        self.hits = 0
+        self.misses = 0
+
+    def getaddrinfo(
+        self, host, port, family=0, type=0, proto=0, flags=0
+    ) -> _AddrInfo:
+        """与 socket.getaddrinfo 签名一致"""
+        key = (host, port, family, type, proto, flags)
+        now = time.monotonic()
+        with self._lock:
+            cached = self._cache.get(key)
+            fresh = cached is not None and now < cached[0]
+            if fresh:
+                self.hits += 1
+            else:
+                self.misses += 1
+        if fresh:
+            if cached[1] is None:
+                raise socket.gaierror(socket.EAI_NONAME, "cached lookup failure")
+            return list(cached[1])
+
+        resolver = self._resolver or socket.getaddrinfo
+        try:
+            result = resolver(host, port, family, type, proto, flags)
+        except socket.gaierror:
+            if cached is not None and cached[1] is not None:
+                return list(cached[1])  # 解析失败时沿用过期结果
+            with self._lock:
+                self._cache[key] = (now + self.negative_ttl, None)
+            raise
+        with self._lock:
+            self._cache[key] = (now + self.ttl, list(result))
+        return result
+
+    def clear(self) -> None:
+        with self._lock:
+            self._cache.clear()
+
+    def create_connection(
+        self,
+        address: Tuple[str, int],
+        timeout=_DEFAULT_TIMEOUT,
+        source_address: Optional[Tuple[str, int]] = None,
+        socket_options: Optional[List[Tuple]] = None,
+    ) -> socket.socket:
+        """与 urllib3.util.connection.create_connection 相同，只是经由本缓存解析"""
+        host, port = address
+        if host.startswith("["):
+            host = host.strip("[]")
+        error: Optional[OSError] = None
+        for family, socktype, proto, _, sockaddr in self.getaddrinfo(
+            host, port, allowed_gai_family(), socket.SOCK_STREAM
+        ):
+            sock = None
+            try:
+                sock = socket.socket(family, socktype, proto)
+                for option in socket_options or ():
+                    sock.setsockopt(*option)
+                if timeout is not _DEFAULT_TIMEOUT:
+                    sock.settimeout(timeout)
+                if source_address:
+                    sock.bind(source_address)
+                sock.connect(sockaddr)
+                return sock
+            except OSError as e:
+                error = e
+                if sock is not None:
+                    sock.close()
+        if error is not None:
+            raise error
+        raise OSError("getaddrinfo returns an empty list")
+
+    def mount(self, session: requests.Session) -> "DNSCache":
+        """让会话的 http/https 连接经由本缓存解析域名，保留原有的连接池大小"""
+        for prefix in ("https://", "http://"):
+            old = session.get_adapter(prefix)
+            adapter = DNSCachingAdapter(
+                self,
+                pool_connections=getattr(old, "_pool_connections", 10),
+                pool_maxsize=getattr(old, "_pool_maxsize", 10),
+                max_retries=getattr(old, "max_retries", 0),
+                pool_block=getattr(old, "_pool_block", False),
+            )
+            session.mount(prefix, adapter)
+            old.close()
+        return self
+
+    def pool_classes(self) -> Dict[str, type]:
+        """绑定到本缓存的 urllib3 连接池类，供 PoolManager.pool_classes_by_scheme 使用"""
+        if self._pool_classes is None:
+            attrs = {"dns_cache": self}
+            http_conn = type("CachedHTTPConnection", (_CachedHTTPConnection,), attrs)
+            https_conn = type(
+                "CachedHTTPSConnection", (_CachedHTTPSConnection,), attrs
+            )
+            self._pool_classes = {
+                "http": type(
+                    "CachedHTTPConnectionPool",
+                    (HTTPConnectionPool,),
+                    {"ConnectionCls": http_conn},
+                ),
+                "https": type(
+                    "CachedHTTPSConnectionPool",
+                    (HTTPSConnectionPool,),
+                    {"ConnectionCls": https_conn},
+                ),
+            }
+        return self._pool_classes
+
+
+class _CachedConnectionMixin:
+    """建立连接时经由 dns_cache 解析域名，异常与 urllib3 原实现一致"""
+
+    dns_cache: DNSCache
+
+    def _new_conn(self) -> socket.socket:
+        try:
+            sock = self.dns_cache.create_connection(
+                (self._dns_host, self.port),
+                self.timeout,
+                source_address=self.source_address,
+                socket_options=self.socket_options,
+            )
+        except socket.gaierror as e:
+            raise NameResolutionError(self.host, self, e) from e
+        except socket.timeout as e:
+            raise ConnectTimeoutError(
+                self,
+                f"Connection to {self.host} timed out. (connect timeout={self.timeout})",
+            ) from e
+        except OSError as e:
+            raise NewConnectionError(
+                self, f"Failed to establish a new connection: {e}"
+            ) from e
+        sys.audit("http.client.connect", self, self.host, self.port)
+        return sock
+
+
+class _CachedHTTPConnection(_CachedConnectionMixin, HTTPConnection):
+    pass
+
+
+class _CachedHTTPSConnection(_CachedConnectionMixin, HTTPSConnection):
+    pass
+
+
+class DNSCachingAdapter(HTTPAdapter):
+    """新建连接时使用 DNSCache 解析域名的 HTTPAdapter"""
+
+    def __init__(self, dns_cache: DNSCache, **kwargs):
+        self.dns_cache = dns_cache
+        super().__init__(**kwargs)
+
+    def init_poolmanager(self, *args, **kwargs) -> None:
+        super().init_poolmanager(*args, **kwargs)
+        self.poolmanager.pool_classes_by_scheme = self.dns_cache.pool_classes()
+
+
+class ConnectionWarmer:
+    """在后台保持到各API主机的连接处于可用状态
+
+    会话 mount 了 DNSCache 时预热请求的解析结果随之缓存。start 后立即预热一次，
+    之后每隔 idle_timeout 的一半检查一次，只预热超过
+    idle_timeout 秒没有请求的主机。idle_timeout 应小于服务器的keep-alive超时。
+    """
+
+    def __init__(
+        self,
+        api: BilibiliAPI,
+        hosts: Optional[List[str]] = None,
+        idle_timeout: float = 55.0,
+        connections: int = 1,
+    ):
+        self.api = api
+        # 开播流程依次访问直播和登录相关的主机
+        self.hosts = hosts or [api.live_base, api.passport_base]
+        self.idle_timeout = idle_timeout
+        self.connections = connections
+        self.last_result: Dict[str, Optional[float]] = {}
+        # 当前线程的唤醒和停止标志，每次 start 新建，旧线程不会被新线程的标志影响
+        self._wake: Optional[threading.Event] = None
+        self._stopped: Optional[threading.Event] = None
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def running(self) -> bool:
+        return self._thread is not None
+
+    def warm(self, force: bool = False) -> Dict[str, Optional[float]]:
+        """预热空闲的主机（force时全部预热），返回各主机耗时"""
+        if force:
+            hosts = list(self.hosts)
+        else:
+            hosts = self.api.idle_hosts(self.hosts, self.idle_timeout)
+        if not hosts:
+            return {}
+        self.last_result = self.api.prewarm(hosts, self.connections)
+        return self.last_result
+
+    def start(self) -> None:
+        if self.running:
+            return
+        self._wake = threading.Event()
+        self._stopped = threading.Event()
+        self._thread = threading.Thread(
+            target=self._run,
+            args=(self._wake, self._stopped),
+            name="connection-warmer",
+            daemon=True,
+        )
+        self._thread.start()
+
+    def trigger(self) -> None:
+        """立即检查一次（如用户即将开播时）"""
+        wake = self._wake
+        if wake is not None:
+            wake.set()
+
+    def stop(self, wait: bool = True) -> None:
+        """停止后台线程；wait为False时不等待进行中的预热结束"""
+        if self._thread is None:
+            return
+        self._stopped.set()
+        self._wake.set()
+        if wait:
+            self._thread.join(timeout=2)
+        self._thread = None
+
+    def _run(self, wake: threading.Event, stopped: threading.Event) -> None:
+        force = True
+        while not stopped.is_set():
+            try:
+                self.warm(force)
+            except Exception:
+                pass  # 预热失败不影响正常请求，下个周期重试
+            force = False
+            wake.wait(self.idle_timeout / 2)
+            wake.clear()
@@ -0,0 +1 @@
+# devtools包初始化文件
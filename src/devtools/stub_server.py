@@ -0,0 +1,709 @@
+"""
+本地B站API模拟服务器，用于离线测试和基准测量
+
+实现项目用到的接口（二维码生成/轮询、分区列表、房间号查询、房间状态、开播、下播、改标题），
+支持配置延迟、注入错误和限制请求速率。
+
+用法:
+    python -m src.devtools.stub_server --port 8765 --latency 0.05
+    BILI_API_BASE_URL=http://127.0.0.1:8765 python -m src login
+"""
+
+import argparse
+import hashlib
+import itertools
+import json
+import random
+import threading
+import time
+import uuid
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, List, Optional, Tuple
+from urllib.parse import parse_qs, urlsplit
+
+# 接口名称
+EP_QRCODE_GENERATE = "qrcode_generate"
+EP_QRCODE_POLL = "qrcode_poll"
+EP_AREA_LIST = "area_list"
+EP_ROOM_ID_BY_UID = "room_id_by_uid"
+EP_START_LIVE = "start_live"
+EP_STOP_LIVE = "stop_live"
+EP_ROOM_UPDATE = "room_update"
+EP_ROOM_INFO = "room_info"
+EP_NAV = "nav"
+EP_COOKIE_INFO = "cookie_info"
+EP_CORRESPOND = "correspond"
+EP_COOKIE_REFRESH = "cookie_refresh"
+EP_CONFIRM_REFRESH = "confirm_refresh"
+
+ROUTES = {
+    ("GET", "/x/passport-login/web/qrcode/generate"): EP_QRCODE_GENERATE,
+    ("GET", "/x/passport-login/web/qrcode/poll"): EP_QRCODE_POLL,
+    ("GET", "/room/v1/Area/getList"): EP_AREA_LIST,
+    ("GET", "/room/v2/Room/room_id_by_uid"): EP_ROOM_ID_BY_UID,
+    ("POST", "/room/v1/Room/startLive"): EP_START_LIVE,
+    ("POST", "/room/v1/Room/stopLive"): EP_STOP_LIVE,
+    ("POST", "/room/v1/Room/update"): EP_ROOM_UPDATE,
+    ("GET", "/room/v1/Room/get_info"): EP_ROOM_INFO,
+    ("GET", "/x/web-interface/nav"): EP_NAV,
+    ("GET", "/x/passport-login/web/cookie/info"): EP_COOKIE_INFO,
+    ("POST", "/x/passport-login/web/cookie/refresh"): EP_COOKIE_REFRESH,
+    ("POST", "/x/passport-login/web/confirm/refresh"): EP_CONFIRM_REFRESH,
+}
+# 路径中带参数的接口按前缀匹配
+PREFIX_ROUTES = {("GET", "/correspond/1/"): EP_CORRESPOND}
+
+# 可注入的错误：名称 -> (HTTP状态码, 响应体)
+FAULT_PRESETS: Dict[str, Tuple[int, Optional[Dict]]] = {
+    "qr_expired": (200, {"code": 0, "data": {"code": 86038, "message": "二维码已失效"}}),
+    "qr_scanned": (200, {"code": 0, "data": {"code": 86090, "message": "二维码已扫码未确认"}}),
+    "identity_failed": (200, {"code": 60024, "message": "主播身份校验失败"}),
+    "not_logged_in": (200, {"code": -101, "message": "账号未登录"}),
+    "rate_limited": (412, {"code": -412, "message": "请求被拦截"}),
+    "server_error": (500, None),
+}
+
+_AREAS = [
+    (2, "网游", [(86, "英雄联盟", "yingxionglianmeng"), (88, "无畏契约", "wuweiqiyue")]),
+    (3, "手游", [(35, "王者荣耀", "wangzherongyao"), (321, "原神", "yuanshen")]),
+    (6, "单机游戏", [(235, "其他单机", "qitadanji"), (236, "主机游戏", "zhujiyouxi")]),
+    (9, "虚拟主播", [(371, "虚拟日常", "xunirichang")]),
+]
+
+
+class StubConfig:
+    """模拟服务器的行为配置，运行中修改立即生效"""
+
+    def __init__(
+        self,
+        latency: float = 0.0,
+        jitter: float = 0.0,
+        handshake_latency: float = 0.0,
+        keepalive_timeout: Optional[float] = None,
+        rate_limit: float = 0.0,
+        qr_scan_after: int = 2,
+        qr_confirm_after: int = 1,
+        qr_lifetime: float = 180.0,
+        session_lifetime: float = 15552000.0,
+        refresh_after: Optional[float] = None,
+        seed: Optional[int] = None,
+    ):
+        self.latency = latency  # 每个请求的基础延迟（秒）
+        self.jitter = jitter  # 延迟的随机增量上限（秒）
+        # 每个新连接第一次响应前的额外延迟，模拟DNS之外的TCP/TLS握手开销
+        self.handshake_latency = handshake_latency
+        self.keepalive_timeout = keepalive_timeout  # 空闲连接在多少秒后被关闭
+        self.endpoint_latency: Dict[str, float] = {}  # 按接口覆盖基础延迟
+        self.rate_limit = rate_limit  # 每秒最多处理的请求数，0表示不限制
+        self.qr_scan_after = qr_scan_after  # 第几次轮询时变为"已扫描"
+        self.qr_confirm_after = qr_confirm_after  # 扫描后再轮询几次确认登录
+        self.qr_lifetime = qr_lifetime
+        self.session_lifetime = session_lifetime  # 写入SESSDATA的有效期（秒）
+        self.refresh_after = refresh_after  # 登录多少秒后 cookie/info 要求刷新，None表示从不
+        self.fail_rate: Dict[str, float] = {}  # 按接口随机返回 server_error 的概率
+        self.rng = random.Random(seed)
+
+
+class _TokenBucket:
+    """令牌桶限流"""
+
+    def __init__(self):
+        self._tokens = 0.0
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self, rate: float) -> bool:
+        if rate <= 0:
+            return True
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(rate, self._tokens + (now - self._updated) * rate)
+            self._updated = now
+            if self._tokens >= 1:
+                self._tokens -= 1
+                return True
+            return False
+
+
+class StubState:
+    """模拟服务器的业务状态"""
+
+    def __init__(self, config: StubConfig):
+        self.config = config
+        self.lock = threading.Lock()
+        self.qrcodes: Dict[str, Dict] = {}
+        self.rooms: Dict[int, Dict] = {}
+        self.sessions: Dict[str, Dict] = {}  # SESSDATA -> 会话信息
+        self.uids = itertools.count(10001)  # 每次扫码登录分配新的UID
+        self.faults: Dict[str, List[str]] = {}
+        self.request_counts: Dict[str, int] = {}
+        self.rejected = 0
+        self.bucket = _TokenBucket()
+        self.areas_body = json.dumps(
+            {"code": 0, "msg": "success", "data": _build_areas()}, ensure_ascii=False
+        ).encode("utf-8")
+        self.areas_etag = '"%s"' % hashlib.md5(self.areas_body).hexdigest()
+
+    def inject(self, endpoint: str, fault: str, count: int = 1) -> None:
+        """让接口接下来的count次请求返回指定错误"""
+        if fault not in FAULT_PRESETS:
+            raise ValueError(f"未知的错误类型: {fault}")
+        with self.lock:
+            self.faults.setdefault(endpoint, []).extend([fault] * count)
+
+    def take_fault(self, endpoint: str) -> Optional[str]:
+        with self.lock:
+            queue = self.faults.get(endpoint)
+            if queue:
+                return queue.pop(0)
+        if self.config.rng.random() < self.config.fail_rate.get(endpoint, 0.0):
+            return "server_error"
+        return None
+
+    def new_session(self, uid: int) -> Tuple[List[Tuple[str, str]], Dict]:
+        """为UID签发一组新cookie，返回(cookie列表, 会话信息)"""
+        csrf = uuid.uuid4().hex
+        expires = int(time.time() + self.config.session_lifetime)
+        sessdata = f"stub{uuid.uuid4().hex}%2C{expires}"
+        session = {
+            "uid": uid,
+            "csrf": csrf,
+            "refresh_token": uuid.uuid4().hex,
+            "created": time.monotonic(),
+            "refresh_csrf": None,
+            "pending_confirm": None,  # 刷新后等待确认的旧SESSDATA
+        }
+        with self.lock:
+            self.sessions[sessdata] = session
+        cookies = [
+            ("SESSDATA", sessdata),
+            ("bili_jct", csrf),
+            ("DedeUserID", str(uid)),
+            ("DedeUserID__ckMd5", hashlib.md5(str(uid).encode()).hexdigest()[:16]),
+        ]
+        return cookies, session
+
+    def room(self, uid: int) -> Dict:
+        """每个UID对应一个房间，首次访问时创建"""
+        room_id = uid + 1000
+        return self.rooms.setdefault(
+            room_id, {"room_id": room_id, "uid": uid, "live": False, "title": ""}
+        )
+
+
+def _build_areas() -> List[Dict]:
+    return [
+        {
+            "id": theme_id,
+            "name": theme_name,
+            "list": [
+                {
+                    "id": str(area_id),
+                    "parent_id": str(theme_id),
+                    "name": name,
+                    "pinyin": pinyin,
+                }
+                for area_id, name, pinyin in areas
+            ],
+        }
+        for theme_id, theme_name, areas in _AREAS
+    ]
+
+
+class StubHandler(BaseHTTPRequestHandler):
+    """按路径分发请求"""
+
+    server_version = "BiliStub/1.0"
+    protocol_version = "HTTP/1.1"  # 支持keep-alive，与真实服务器一致
+    # 响应头和响应体分两次写出，关闭Nagle避免与客户端的延迟确认叠加出40ms停顿
+    disable_nagle_algorithm = True
+
+    @property
+    def state(self) -> StubState:
+        return self.server.state
+
+    def setup(self):
+        config = self.server.config
+        if config.keepalive_timeout:
+            self.timeout = config.keepalive_timeout
+        super().setup()
+        if config.handshake_latency > 0:
+            time.sleep(config.handshake_latency)
+
+    def log_message(self, format, *args):
+        if self.server.verbose:
+            super().log_message(format, *args)
+
+    def do_GET(self):
+        self._dispatch("GET")
+
+    def do_POST(self):
+        self._dispatch("POST")
+
+    def do_HEAD(self):
+        # 连接预热只需要一次往返，不分发到具体接口
+        counts = self.state.request_counts
+        with self.state.lock:
+            counts["head"] = counts.get("head", 0) + 1
+        self.send_response(200)
+        self.send_header("Content-Length", "0")
+        self.end_headers()
+
+    def _dispatch(self, method: str):
+        parts = urlsplit(self.path)
+        query = {k: v[0] for k, v in parse_qs(parts.query).items()}
+        form = {}
+        if method == "POST":
+            length = int(self.headers.get("Content-Length") or 0)
+            body = self.rfile.read(length).decode("utf-8")
+            form = {k: v[0] for k, v in parse_qs(body).items()}
+
+        endpoint = ROUTES.get((method, parts.path))
+        if endpoint is None:
+            for (route_method, prefix), name in PREFIX_ROUTES.items():
+                if method == route_method and parts.path.startswith(prefix):
+                    endpoint = name
+                    query["path"] = parts.path[len(prefix):]
+                    break
+        if endpoint is None:
+            self._send(404, {"code": -404, "message": "啥都木有"})
+            return
+
+        state = self.state
+        config = state.config
+        with state.lock:
+            state.request_counts[endpoint] = state.request_counts.get(endpoint, 0) + 1
+
+        if not state.bucket.acquire(config.rate_limit):
+            with state.lock:
+                state.rejected += 1
+            self._send(*FAULT_PRESETS["rate_limited"])
+            return
+
+        delay = config.endpoint_latency.get(endpoint, config.latency)
+        if config.jitter:
+            delay += config.rng.uniform(0, config.jitter)
+        if delay > 0:
+            time.sleep(delay)
+
+        fault = state.take_fault(endpoint)
+        if fault:
+            self._send(*FAULT_PRESETS[fault])
+            return
+
+        getattr(self, f"_handle_{endpoint}")(query, form)
+
+    def _send(
+        self,
+        status: int,
+        payload: Optional[Dict],
+        headers: Optional[List[Tuple[str, str]]] = None,
+        raw: Optional[bytes] = None,
+        content_type: str = "application/json; charset=utf-8",
+    ):
+        body = raw
+        if body is None:
+            body = b"" if payload is None else json.dumps(
+                payload, ensure_ascii=False
+            ).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        for name, value in headers or []:
+            self.send_header(name, value)
+        self.end_headers()
+        if body:
+            self.wfile.write(body)
+
+    def _cookies(self) -> Dict[str, str]:
+        cookies = {}
+        for item in (self.headers.get("Cookie") or "").split(";"):
+            key, _, value = item.strip().partition("=")
+            if key:
+                cookies[key] = value
+        return cookies
+
+    def _session(self) -> Tuple[Optional[str], Optional[Dict]]:
+        """按请求中的SESSDATA查找会话，返回(SESSDATA, 会话信息)"""
+        sessdata = self._cookies().get("SESSDATA", "")
+        with self.state.lock:
+            return sessdata, self.state.sessions.get(sessdata)
+
+    def _authorized_room(self, form: Dict) -> Optional[Dict]:
+        """校验cookie和csrf，返回房间状态"""
+        cookies = self._cookies()
+        uid = cookies.get("DedeUserID", "")
+        if not cookies.get("SESSDATA") or not uid.isdigit():
+            self._send(*FAULT_PRESETS["not_logged_in"])
+            return None
+        if form.get("csrf") != cookies.get("bili_jct"):
+            self._send(200, {"code": -111, "message": "csrf 校验失败"})
+            return None
+        room = self.state.room(int(uid))
+        if str(room["room_id"]) != form.get("room_id"):
+            self._send(*FAULT_PRESETS["identity_failed"])
+            return None
+        return room
+
+    def _handle_qrcode_generate(self, query: Dict, form: Dict):
+        key = uuid.uuid4().hex
+        with self.state.lock:
+            self.state.qrcodes[key] = {"created": time.monotonic(), "polls": 0}
+        host = self.headers.get("Host", "127.0.0.1")
+        self._send(
+            200,
+            {
+                "code": 0,
+                "data": {
+                    "url": f"http://{host}/qr/scan?qrcode_key={key}",
+                    "qrcode_key": key,
+                },
+            },
+        )
+
+    def _handle_qrcode_poll(self, query: Dict, form: Dict):
+        config = self.state.config
+        with self.state.lock:
+            qrcode = self.state.qrcodes.get(query.get("qrcode_key", ""))
+            if qrcode is not None:
+                qrcode["polls"] += 1
+                polls = qrcode["polls"]
+        if (
+            qrcode is None
+            or time.monotonic() - qrcode["created"] > config.qr_lifetime
+        ):
+            self._send(*FAULT_PRESETS["qr_expired"])
+            return
+        if polls < config.qr_scan_after:
+            self._send(
+                200, {"code": 0, "data": {"code": 86101, "message": "未扫码"}}
+            )
+            return
+        if polls < config.qr_scan_after + config.qr_confirm_after:
+            self._send(*FAULT_PRESETS["qr_scanned"])
+            return
+
+        # 二维码登录成功后即失效
+        with self.state.lock:
+            self.state.qrcodes.pop(query["qrcode_key"], None)
+            uid = next(self.state.uids)
+        cookies, session = self.state.new_session(uid)
+        self._send(
+            200,
+            {
+                "code": 0,
+                "data": {
+                    "code": 0,
+                    "message": "",
+                    "url": "",
+                    "refresh_token": session["refresh_token"],
+                },
+            },
+            # 不设置Domain，使cookie对本地地址有效
+            [("Set-Cookie", f"{name}={value}; Path=/") for name, value in cookies],
+        )
+
+    def _handle_area_list(self, query: Dict, form: Dict):
+        state = self.state
+        etag_header = [("ETag", state.areas_etag)]
+        if self.headers.get("If-None-Match") == state.areas_etag:
+            self._send(304, None, etag_header)
+            return
+        self._send(200, None, etag_header, raw=state.areas_body)
+
+    def _handle_room_id_by_uid(self, query: Dict, form: Dict):
+        uid = query.get("uid", "")
+        if not uid.isdigit():
+            self._send(200, {"code": -400, "message": "请求错误"})
+            return
+        room = self.state.room(int(uid))
+        self._send(200, {"code": 0, "data": {"room_id": room["room_id"]}})
+
+    def _handle_start_live(self, query: Dict, form: Dict):
+        room = self._authorized_room(form)
+        if room is None:
+            return
+        room["live"] = True
+        self._send(
+            200,
+            {
+                "code": 0,
+                "data": {
+                    "change": 1,
+                    "status": "LIVE",
+                    "rtmp": {
+                        "addr": "rtmp://127.0.0.1/live-stub/",
+                        "code": f"?streamname=live_{room['uid']}_{uuid.uuid4().hex[:8]}",
+                    },
+                },
+            },
+        )
+
+    def _handle_stop_live(self, query: Dict, form: Dict):
+        room = self._authorized_room(form)
+        if room is None:
+            return
+        changed = 1 if room["live"] else 0
+        room["live"] = False
+        self._send(200, {"code": 0, "data": {"change": changed, "status": "PREPARING"}})
+
+    def _handle_room_update(self, query: Dict, form: Dict):
+        room = self._authorized_room(form)
+        if room is None:
+            return
+        title = form.get("title", "")
+        if len(title) > 20:
+            self._send(200, {"code": 1, "message": "标题过长"})
+            return
+        room["title"] = title
+        self._send(200, {"code": 0, "data": []})
+
+    def _handle_room_info(self, query: Dict, form: Dict):
+        room_id = query.get("room_id", "")
+        room = self.state.rooms.get(int(room_id)) if room_id.isdigit() else None
+        if room is None:
+            self._send(200, {"code": 1, "message": "未找到该房间"})
+            return
+        self._send(
+            200,
+            {
+                "code": 0,
+                "data": {
+                    "room_id": room["room_id"],
+                    "uid": room["uid"],
+                    "live_status": 1 if room["live"] else 0,
+                    "title": room["title"],
+                },
+            },
+        )
+
+    def _handle_nav(self, query: Dict, form: Dict):
+        _, session = self._session()
+        if session is None:
+            self._send(
+                200,
+                {"code": -101, "message": "账号未登录", "data": {"isLogin": False}},
+            )
+            return
+        uid = session["uid"]
+        self._send(
+            200,
+            {"code": 0, "data": {"isLogin": True, "mid": uid, "uname": f"stub_{uid}"}},
+        )
+
+    def _handle_cookie_info(self, query: Dict, form: Dict):
+        _, session = self._session()
+        if session is None:
+            self._send(*FAULT_PRESETS["not_logged_in"])
+            return
+        refresh_after = self.state.config.refresh_after
+        refresh = (
+            refresh_after is not None
+            and time.monotonic() - session["created"] >= refresh_after
+        )
+        self._send(
+            200,
+            {
+                "code": 0,
+                "data": {"refresh": refresh, "timestamp": int(time.time() * 1000)},
+            },
+        )
+
+    def _handle_correspond(self, query: Dict, form: Dict):
+        # 没有私钥无法解密路径，只检查是否为合法长度的十六进制串
+        path = query.get("path", "")
+        _, session = self._session()
+        if session is None or len(path) != 256:
+            self._send(404, None, raw=b"<html>404</html>", content_type="text/html")
+            return
+        with self.state.lock:
+            session["refresh_csrf"] = uuid.uuid4().hex
+        html = f'<div id="1-name">{session["refresh_csrf"]}</div>'
+        self._send(
+            200, None, raw=html.encode("utf-8"), content_type="text/html; charset=utf-8"
+        )
+
+    def _handle_cookie_refresh(self, query: Dict, form: Dict):
+        sessdata, session = self._session()
+        if session is None:
+            self._send(*FAULT_PRESETS["not_logged_in"])
+            return
+        if form.get("csrf") != session["csrf"]:
+            self._send(200, {"code": -111, "message": "csrf 校验失败"})
+            return
+        refresh_csrf = session["refresh_csrf"]
+        if not refresh_csrf or form.get("refresh_csrf") != refresh_csrf:
+            self._send(200, {"code": 86095, "message": "refresh_csrf 错误"})
+            return
+        if form.get("refresh_token") != session["refresh_token"]:
+            self._send(200, {"code": 86095, "message": "refresh_token 错误"})
+            return
+
+        cookies, new_session = self.state.new_session(session["uid"])
+        with self.state.lock:
+            # 旧cookie立即失效，旧刷新令牌要等新cookie确认后才作废
+            self.state.sessions.pop(sessdata, None)
+            new_session["pending_confirm"] = session["refresh_token"]
+        self._send(
+            200,
+            {
+                "code": 0,
+                "message": "0",
+                "data": {
+                    "status": 0,
+                    "message": "",
+                    "refresh_token": new_session["refresh_token"],
+                },
+            },
+            [("Set-Cookie", f"{name}={value}; Path=/") for name, value in cookies],
+        )
+
+    def _handle_confirm_refresh(self, query: Dict, form: Dict):
+        _, session = self._session()
+        if session is None:
+            self._send(*FAULT_PRESETS["not_logged_in"])
+            return
+        if form.get("csrf") != session["csrf"]:
+            self._send(200, {"code": -111, "message": "csrf 校验失败"})
+            return
+        old_token = session["pending_confirm"]
+        if not old_token or form.get("refresh_token") != old_token:
+            self._send(200, {"code": -400, "message": "请求错误"})
+            return
+        with self.state.lock:
+            session["pending_confirm"] = None
+        self._send(200, {"code": 0, "message": "0"})
+
+
+class StubServer(ThreadingHTTPServer):
+    """可在后台线程运行的模拟服务器"""
+
+    daemon_threads = True
+
+    def __init__(
+        self,
+        host: str = "127.0.0.1",
+        port: int = 0,
+        config: Optional[StubConfig] = None,
+        verbose: bool = False,
+    ):
+        super().__init__((host, port), StubHandler)
+        self.config = config or StubConfig()
+        self.state = StubState(self.config)
+        self.verbose = verbose
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def base_url(self) -> str:
+        host, port = self.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def inject(self, endpoint: str, fault: str, count: int = 1) -> None:
+        self.state.inject(endpoint, fault, count)
+
+    def start(self) -> "StubServer":
+        """在后台线程中开始服务"""
+        self._thread = threading.Thread(
+            target=self.serve_forever, name="bili-stub", daemon=True
+        )
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self.shutdown()
+        self.server_close()
+        if self._thread is not None:
+            self._thread.join(timeout=2)
+
+    def __enter__(self) -> "StubServer":
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+
+def _parse_pairs(values: List[str]) -> List[Tuple[str, str]]:
+    pairs = []
+    for value in values:
+        key, sep, rest = value.partition("=")
+        if not sep:
+            raise argparse.ArgumentTypeError(f"格式应为 接口=值: {value}")
+        pairs.append((key, rest))
+    return pairs
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="本地B站API模拟服务器")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--latency", type=float, default=0.0, help="基础延迟（秒）")
+    parser.add_argument("--jitter", type=float, default=0.0, help="随机附加延迟上限（秒）")
+    parser.add_argument(
+        "--handshake-latency", type=float, default=0.0, help="每个新连接的握手延迟（秒）"
+    )
+    parser.add_argument(
+        "--keepalive-timeout", type=float, default=None, help="空闲连接关闭前的秒数"
+    )
+    parser.add_argument("--rate-limit", type=float, default=0.0, help="每秒请求数上限")
+    parser.add_argument("--qr-scan-after", type=int, default=2)
+    parser.add_argument("--qr-confirm-after", type=int, default=1)
+    parser.add_argument("--qr-lifetime", type=float, default=180.0)
+    parser.add_argument(
+        "--session-lifetime", type=float, default=15552000.0, help="SESSDATA有效期（秒）"
+    )
+    parser.add_argument(
+        "--refresh-after",
+        type=float,
+        default=None,
+        help="登录多少秒后要求刷新cookie，默认从不",
+    )
+    parser.add_argument(
+        "--fault",
+        action="append",
+        default=[],
+        metavar="接口=错误[:次数]",
+        help=f"注入错误，错误类型: {', '.join(FAULT_PRESETS)}",
+    )
+    parser.add_argument(
+        "--fail-rate",
+        action="append",
+        default=[],
+        metavar="接口=概率",
+        help="按概率返回HTTP 500",
+    )
+    parser.add_argument("--verbose", action="store_true", help="输出访问日志")
+    args = parser.parse_args(argv)
+
+    config = StubConfig(
+        latency=args.latency,
+        jitter=args.jitter,
+        handshake_latency=args.handshake_latency,
+        keepalive_timeout=args.keepalive_timeout,
+        rate_limit=args.rate_limit,
+        qr_scan_after=args.qr_scan_after,
+        qr_confirm_after=args.qr_confirm_after,
+        qr_lifetime=args.qr_lifetime,
+        session_lifetime=args.session_lifetime,
+        refresh_after=args.refresh_after,
+    )
+    for endpoint, rate in _parse_pairs(args.fail_rate):
+        config.fail_rate[endpoint] = float(rate)
+
+    server = StubServer(args.host, args.port, config, args.verbose)
+    for endpoint, spec in _parse_pairs(args.fault):
+        fault, _, count = spec.partition(":")
+        server.inject(endpoint, fault, int(count or 1))
+
+    print(f"模拟服务器已启动: {server.base_url}")
+    print(f"使用方式: BILI_API_BASE_URL={server.base_url} python -m src <命令>")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,191 @@
+"""
+多房间批量操作对话框
+"""
+
+from typing import List, Optional
+
+from PySide6.QtCore import Qt, Signal, Slot
+from PySide6.QtWidgets import (
+    QDialog,
+    QHBoxLayout,
+    QHeaderView,
+    QLabel,
+    QPushButton,
+    QSpinBox,
+    QTableWidget,
+    QTableWidgetItem,
+    QVBoxLayout,
+)
+
+from src.core.batch_controller import (
+    ACTION_START,
+    ACTION_STOP,
+    ACTION_TITLE,
+    BatchController,
+    RoomJob,
+    RoomResult,
+)
+from src.core.bilibili_api import BilibiliAPI
+from src.core.config_manager import ConfigManager
+from src.ui.workers import TaskRunner
+
+_ACTION_NAMES = {
+    ACTION_START: "批量开播",
+    ACTION_TITLE: "批量改标题",
+    ACTION_STOP: "批量下播",
+}
+
+
+class BatchDialog(QDialog):
+    """对保存的多个账号并发执行开播、改标题或下播"""
+
+    # 后台线程中每个房间完成时发出，由Qt排队转到界面线程
+    result_ready = Signal(object)
+
+    def __init__(
+        self,
+        api: BilibiliAPI,
+        config_manager: ConfigManager,
+        area_id: Optional[int],
+        title: str,
+        parent=None,
+    ):
+        super().__init__(parent)
+        self.api = api
+        self.config_manager = config_manager
+        self.area_id = area_id
+        self.title = title
+        self.setWindowTitle("批量操作")
+        self.resize(520, 400)
+
+        layout = QVBoxLayout(self)
+        area_text = f"分区ID {area_id}" if area_id is not None else "未选择分区"
+        layout.addWidget(QLabel(f"{area_text}，标题: {title or '（保持不变）'}"))
+
+        self.table = QTableWidget(0, 3)
+        self.table.setHorizontalHeaderLabels(["UID", "房间号", "结果"])
+        self.table.horizontalHeader().setSectionResizeMode(
+            2, QHeaderView.ResizeMode.Stretch
+        )
+        self.table.setEditTriggers(QTableWidget.EditTrigger.NoEditTriggers)
+        layout.addWidget(self.table)
+
+        control_layout = QHBoxLayout()
+        control_layout.addWidget(QLabel("并发数:"))
+        self.concurrency_spin = QSpinBox()
+        self.concurrency_spin.setRange(1, 32)
+        self.concurrency_spin.setValue(self.config_manager.get("batch_concurrency", 4))
+        control_layout.addWidget(self.concurrency_spin)
+        control_layout.addStretch()
+        self.action_buttons = []
+        for action, name in _ACTION_NAMES.items():
+            button = QPushButton(name)
+            button.clicked.connect(lambda _=False, a=action: self.run_action(a))
+            control_layout.addWidget(button)
+            self.action_buttons.append(button)
+        layout.addLayout(control_layout)
+
+        self.summary_label = QLabel("")
+        layout.addWidget(self.summary_label)
+
+        self.task_runner = TaskRunner(self)
+        self.task_runner.pending_changed.connect(self._on_pending_changed)
+        self.result_ready.connect(self._on_room_result)
+
+        self._rows = {}
+        self._load_accounts()
+
+    def _load_accounts(self):
+        """列出所有保存的账号，默认全部勾选"""
+        accounts = self.config_manager.list_accounts()
+        self.table.setRowCount(len(accounts))
+        for row, account in enumerate(accounts):
+            uid_item = QTableWidgetItem(str(account["uid"]))
+            uid_item.setFlags(uid_item.flags() | Qt.ItemFlag.ItemIsUserCheckable)
+            uid_item.setCheckState(Qt.CheckState.Checked)
+            self.table.setItem(row, 0, uid_item)
+            self.table.setItem(row, 1, QTableWidgetItem(str(account["room_id"])))
+            self.table.setItem(row, 2, QTableWidgetItem(""))
+            self._rows[account["room_id"]] = row
+        if not accounts:
+            self.summary_label.setText("没有保存的账号，请先登录")
+
+    def _selected_jobs(self) -> List[RoomJob]:
+        jobs = []
+        for room_id, row in self._rows.items():
+            if self.table.item(row, 0).checkState() != Qt.CheckState.Checked:
+                continue
+            login_data = self.config_manager.get_account_by_room(room_id)
+            if login_data:
+                jobs.append(
+                    RoomJob.from_login_data(login_data, self.area_id, self.title)
+                )
+        return jobs
+
+    def run_action(self, action: str):
+        """在后台对勾选的房间执行批量操作"""
+        jobs = self._selected_jobs()
+        if not jobs:
+            self.summary_label.setText("请至少勾选一个账号")
+            return
+        if action == ACTION_START and self.area_id is None:
+            self.summary_label.setText("请先在主窗口选择直播分区")
+            return
+        if action == ACTION_TITLE and not self.title:
+            self.summary_label.setText("请先在主窗口填写直播标题")
+            return
+
+        for job in jobs:
+            self.table.item(self._rows[job.room_id], 2).setText("进行中...")
+        concurrency = self.concurrency_spin.value()
+        self.config_manager.set("batch_concurrency", concurrency)
+        controller = BatchController(self.api, concurrency)
+        operation = {
+            ACTION_START: controller.start_all,
+            ACTION_TITLE: controller.retitle_all,
+            ACTION_STOP: controller.stop_all,
+        }[action]
+        self.task_runner.submit(
+            _ACTION_NAMES[action],
+            operation,
+            jobs,
+            on_result=self.result_ready.emit,
+            on_success=lambda results: self._on_batch_done(action, results),
+            on_error=lambda error: self.summary_label.setText(
+                f"批量操作出错: {error}"
+            ),
+        )
+
+    @Slot(object)
+    def _on_room_result(self, result: RoomResult):
+        text = "成功" if result.success else "失败"
+        if result.message:
+            text += f"：{result.message}"
+        if result.data and "rtmp" in result.data:
+            text += f"  推流码: {result.data['rtmp'].get('code')}"
+        self.table.item(self._rows[result.room_id], 2).setText(text)
+
+    def _on_batch_done(self, action: str, results: List[RoomResult]):
+        failed = 0
+        for result in results:
+            if not result.success:
+                failed += 1
+            elif action == ACTION_START:
+                self.config_manager.record_live_start(
+                    result.room_id, self.area_id, self.title
+                )
+            elif action == ACTION_STOP:
+                self.config_manager.record_live_stop(result.room_id)
+        self.summary_label.setText(
+            f"{_ACTION_NAMES[action]}完成：{len(results)} 个房间，失败 {failed} 个"
+        )
+
+    def _on_pending_changed(self, names: list):
+        busy = bool(names)
+        for button in self.action_buttons:
+            button.setEnabled(not busy)
+        self.concurrency_spin.setEnabled(not busy)
+
+    def done(self, result: int):
+        self.task_runner.discard_all()
+        super().done(result)
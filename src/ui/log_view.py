@@ -0,0 +1,114 @@
+"""
+日志显示控件：合并刷新、限制行数、按级别和关键字过滤
+"""
+
+import logging
+import threading
+from typing import List
+
+from PySide6.QtCore import QTimer, Signal, Slot
+from PySide6.QtGui import QTextCursor
+from PySide6.QtWidgets import (
+    QComboBox,
+    QHBoxLayout,
+    QLineEdit,
+    QPlainTextEdit,
+    QVBoxLayout,
+    QWidget,
+)
+
+from src.core.log_buffer import LEVEL_NAMES, LogEntry, LogStore
+
+
+class LogView(QWidget):
+    """显示 LogStore 中的日志
+
+    append 可在任意线程调用，只写入缓冲区；界面在合并定时器到期时一次性追加
+    这段时间内的所有新日志，文本框的行数上限与缓冲区容量一致。
+    """
+
+    FLUSH_INTERVAL_MS = 100
+
+    # 从空闲变为有待显示日志时发出一次，跨线程时由Qt排队转到界面线程
+    _flush_requested = Signal()
+
+    def __init__(self, store: LogStore, parent=None):
+        super().__init__(parent)
+        self.store = store
+        self._shown_seq = 0
+        self._pending = False
+        self._pending_lock = threading.Lock()
+
+        layout = QVBoxLayout(self)
+        layout.setContentsMargins(0, 0, 0, 0)
+        filter_layout = QHBoxLayout()
+        self.level_combo = QComboBox()
+        for level, name in LEVEL_NAMES.items():
+            self.level_combo.addItem(name, level)
+        self.level_combo.setCurrentIndex(self.level_combo.findData(logging.INFO))
+        self.level_combo.currentIndexChanged.connect(self._rebuild)
+        filter_layout.addWidget(self.level_combo)
+        self.filter_edit = QLineEdit()
+        self.filter_edit.setPlaceholderText("过滤日志")
+        self.filter_edit.setClearButtonEnabled(True)
+        self.filter_edit.textChanged.connect(self._rebuild)
+        filter_layout.addWidget(self.filter_edit)
+        layout.addLayout(filter_layout)
+
+        self.text_edit = QPlainTextEdit()
+        self.text_edit.setReadOnly(True)
+        self.text_edit.setMaximumBlockCount(store.buffer.capacity)
+        layout.addWidget(self.text_edit)
+
+        self._timer = QTimer(self)
+        self._timer.setSingleShot(True)
+        self._timer.setInterval(self.FLUSH_INTERVAL_MS)
+        self._timer.timeout.connect(self.flush)
+        self._flush_requested.connect(self._timer.start)
+
+    @property
+    def min_level(self) -> int:
+        return self.level_combo.currentData()
+
+    def append(self, message: str, level: int = logging.INFO) -> None:
+        """记录一条日志，界面稍后合并刷新"""
+        self.store.log(level, message)
+        with self._pending_lock:
+            if self._pending:
+                return
+            self._pending = True
+        self._flush_requested.emit()
+
+    @Slot()
+    def flush(self) -> None:
+        """把上次刷新后的新日志追加到文本框"""
+        with self._pending_lock:
+            self._pending = False
+        entries = self.store.buffer.since(self._shown_seq)
+        if not entries:
+            return
+        self._shown_seq = entries[-1].seq
+        lines = self._format(entries)
+        if lines:
+            self.text_edit.appendPlainText("\n".join(lines))
+
+    @Slot()
+    def _rebuild(self) -> None:
+        """过滤条件变化时按缓冲区内容重新生成"""
+        entries = self.store.buffer.entries()
+        self._shown_seq = entries[-1].seq if entries else self.store.buffer.last_seq
+        self.text_edit.setPlainText("\n".join(self._format(entries)))
+        self.text_edit.moveCursor(QTextCursor.MoveOperation.End)
+
+    def _format(self, entries: List[LogEntry]) -> List[str]:
+        min_level = self.min_level
+        text = self.filter_edit.text().lower()
+        return [
+            entry.format()
+            for entry in entries
+            if entry.level >= min_level and (not text or text in entry.message.lower())
+        ]
+
+    def clear(self) -> None:
+        self.store.buffer.clear()
+        self.text_edit.clear()
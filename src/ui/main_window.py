@@ -10,31 +10,65 @@ from PySide6.QtWidgets import (
     QLabel,
     QPushButton,
     QLineEdit,
-    QTextEdit,
     QComboBox,
     QMessageBox,
     QGroupBox,
     QDialog,
     QApplication,
     QGridLayout,
+    QCompleter,
 )
-from PySide6.QtCore import Qt, QTimer, Signal, Slot
-from PySide6.QtGui import QGuiApplication
+from PySide6.QtCore import Qt, QTimer, Signal, Slot, QStringListModel
+from PySide6.QtGui import QGuiApplication, QKeySequence, QShortcut
 from typing import Dict, Optional
+import logging
+import os
 import sys
 
+from src.core.api_metrics import APIMetrics
+from src.core.async_api import AsyncBilibiliAPI, EventLoopThread
 from src.core.bilibili_api import BilibiliAPI
-from src.core.config_manager import ConfigManager
+from src.core.config_manager import create_config_manager
+from src.core.credential import Credential
+from src.core.go_live import (
+    STATUS_SKIPPED,
+    STEP_ROLLBACK,
+    STEP_TITLE,
+    GoLivePipeline,
+    GoLiveResult,
+)
+from src.core.log_buffer import FileLogSink, LogStore
 from src.core.partition_manager import PartitionManager
-from src.utils.qr_generator import QRCodeGenerator
+from src.core.qr_login import (
+    STATE_EXPIRED,
+    STATE_FAILED,
+    STATE_PENDING,
+    STATE_SCANNED,
+    STATE_SUCCESS,
+    STATE_WAITING,
+    QRLoginScheduler,
+    QRLoginSession,
+)
+from src.core.session_validator import SESSION_INVALID, SessionStatus
+from src.core.warmup import ConnectionWarmer, DNSCache
+from src.ui.log_view import LogView
+from src.ui.session_watcher import SessionWatcher
+from src.ui.workers import TaskRunner
 
 
 class LoginDialog(QDialog):
     """登录对话框，显示二维码"""
 
-    login_successful = Signal(dict)
+    login_successful = Signal(object)  # Credential
+    # 调度器在后台线程回调，经信号排队转到界面线程
+    _session_updated = Signal(object)
 
-    def __init__(self, api: BilibiliAPI, parent=None):
+    def __init__(
+        self,
+        api: BilibiliAPI,
+        parent=None,
+        scheduler: Optional[QRLoginScheduler] = None,
+    ):
         super().__init__(parent)
         self.api = api
         self.setWindowTitle("扫码登录")
@@ -50,52 +84,62 @@ class LoginDialog(QDialog):
         self.status_label.setAlignment(Qt.AlignCenter)
         layout.addWidget(self.status_label)
 
-        self.qrcode_key = None
-        self.login_timer = QTimer(self)
-        self.login_timer.timeout.connect(self.check_login_status)
+        # 未传入共享调度器时使用自己的调度器，关闭时停止
+        self._owns_scheduler = scheduler is None
+        self.scheduler = scheduler or QRLoginScheduler(api)
+        self._shown_qrcode_key: Optional[str] = None
+        self._session_updated.connect(self._on_session_updated)
+        self.session = self.scheduler.start_session(self._session_updated.emit)
+
+    @Slot(object)
+    def _on_session_updated(self, session: QRLoginSession):
+        """根据登录会话状态更新二维码和提示"""
+        if session is not self.session:
+            return
 
-        self.load_qrcode()
+        if session.qrcode_key and session.qrcode_key != self._shown_qrcode_key:
+            # qrcode和PIL导入较慢，仅在需要显示二维码时才导入
+            from src.utils.qr_generator import QRCodeGenerator
 
-    def load_qrcode(self):
-        """加载并显示二维码"""
-        qr_data = self.api.get_qrcode_data()
-        if qr_data and "url" in qr_data and "qrcode_key" in qr_data:
-            self.qrcode_key = qr_data["qrcode_key"]
-            pixmap = QRCodeGenerator.generate_qr_pixmap(qr_data["url"], size=(200, 200))
+            pixmap = QRCodeGenerator.generate_qr_pixmap(session.url, size=(200, 200))
             if pixmap:
                 self.qr_label.setPixmap(pixmap)
-                self.login_timer.start(2000)  # 每2秒检查一次
+                self._shown_qrcode_key = session.qrcode_key
             else:
                 self.status_label.setText("生成二维码失败")
-        else:
-            self.status_label.setText("获取二维码数据失败")
-
-    def check_login_status(self):
-        """检查登录状态"""
-        if not self.qrcode_key:
-            return
-
-        status_code, cookies = self.api.check_qr_login(self.qrcode_key)
+                self.scheduler.cancel(session)
+                return
 
-        if status_code == 0 and cookies:
-            self.login_timer.stop()
+        if session.state == STATE_SUCCESS:
             self.status_label.setText("登录成功！")
-            self.login_successful.emit(cookies)
+            self.login_successful.emit(session.credential)
             self.accept()
-        elif status_code == 86038:  # 二维码已失效
-            self.login_timer.stop()
+        elif session.state == STATE_EXPIRED:
             self.status_label.setText("二维码已失效，请重新登录")
             self.qr_label.setText("二维码已失效")
-        elif status_code == 86090:  # 二维码已扫描，等待确认
+        elif session.state == STATE_FAILED:
+            self.status_label.setText(f"{session.error}，请重试")
+        elif session.failures:
+            self.status_label.setText(f"{session.error}，正在重试...")
+        elif session.state == STATE_SCANNED:
             self.status_label.setText("已扫描，请在手机上确认登录")
-        elif status_code == 86101:  # 未扫描
+        elif session.state == STATE_WAITING:
             self.status_label.setText("请使用B站APP扫描二维码")
-        elif status_code == -1:  # 请求错误
-            self.login_timer.stop()
-            self.status_label.setText("检查登录状态失败，请重试")
+        elif session.state == STATE_PENDING:
+            self.status_label.setText("二维码即将失效，正在刷新...")
+
+    def _stop_polling(self):
+        self.scheduler.cancel(self.session)
+        if self._owns_scheduler:
+            self.scheduler.stop()
+
+    def done(self, result):
+        # 关闭对话框时取消登录会话，丢弃尚未返回的请求结果
+        self._stop_polling()
+        super().done(result)
 
     def closeEvent(self, event):
-        self.login_timer.stop()
+        self._stop_polling()
         super().closeEvent(event)
 
 
@@ -108,19 +152,52 @@ class MainWindow(QMainWindow):
         self.setGeometry(100, 100, 600, 700)  # x, y, width, height
 
         self.api = BilibiliAPI()
-        self.config_manager = ConfigManager()
+        self.api_metrics = APIMetrics()
+        self.api.add_request_hook(self.api_metrics.record)
+        self.metrics_dialog = None
+        self.async_api = AsyncBilibiliAPI(self.api)
+        self.event_loop = EventLoopThread()
+        self.config_manager = create_config_manager()
         self.partition_manager = PartitionManager()
+        self.qr_scheduler: Optional[QRLoginScheduler] = None
+        # 登录后在后台预先解析域名并建立连接，开播时不再等待握手
+        self.dns_cache = DNSCache(
+            ttl=self.config_manager.get("dns_cache_ttl", 300)
+        ).mount(self.api.session)
+        self.connection_warmer = ConnectionWarmer(
+            self.api,
+            idle_timeout=self.config_manager.get("prewarm_idle_timeout", 55),
+        )
 
         self.room_id: Optional[int] = None
         self.csrf: Optional[str] = None
-        self.cookies: Optional[Dict[str, str]] = None
+        self.credential: Optional[Credential] = None
         self.live_started = False
         self.current_rtmp_addr: Optional[str] = None
         self.current_rtmp_code: Optional[str] = None
 
+        self.task_runner = TaskRunner(self)
+        self.task_runner.pending_changed.connect(self._on_pending_tasks_changed)
+
         self._init_ui()
         self._load_saved_data()
 
+        # 后台校验保存的登录状态，并在cookie临近过期时自动刷新
+        self.session_watcher = SessionWatcher(
+            self.api,
+            lambda: self.credential,
+            ttl=self.config_manager.get("session_check_ttl", 300),
+            interval=self.config_manager.get("session_check_interval", 1800),
+            parent=self,
+        )
+        self.session_watcher.status_changed.connect(self._on_session_status)
+        self.session_watcher.credential_refreshed.connect(
+            self._on_credential_refreshed
+        )
+        self.session_watcher.start()
+        # 开播流程复用后台校验的缓存结果
+        self.go_live = GoLivePipeline(self.api, self.session_watcher.validator)
+
     def _init_ui(self):
         """初始化UI组件"""
         central_widget = QWidget()
@@ -146,26 +223,40 @@ class MainWindow(QMainWindow):
         settings_group = QGroupBox("直播设置")
         settings_layout = QGridLayout()
 
-        settings_layout.addWidget(QLabel("直播分区主题:"), 0, 0)
+        settings_layout.addWidget(QLabel("搜索分区:"), 0, 0)
+        self.area_search_edit = QLineEdit()
+        self.area_search_edit.setPlaceholderText("输入分区名称、拼音或首字母，如 wzry")
+        self._area_search_results: Dict[str, Dict] = {}
+        self._area_search_model = QStringListModel(self)
+        self.area_search_completer = QCompleter(self._area_search_model, self)
+        self.area_search_completer.setCompletionMode(
+            QCompleter.CompletionMode.UnfilteredPopupCompletion
+        )
+        self.area_search_completer.activated[str].connect(self.select_searched_area)
+        self.area_search_edit.setCompleter(self.area_search_completer)
+        self.area_search_edit.textEdited.connect(self.search_areas)
+        settings_layout.addWidget(self.area_search_edit, 0, 1)
+
+        settings_layout.addWidget(QLabel("直播分区主题:"), 1, 0)
         self.area_theme_combo = QComboBox()
         self.area_theme_combo.addItems(self.partition_manager.get_all_themes())
         self.area_theme_combo.currentTextChanged.connect(self.update_area_combo)
-        settings_layout.addWidget(self.area_theme_combo, 0, 1)
+        settings_layout.addWidget(self.area_theme_combo, 1, 1)
 
-        settings_layout.addWidget(QLabel("直播分区:"), 1, 0)
+        settings_layout.addWidget(QLabel("直播分区:"), 2, 0)
         self.area_combo = QComboBox()
-        settings_layout.addWidget(self.area_combo, 1, 1)
+        settings_layout.addWidget(self.area_combo, 2, 1)
         self.update_area_combo(self.area_theme_combo.currentText())  # 初始化分区
 
-        settings_layout.addWidget(QLabel("直播标题:"), 2, 0)
+        settings_layout.addWidget(QLabel("直播标题:"), 3, 0)
         self.title_edit = QLineEdit()
         self.title_edit.setMaxLength(20)
         self.title_edit.setPlaceholderText("不超过20个字符，留空则保持现有标题不变")
-        settings_layout.addWidget(self.title_edit, 2, 1)
+        settings_layout.addWidget(self.title_edit, 3, 1)
 
         self.update_title_button = QPushButton("更新标题")
         self.update_title_button.clicked.connect(self.update_live_title)
-        settings_layout.addWidget(self.update_title_button, 2, 2)
+        settings_layout.addWidget(self.update_title_button, 3, 2)
 
         settings_group.setLayout(settings_layout)
         main_layout.addWidget(settings_group)
@@ -177,6 +268,9 @@ class MainWindow(QMainWindow):
         self.start_live_button.clicked.connect(self.toggle_live_stream)
         self.start_live_button.setEnabled(False)
         control_layout.addWidget(self.start_live_button)
+        self.batch_button = QPushButton("批量操作...")
+        self.batch_button.clicked.connect(self.show_batch_dialog)
+        control_layout.addWidget(self.batch_button)
         control_group.setLayout(control_layout)
         main_layout.addWidget(control_group)
 
@@ -208,31 +302,40 @@ class MainWindow(QMainWindow):
         # 5. 日志区域 (可选)
         log_group = QGroupBox("日志")
         log_layout = QVBoxLayout()
-        self.log_edit = QTextEdit()
-        self.log_edit.setReadOnly(True)
-        log_layout.addWidget(self.log_edit)
+        self.log_view = LogView(self._create_log_store())
+        log_layout.addWidget(self.log_view)
         log_group.setLayout(log_layout)
         main_layout.addWidget(log_group)
 
         main_layout.addStretch()
+
+        # 6. 状态栏显示进行中的后台任务
+        self.task_status_label = QLabel("空闲")
+        self.statusBar().addPermanentWidget(self.task_status_label)
+
+        # 调试用：Ctrl+Shift+M 打开请求统计面板
+        QShortcut(QKeySequence("Ctrl+Shift+M"), self, self.show_metrics_dialog)
+
         self._update_ui_state()
 
     def _load_saved_data(self):
         """加载保存的cookies和配置"""
         saved_login_info = self.config_manager.load_login_data()
         if saved_login_info:
-            try:
-                self.cookies = self.api.cookies_string_to_dict(
-                    saved_login_info["cookies"]
-                )
-                self.room_id = int(saved_login_info["room_id"])
-                self.csrf = saved_login_info["csrf"]
+            loaded = self.config_manager.load_credential()
+            if loaded is None:
+                self.log_message("加载保存的登录信息失败: 数据已损坏", logging.WARNING)
+                self.config_manager.clear_cookies()
+            elif loaded[1].is_expired():
+                self.log_message("保存的登录信息已过期，请重新登录。", logging.WARNING)
+                self.config_manager.clear_cookies()
+            else:
+                self.room_id, self.credential = loaded
+                self.csrf = self.credential.csrf or saved_login_info.get("csrf")
                 self.login_status_label.setText(f"已登录 (房间号: {self.room_id})")
                 self.log_message("成功加载保存的登录信息。")
-                self._on_login_success()
-            except Exception as e:
-                self.log_message(f"加载保存的登录信息失败: {e}")
-                self.config_manager.clear_cookies()
+                # 先用本地缓存显示窗口，窗口显示后再在后台刷新分区列表
+                QTimer.singleShot(0, self._on_login_success)
 
         # 加载上次窗口位置等配置
         geometry = self.config_manager.get("window_geometry")
@@ -264,19 +367,27 @@ class MainWindow(QMainWindow):
     def _update_ui_state(self):
         """根据登录和直播状态更新UI元素可用性"""
         logged_in = (
-            self.cookies is not None
+            self.credential is not None
             and self.room_id is not None
             and self.csrf is not None
         )
+        busy = self.task_runner.is_busy()
+
+        # 只在登录期间保持预热连接
+        if logged_in:
+            self.connection_warmer.start()
+        else:
+            self.connection_warmer.stop(wait=False)
 
-        self.login_button.setEnabled(not logged_in)
-        self.logout_button.setEnabled(logged_in)
+        self.login_button.setEnabled(not logged_in and not busy)
+        self.logout_button.setEnabled(logged_in and not busy)
 
+        self.area_search_edit.setEnabled(logged_in)
         self.area_theme_combo.setEnabled(logged_in)
         self.area_combo.setEnabled(logged_in)
         self.title_edit.setEnabled(logged_in)
-        self.update_title_button.setEnabled(logged_in)
-        self.start_live_button.setEnabled(logged_in)
+        self.update_title_button.setEnabled(logged_in and not busy)
+        self.start_live_button.setEnabled(logged_in and not busy)
 
         # 复制按钮仅在直播开始后可用
         stream_info_available = bool(
@@ -287,6 +398,7 @@ class MainWindow(QMainWindow):
 
         if self.live_started:
             self.start_live_button.setText("停止直播")
+            self.area_search_edit.setEnabled(False)
             self.area_theme_combo.setEnabled(False)
             self.area_combo.setEnabled(False)
             self.title_edit.setEnabled(False)
@@ -294,22 +406,55 @@ class MainWindow(QMainWindow):
         else:
             self.start_live_button.setText("开始直播")
             if logged_in:  # 只有登录后才能启用这些
+                self.area_search_edit.setEnabled(True)
                 self.area_theme_combo.setEnabled(True)
                 self.area_combo.setEnabled(True)
                 self.title_edit.setEnabled(True)
-                self.update_title_button.setEnabled(True)
+                self.update_title_button.setEnabled(not busy)
+
+    @Slot(list)
+    def _on_pending_tasks_changed(self, names: list):
+        """在状态栏显示进行中的任务，并在等待期间禁用相关按钮"""
+        if names:
+            self.task_status_label.setText("进行中: " + ", ".join(names))
+        else:
+            self.task_status_label.setText("空闲")
+        self._update_ui_state()
 
     def show_login_dialog(self):
         """显示登录对话框"""
-        dialog = LoginDialog(self.api, self)
+        if self.qr_scheduler is None:
+            self.qr_scheduler = QRLoginScheduler(self.api)
+        dialog = LoginDialog(self.api, self, self.qr_scheduler)
         dialog.login_successful.connect(self.handle_login_success)
         dialog.exec()
 
-    @Slot(dict)
-    def handle_login_success(self, cookies: Dict[str, str]):
+    @Slot(object)
+    def handle_login_success(self, credential: Credential):
         """处理登录成功逻辑"""
-        self.cookies = cookies
-        room_id, csrf = self.api.get_room_id_and_csrf(self.cookies)
+        self.credential = credential
+        # 房间信息和分区列表互不依赖，并发获取；分区缓存未过期时不下载
+        fetch_areas = not self._area_cache_fresh()
+        self.task_runner.submit(
+            "获取房间信息",
+            self.event_loop.run,
+            self.async_api.fetch_login_context(
+                self.credential,
+                self.partition_manager.cache_validators(),
+                fetch_areas,
+            ),
+            on_success=lambda result: self._on_room_info(*result),
+            on_error=lambda error: self._on_room_info((None, None), None),
+        )
+
+    def _area_cache_fresh(self) -> bool:
+        """本地分区缓存是否在有效期内（area_cache_ttl，单位秒，默认1天）"""
+        ttl = self.config_manager.get("area_cache_ttl", 24 * 60 * 60)
+        return self.partition_manager.is_cache_fresh(ttl)
+
+    def _on_room_info(self, room_info, area_result: Optional[tuple]):
+        """处理房间信息查询结果"""
+        room_id, csrf = room_info
 
         if room_id and csrf:
             self.room_id = int(room_id)
@@ -320,62 +465,88 @@ class MainWindow(QMainWindow):
             )
 
             if self.config_manager.get("auto_save_cookies", True):
-                cookie_str = self.api.cookies_dict_to_string(self.cookies)
-                self.config_manager.save_cookies(
-                    str(self.room_id), cookie_str, self.csrf
-                )
+                self.config_manager.save_credential(self.room_id, self.credential)
                 self.log_message("Cookies已保存.")
 
-            self._on_login_success()
+            if area_result is not None:
+                self._on_live_areas(area_result)
+            else:
+                self.log_message("直播分区列表缓存未过期，跳过更新。")
         else:
-            self.log_message("登录成功，但获取房间信息失败。请重试。")
+            self.log_message("登录成功，但获取房间信息失败。请重试。", logging.ERROR)
             QMessageBox.critical(
                 self, "登录失败", "无法获取房间信息，请重试或检查网络连接。"
             )
-            self.cookies = None  # 重置
+            self.credential = None  # 重置
 
         self._update_ui_state()
 
     def _on_login_success(self):
         """登录成功后的通用操作"""
         # 更新分区数据
-        if self.cookies:
-            self.log_message("正在更新直播分区列表...")
-            area_data = self.api.get_live_areas(self.cookies)
-            if area_data:
-                # 更新本地分区文件
-                try:
-                    self.partition_manager.update_partition_data(area_data)
-                    self.log_message("直播分区列表已更新并保存到本地文件")
-
-                    # 重新加载分区数据到UI
-                    current_theme = self.area_theme_combo.currentText()
-                    self.area_theme_combo.clear()
-                    self.area_theme_combo.addItems(
-                        self.partition_manager.get_all_themes()
-                    )
+        if self.credential:
+            if self._area_cache_fresh():
+                self.log_message("直播分区列表缓存未过期，跳过更新。")
+            else:
+                self.log_message("正在更新直播分区列表...")
+                self.task_runner.submit(
+                    "更新分区列表",
+                    self.api.fetch_live_areas,
+                    self.credential,
+                    self.partition_manager.cache_validators(),
+                    on_success=self._on_live_areas,
+                    on_error=lambda error: self._on_live_areas((-1, None, {})),
+                )
+        self._update_ui_state()
+
+    def _on_live_areas(self, area_result: tuple):
+        """处理分区列表下载结果"""
+        status_code, area_data, validators = area_result
+        if status_code == 304:
+            self.partition_manager.mark_cache_fresh(validators)
+            self.log_message("直播分区列表未变化，继续使用本地缓存。")
+        elif area_data and area_data.get("code") == 0:
+            # 更新本地分区文件
+            try:
+                changed = self.partition_manager.update_partition_data(
+                    area_data, validators
+                )
+                if not changed:
+                    self.log_message("直播分区列表未变化，继续使用本地缓存。")
+                    return
+                self.log_message("直播分区列表已更新并保存到本地文件")
+
+                # 重新加载分区数据到UI
+                current_theme = self.area_theme_combo.currentText()
+                current_area = self.area_combo.currentText()
+                self.area_theme_combo.clear()
+                self.area_theme_combo.addItems(
+                    self.partition_manager.get_all_themes()
+                )
 
-                    # 尝试恢复之前选择的主题，如果不存在则选择第一个
-                    if current_theme in self.partition_manager.get_all_themes():
-                        self.area_theme_combo.setCurrentText(current_theme)
-                    elif self.partition_manager.get_all_themes():
-                        self.area_theme_combo.setCurrentText(
-                            self.partition_manager.get_all_themes()[0]
-                        )
+                # 尝试恢复之前选择的主题，如果不存在则选择第一个
+                if current_theme in self.partition_manager.get_all_themes():
+                    self.area_theme_combo.setCurrentText(current_theme)
+                elif self.partition_manager.get_all_themes():
+                    self.area_theme_combo.setCurrentText(
+                        self.partition_manager.get_all_themes()[0]
+                    )
 
-                    # 更新分区列表
-                    self.update_area_combo(self.area_theme_combo.currentText())
+                # 更新分区列表，并尽量保持之前选择的分区
+                self.update_area_combo(self.area_theme_combo.currentText())
+                if current_area:
+                    self.area_combo.setCurrentText(current_area)
 
-                except Exception as e:
-                    self.log_message(f"更新分区数据失败: {e}")
-                    self.log_message("将继续使用本地缓存数据")
-            else:
-                self.log_message("获取直播分区列表失败。将使用本地缓存数据。")
+            except Exception as e:
+                self.log_message(f"更新分区数据失败: {e}", logging.WARNING)
+                self.log_message("将继续使用本地缓存数据")
+        else:
+            self.log_message("获取直播分区列表失败。将使用本地缓存数据。", logging.WARNING)
         self._update_ui_state()
 
     def logout(self):
         """处理登出逻辑"""
-        self.cookies = None
+        self.credential = None
         self.room_id = None
         self.csrf = None
         self.live_started = False
@@ -397,9 +568,31 @@ class MainWindow(QMainWindow):
             partitions = self.partition_manager.get_theme_partitions(theme_name)
             self.area_combo.addItems(partitions)
 
+    @Slot(str)
+    def search_areas(self, text: str):
+        """全局搜索分区并在下拉提示中显示结果"""
+        self._area_search_results = {}
+        for result in self.partition_manager.search_all(text.strip(), limit=20):
+            display = f"{result['name']}（{result['theme']}）"
+            self._area_search_results.setdefault(display, result)
+        self._area_search_model.setStringList(list(self._area_search_results))
+        if self._area_search_results:
+            self.area_search_completer.complete()
+
+    @Slot(str)
+    def select_searched_area(self, display: str):
+        """选中搜索结果后同时设置主题和分区下拉框"""
+        result = self._area_search_results.get(display)
+        if not result:
+            return
+        self.area_theme_combo.setCurrentText(result["theme"])
+        self.update_area_combo(result["theme"])
+        self.area_combo.setCurrentText(result["name"])
+        self.log_message(f"已选择分区: {result['theme']} / {result['name']}")
+
     def update_live_title(self):
         """更新直播标题"""
-        if not self.cookies or not self.room_id or not self.csrf:
+        if not self.credential or not self.room_id or not self.csrf:
             QMessageBox.warning(self, "错误", "请先登录！")
             return
 
@@ -412,42 +605,51 @@ class MainWindow(QMainWindow):
             QMessageBox.warning(self, "错误", "标题长度不能超过20个字符！")
             return
 
-        success = self.api.update_live_title(
-            self.room_id, new_title, self.csrf, self.cookies
+        self.task_runner.submit(
+            "更新标题",
+            self.api.update_live_title,
+            self.room_id,
+            new_title,
+            self.csrf,
+            self.credential,
+            on_success=lambda success: self._on_title_updated(success, new_title),
+            on_error=lambda error: self._on_title_updated(False, new_title, error),
         )
+
+    def _on_title_updated(self, success: bool, new_title: str, error: str = ""):
+        """处理标题更新结果，error 为请求超时等异常的说明"""
         if success:
             self.log_message(f"直播标题已更新为: {new_title}")
             # QMessageBox.information(self, "成功", "直播标题更新成功！")
             self.config_manager.set("last_title", new_title)  # 保存新标题
         else:
-            self.log_message("直播标题更新失败。")
+            detail = f"（{error}）" if error else ""
+            self.log_message(f"直播标题更新失败。{detail}", logging.ERROR)
             QMessageBox.warning(
-                self, "失败", "直播标题更新失败，请检查网络或稍后重试。"
+                self, "失败", f"直播标题更新失败{detail}，请检查网络或稍后重试。"
             )
 
     def toggle_live_stream(self):
         """开始或停止直播"""
-        if not self.cookies or not self.room_id or not self.csrf:
+        if not self.credential or not self.room_id or not self.csrf:
             QMessageBox.warning(self, "错误", "请先登录！")
             return
+        if self.credential.is_expired():
+            # 本地即可判断凭据失效，不再发出注定失败的请求
+            self._handle_expired_login("登录信息已过期（SESSDATA到期），请重新登录。")
+            return
 
         if self.live_started:
             # 停止直播
-            success = self.api.stop_live(self.room_id, self.csrf, self.cookies)
-            if success:
-                self.live_started = False
-                self.current_rtmp_addr = None
-                self.current_rtmp_code = None
-                self.rtmp_addr_label.setText("服务器地址: 未获取")
-                self.rtmp_code_label.setText("推流码: 未获取")
-                self.config_manager.clear_stream_code()
-                self.log_message("直播已停止。")
-                # QMessageBox.information(self, "成功", "直播已成功停止！")
-            else:
-                self.log_message("停止直播失败。")
-                QMessageBox.warning(
-                    self, "失败", "停止直播失败，请尝试手动停止或检查网络。"
-                )
+            self.task_runner.submit(
+                "停止直播",
+                self.api.stop_live,
+                self.room_id,
+                self.csrf,
+                self.credential,
+                on_success=self._on_live_stopped,
+                on_error=lambda error: self._on_live_stopped(False, error),
+            )
         else:
             # 开始直播
             selected_theme = self.area_theme_combo.currentText()
@@ -465,67 +667,175 @@ class MainWindow(QMainWindow):
                 )
                 return
 
-            # 更新标题（如果用户有输入）
             current_title = self.title_edit.text().strip()
-            if current_title:
-                title_success = self.api.update_live_title(
-                    self.room_id, current_title, self.csrf, self.cookies
-                )
-                if title_success:
-                    self.log_message(f"直播标题已设置为: {current_title}")
-                    self.config_manager.set("last_title", current_title)
-                else:
-                    self.log_message("设置直播标题失败，将使用B站默认或上次标题。")
-                    QMessageBox.warning(
-                        self,
-                        "标题设置失败",
-                        "尝试设置直播标题失败，将继续开始直播流程。",
-                    )
-
             self.log_message(
                 f"尝试在分区 {selected_area_name} (ID: {area_id}) 开始直播..."
             )
-            success, stream_data = self.api.start_live(
-                self.room_id, self.csrf, area_id, self.cookies
+            self.task_runner.submit(
+                "开始直播",
+                self.go_live.run,
+                self.room_id,
+                self.credential,
+                area_id,
+                current_title,
+                on_success=lambda result: self._on_live_started(
+                    current_title, result, area_id
+                ),
+                on_error=lambda error: self._on_live_started(
+                    current_title, None, area_id, error
+                ),
             )
 
-            if success and stream_data and "rtmp" in stream_data:
+        self._update_ui_state()
+
+    def show_batch_dialog(self):
+        """打开多房间批量操作对话框，使用当前选择的分区和标题"""
+        from src.ui.batch_dialog import BatchDialog
+
+        area_id = self.partition_manager.get_partition_by_name(
+            self.area_combo.currentText(), self.area_theme_combo.currentText()
+        )
+        dialog = BatchDialog(
+            self.api,
+            self.config_manager,
+            area_id,
+            self.title_edit.text().strip(),
+            self,
+        )
+        dialog.exec()
+
+    def show_metrics_dialog(self):
+        """打开请求统计面板（非模态，重复打开时复用）"""
+        if self.metrics_dialog is None:
+            from src.ui.metrics_dialog import MetricsDialog
+
+            self.metrics_dialog = MetricsDialog(self.api_metrics, self)
+        self.metrics_dialog.show()
+        self.metrics_dialog.raise_()
+
+    def _on_live_stopped(self, success: bool, error: str = ""):
+        """处理停止直播结果，error 为请求超时等异常的说明"""
+        if success:
+            self.live_started = False
+            self.current_rtmp_addr = None
+            self.current_rtmp_code = None
+            self.rtmp_addr_label.setText("服务器地址: 未获取")
+            self.rtmp_code_label.setText("推流码: 未获取")
+            self.config_manager.clear_stream_code()
+            self.config_manager.record_live_stop(self.room_id)
+            self.log_message("直播已停止。")
+            # QMessageBox.information(self, "成功", "直播已成功停止！")
+        else:
+            detail = f"（{error}）" if error else ""
+            self.log_message(f"停止直播失败。{detail}", logging.ERROR)
+            QMessageBox.warning(
+                self, "失败", f"停止直播失败{detail}，请尝试手动停止或检查网络。"
+            )
+        self._update_ui_state()
+
+    def _on_live_started(
+        self,
+        current_title: str,
+        result: Optional[GoLiveResult],
+        area_id: Optional[int],
+        error: str = "",
+    ):
+        """处理开播流程的结果，结束后只弹出一次提示"""
+        title_step = result.step(STEP_TITLE) if result else None
+        if title_step is not None and title_step.ok:
+            self.log_message(f"直播标题已设置为: {current_title}")
+            self.config_manager.set("last_title", current_title)
+        elif title_step is not None and title_step.status != STATUS_SKIPPED:
+            self.log_message(
+                f"设置直播标题失败（{title_step.message}），将使用B站默认或上次标题。",
+                logging.WARNING,
+            )
+
+        if result is not None and result.success:
+            self.live_started = True
+            addr = result.rtmp_addr
+            code = result.rtmp_code
+            self.current_rtmp_addr = addr
+            self.current_rtmp_code = code
+            self.rtmp_addr_label.setText(f"服务器地址: {addr}")
+            self.rtmp_code_label.setText(f"推流码: {code}")
+            self.config_manager.save_stream_code(addr, code)
+            self.config_manager.record_live_start(self.room_id, area_id, current_title)
+            self.log_message(
+                f"直播已开始！服务器: {addr}, 推流码: {code[:10]}..."
+                f"（耗时 {result.elapsed * 1000:.0f}ms）"
+            )
+            # QMessageBox.information(
+            #     self, "成功", "直播已成功开始！推流码已显示并保存。"
+            # )
+            self._save_current_settings()  # 保存当前分区和标题设置
+        else:
+            reason = result.message if result is not None else error
+            self.log_message(
+                f"开始直播失败: {reason or '未知错误'}。可能是Cookie失效或API错误。",
+                logging.ERROR,
+            )
+            if result is not None and result.failed_step is not None:
+                self.log_message(
+                    f"失败步骤: {result.failed_step}"
+                    + ("，已自动停止直播" if result.rolled_back else ""),
+                    logging.ERROR,
+                )
+            rollback = result.step(STEP_ROLLBACK) if result is not None else None
+            if rollback is not None and not rollback.ok:
+                self.log_message(rollback.message, logging.ERROR)
+            if result is not None and result.live_unknown:
+                # 开播请求超时且无法确认直播间状态，不能按普通失败提示；
+                # 按钮切换为“停止直播”，用户可以直接下播（下播请求可重复发送）
                 self.live_started = True
-                rtmp_info = stream_data["rtmp"]
-                addr = rtmp_info.get("addr")
-                code = rtmp_info.get("code")
-                self.current_rtmp_addr = addr
-                self.current_rtmp_code = code
-                self.rtmp_addr_label.setText(f"服务器地址: {addr}")
-                self.rtmp_code_label.setText(f"推流码: {code}")
-                self.config_manager.save_stream_code(addr, code)
-                self.log_message(f"直播已开始！服务器: {addr}, 推流码: {code[:10]}...")
-                # QMessageBox.information(
-                #     self, "成功", "直播已成功开始！推流码已显示并保存。"
-                # )
-                self._save_current_settings()  # 保存当前分区和标题设置
+                QMessageBox.warning(
+                    self,
+                    "直播状态未知",
+                    "开始直播的请求超时，已尝试自动停止直播，但无法确认直播间当前状态。\n"
+                    "请到B站直播中心检查是否仍在直播，如仍在直播请点击“停止直播”。",
+                )
+            # 尝试清除可能失效的cookies
+            elif result is not None and result.login_expired:
+                self._handle_expired_login("登录凭据可能已过期，请重新登录。")
             else:
-                self.log_message("开始直播失败。可能是Cookie失效或API错误。")
                 QMessageBox.critical(
                     self,
                     "失败",
                     "开始直播失败！请检查Cookie是否有效、网络连接或查看日志。",
                 )
-                # 尝试清除可能失效的cookies
-                if (
-                    stream_data
-                    and stream_data.get("message", "").find("主播身份校验失败") != -1
-                ):
-                    self.log_message(
-                        "检测到主播身份校验失败，可能Cookie已过期，正在清除本地Cookie..."
-                    )
-                    self.logout()  # 登出以清除
-                    QMessageBox.warning(
-                        self, "登录失效", "登录凭据可能已过期，请重新登录。"
-                    )
 
         self._update_ui_state()
 
+    @Slot(object, object)
+    def _on_session_status(self, credential: Credential, status: SessionStatus):
+        """后台校验结果：确认失效时提示重新登录"""
+        if credential is not self.credential or status.state != SESSION_INVALID:
+            return
+        if self.live_started:
+            # 直播进行中不打断推流，只提醒
+            self.log_message(
+                "登录已失效，当前直播不受影响，结束直播前请重新登录。", logging.WARNING
+            )
+            return
+        self._handle_expired_login("登录已失效，请重新登录。")
+
+    @Slot(object, object)
+    def _on_credential_refreshed(self, old: Credential, new: Credential):
+        """cookie已在后台刷新，替换当前凭据并保存"""
+        if old is not self.credential:
+            return
+        self.credential = new
+        self.csrf = new.csrf or self.csrf
+        if self.room_id and self.config_manager.get("auto_save_cookies", True):
+            self.config_manager.save_credential(self.room_id, new)
+        self.log_message("登录Cookie已自动刷新。")
+
+    def _handle_expired_login(self, message: str):
+        """凭据失效：清除本地登录信息并提示重新登录"""
+        self.log_message(f"{message}正在清除本地Cookie...", logging.WARNING)
+        self.logout()  # 登出以清除
+        QMessageBox.warning(self, "登录失效", message)
+
     def copy_server_address(self):
         """复制服务器地址到剪贴板"""
         if self.current_rtmp_addr:
@@ -546,10 +856,18 @@ class MainWindow(QMainWindow):
         else:
             QMessageBox.warning(self, "错误", "没有可复制的推流码！")
 
-    def log_message(self, message: str):
-        """在日志区域显示消息"""
-        self.log_edit.append(message)
-        QApplication.processEvents()  # 确保UI更新
+    def _create_log_store(self) -> LogStore:
+        """日志缓冲区，配置 log_to_file 为真时同时写入数据目录下的轮转日志文件"""
+        sink = None
+        if self.config_manager.get("log_to_file", False):
+            sink = FileLogSink(
+                os.path.join(self.config_manager.config_dir, "logs", "bililive.log")
+            )
+        return LogStore(self.config_manager.get("log_capacity", 2000), sink)
+
+    def log_message(self, message: str, level: int = logging.INFO):
+        """在日志区域显示消息（合并刷新，不阻塞当前操作）"""
+        self.log_view.append(message, level)
 
     def closeEvent(self, event):
         """处理窗口关闭事件，保存配置"""
@@ -558,8 +876,18 @@ class MainWindow(QMainWindow):
             "window_geometry", [self.x(), self.y(), self.width(), self.height()]
         )
         self._save_current_settings()
-        self.config_manager.save_config()  # 确保所有配置写入文件
+        self.config_manager.close()  # 确保所有配置写入文件
         self.log_message("配置已保存，应用程序即将关闭。")
+        self.session_watcher.stop()
+        self.connection_warmer.stop()
+        self.go_live.close()
+        self.task_runner.discard_all()
+        self.task_runner.wait_for_done()
+        self.event_loop.stop()
+        self.async_api.close()
+        if self.qr_scheduler is not None:
+            self.qr_scheduler.stop()
+        self.log_view.store.close()
         super().closeEvent(event)
 
 
@@ -0,0 +1,115 @@
+"""
+API请求指标调试面板
+"""
+
+from PySide6.QtCore import QTimer
+from PySide6.QtWidgets import (
+    QDialog,
+    QFileDialog,
+    QHBoxLayout,
+    QHeaderView,
+    QPlainTextEdit,
+    QPushButton,
+    QTableWidget,
+    QTableWidgetItem,
+    QVBoxLayout,
+)
+
+from src.core.api_metrics import APIMetrics
+
+_COLUMNS = ["接口", "请求", "失败", "重试", "P50(ms)", "P95(ms)", "最大(ms)", "接收(KB)", "业务码"]
+
+
+class MetricsDialog(QDialog):
+    """按接口展示请求耗时和错误统计，定时刷新"""
+
+    REFRESH_MS = 1000
+
+    def __init__(self, metrics: APIMetrics, parent=None):
+        super().__init__(parent)
+        self.metrics = metrics
+        self.setWindowTitle("请求统计")
+        self.resize(760, 420)
+
+        layout = QVBoxLayout(self)
+        self.table = QTableWidget(0, len(_COLUMNS))
+        self.table.setHorizontalHeaderLabels(_COLUMNS)
+        self.table.horizontalHeader().setSectionResizeMode(
+            len(_COLUMNS) - 1, QHeaderView.ResizeMode.Stretch
+        )
+        self.table.setEditTriggers(QTableWidget.EditTrigger.NoEditTriggers)
+        layout.addWidget(self.table)
+
+        self.recent_edit = QPlainTextEdit()
+        self.recent_edit.setReadOnly(True)
+        self.recent_edit.setMaximumBlockCount(200)
+        layout.addWidget(self.recent_edit)
+
+        button_layout = QHBoxLayout()
+        button_layout.addStretch()
+        for text, slot in (
+            ("导出JSON", lambda: self._export("JSON (*.json)", ".json")),
+            ("导出Prometheus", lambda: self._export("Prometheus (*.prom)", ".prom")),
+            ("清空", self._reset),
+        ):
+            button = QPushButton(text)
+            button.clicked.connect(slot)
+            button_layout.addWidget(button)
+        layout.addLayout(button_layout)
+
+        self.timer = QTimer(self)
+        self.timer.setInterval(self.REFRESH_MS)
+        self.timer.timeout.connect(self.refresh)
+        self.refresh()
+
+    def showEvent(self, event):
+        self.timer.start()
+        self.refresh()
+        super().showEvent(event)
+
+    def hideEvent(self, event):
+        # 面板隐藏时不刷新
+        self.timer.stop()
+        super().hideEvent(event)
+
+    def refresh(self):
+        snapshot = self.metrics.snapshot()
+        self.table.setRowCount(len(snapshot))
+        for row, (endpoint, stats) in enumerate(snapshot.items()):
+            latency = stats["latency"]
+            codes = ", ".join(f"{k}×{v}" for k, v in stats["api_codes"].items())
+            values = [
+                endpoint,
+                str(stats["requests"]),
+                str(stats["failures"]),
+                str(stats["retries"]),
+                f"{latency['p50'] * 1000:.0f}",
+                f"{latency['p95'] * 1000:.0f}",
+                f"{latency['max'] * 1000:.0f}",
+                f"{stats['bytes_received'] / 1024:.1f}",
+                codes,
+            ]
+            for column, value in enumerate(values):
+                self.table.setItem(row, column, QTableWidgetItem(value))
+
+        lines = []
+        for sample in reversed(self.metrics.recent()):
+            outcome = sample.error or f"HTTP {sample.status}"
+            if sample.api_code is not None:
+                outcome += f" code={sample.api_code}"
+            lines.append(
+                f"{sample.method} {sample.endpoint}  {outcome}  "
+                f"首字节 {sample.ttfb * 1000:.0f}ms  总计 {sample.total * 1000:.0f}ms"
+            )
+        self.recent_edit.setPlainText("\n".join(lines))
+
+    def _export(self, file_filter: str, suffix: str):
+        path, _ = QFileDialog.getSaveFileName(
+            self, "导出请求统计", f"api_metrics{suffix}", file_filter
+        )
+        if path:
+            self.metrics.export(path)
+
+    def _reset(self):
+        self.metrics.reset()
+        self.refresh()
@@ -0,0 +1,56 @@
+"""
+登录状态监视：在后台校验保存的凭据，把结果以信号形式送回界面线程
+"""
+
+from typing import Callable, Optional
+
+from PySide6.QtCore import QObject, Signal
+
+from src.core.bilibili_api import BilibiliAPI
+from src.core.credential import Credential
+from src.core.session_validator import SessionStatus, SessionValidator
+
+
+class SessionWatcher(QObject):
+    """SessionValidator 的Qt封装
+
+    校验和刷新在后台线程中进行，不阻塞界面；信号携带被检查的凭据，
+    槽函数据此忽略在检查期间已被替换（重新登录、退出）的旧凭据。
+    """
+
+    status_changed = Signal(object, object)  # (Credential, SessionStatus)
+    credential_refreshed = Signal(object, object)  # (旧Credential, 新Credential)
+
+    def __init__(
+        self,
+        api: BilibiliAPI,
+        get_credential: Callable[[], Optional[Credential]],
+        ttl: float = 300.0,
+        interval: float = 1800.0,
+        parent: Optional[QObject] = None,
+    ):
+        super().__init__(parent)
+        self._get_credential = get_credential
+        self.validator = SessionValidator(
+            api,
+            ttl=ttl,
+            interval=interval,
+            on_status=self._emit_status,
+            on_refreshed=self._emit_refreshed,
+        )
+
+    def start(self) -> None:
+        self.validator.start(self._get_credential)
+
+    def check_now(self) -> None:
+        """立即在后台检查一次"""
+        self.validator.trigger()
+
+    def stop(self) -> None:
+        self.validator.stop()
+
+    def _emit_status(self, credential: Credential, status: SessionStatus) -> None:
+        self.status_changed.emit(credential, status)
+
+    def _emit_refreshed(self, old: Credential, new: Credential) -> None:
+        self.credential_refreshed.emit(old, new)
@@ -0,0 +1,113 @@
+"""
+后台任务执行层，将阻塞的网络请求移出GUI线程
+"""
+
+from itertools import count
+from typing import Any, Callable, Dict, List, Optional
+
+from PySide6.QtCore import QObject, QRunnable, QThreadPool, Signal, Slot
+
+
+class TaskSignals(QObject):
+    """任务信号，在GUI线程中创建，跨线程投递结果"""
+
+    succeeded = Signal(int, object)
+    failed = Signal(int, str)
+
+
+class ApiTask(QRunnable):
+    """在线程池中执行的单个任务"""
+
+    def __init__(self, task_id: int, fn: Callable, args: tuple, kwargs: dict):
+        super().__init__()
+        self.task_id = task_id
+        self.fn = fn
+        self.args = args
+        self.kwargs = kwargs
+        self.signals = TaskSignals()
+
+    def run(self):
+        try:
+            result = self.fn(*self.args, **self.kwargs)
+        except Exception as e:
+            self.signals.failed.emit(self.task_id, str(e) or type(e).__name__)
+        else:
+            self.signals.succeeded.emit(self.task_id, result)
+
+
+class TaskRunner(QObject):
+    """任务调度器：提交任务、跟踪进行中的任务并在GUI线程回调结果"""
+
+    pending_changed = Signal(list)  # 进行中任务的名称列表
+
+    def __init__(
+        self, parent: Optional[QObject] = None, pool: Optional[QThreadPool] = None
+    ):
+        super().__init__(parent)
+        self.pool = pool or QThreadPool.globalInstance()
+        self._ids = count(1)
+        self._pending: Dict[int, Dict[str, Any]] = {}
+
+    def submit(
+        self,
+        name: str,
+        fn: Callable,
+        *args,
+        on_success: Optional[Callable[[Any], None]] = None,
+        on_error: Optional[Callable[[str], None]] = None,
+        **kwargs,
+    ) -> int:
+        """提交任务，返回任务ID；回调总是在GUI线程中执行"""
+        task_id = next(self._ids)
+        task = ApiTask(task_id, fn, args, kwargs)
+        task.signals.succeeded.connect(self._on_succeeded)
+        task.signals.failed.connect(self._on_failed)
+        # 保存信号对象的引用，避免任务结束前被回收
+        self._pending[task_id] = {
+            "name": name,
+            "signals": task.signals,
+            "on_success": on_success,
+            "on_error": on_error,
+        }
+        self.pool.start(task)
+        self.pending_changed.emit(self.pending_names())
+        return task_id
+
+    def pending_names(self) -> List[str]:
+        """获取进行中任务的名称"""
+        return [entry["name"] for entry in self._pending.values()]
+
+    def is_pending(self, name: str) -> bool:
+        """检查指定名称的任务是否仍在进行"""
+        return name in self.pending_names()
+
+    def is_busy(self) -> bool:
+        """是否有任务正在进行"""
+        return bool(self._pending)
+
+    def discard_all(self) -> None:
+        """丢弃所有进行中任务的回调（任务本身会在后台自然结束）"""
+        self._pending.clear()
+        self.pending_changed.emit([])
+
+    def wait_for_done(self, msecs: int = 3000) -> bool:
+        """等待线程池中的任务结束"""
+        return self.pool.waitForDone(msecs)
+
+    def _pop(self, task_id: int) -> Optional[Dict[str, Any]]:
+        entry = self._pending.pop(task_id, None)
+        if entry is not None:
+            self.pending_changed.emit(self.pending_names())
+        return entry
+
+    @Slot(int, object)
+    def _on_succeeded(self, task_id: int, result: Any):
+        entry = self._pop(task_id)
+        if entry and entry["on_success"]:
+            entry["on_success"](result)
+
+    @Slot(int, str)
+    def _on_failed(self, task_id: int, error: str):
+        entry = self._pop(task_id)
+        if entry and entry["on_error"]:
+            entry["on_error"](error)
@@ -3,48 +3,171 @@
 """
 
 import qrcode
-import io
-from PySide6.QtGui import QPixmap
-from PySide6.QtCore import QByteArray
+import os
+import sys
+from functools import lru_cache
+from typing import TYPE_CHECKING, List, Optional, TextIO, Tuple
 
+if TYPE_CHECKING:
+    from PySide6.QtGui import QImage, QPixmap
 
-class QRCodeGenerator:
-    """二维码生成器"""
+# 二维码四周的空白模块数（规范要求至少4个）
+QR_BORDER = 4
 
-    @staticmethod
-    def generate_qr_pixmap(url: str, size: tuple = (200, 200)) -> QPixmap:
-        """生成二维码QPixmap用于Qt显示"""
-        # 创建二维码实例
-        qr = qrcode.QRCode(
-            version=1,
-            error_correction=qrcode.constants.ERROR_CORRECT_L,
-            box_size=10,
-            border=4,
+# 终端显示时使用较窄的边框，手机扫码通常仍可识别
+TERMINAL_BORDER = 2
+
+_WHITE = 0
+_BLACK = 1
+
+# 上下两个模块是否着色 -> 字符，下标为 上*2 + 下
+_HALF_BLOCKS = (" ", "▄", "▀", "█")
+# 黑字白底，不依赖终端配色
+_ANSI_COLORS = "\x1b[30;107m"
+_ANSI_RESET = "\x1b[0m"
+
+
+def qr_matrix(url: str, border: int = QR_BORDER) -> List[List[bool]]:
+    """生成二维码模块矩阵（含空白边框），True表示黑色模块"""
+    qr = qrcode.QRCode(
+        version=1,
+        error_correction=qrcode.constants.ERROR_CORRECT_L,
+        border=border,
+    )
+    qr.add_data(url)
+    qr.make(fit=True)
+    return qr.get_matrix()
+
+
+@lru_cache(maxsize=32)
+def _render_qr_image(url: str, width: int, height: int) -> "QImage":
+    """把模块矩阵直接写入8位索引色QImage，按整数倍放大并居中"""
+    from PySide6.QtGui import QImage
+
+    matrix = qr_matrix(url)
+    modules = len(matrix)
+    scale = max(1, min(width, height) // modules)
+    width, height = max(width, modules * scale), max(height, modules * scale)
+    left = (width - modules * scale) // 2
+    top = (height - modules * scale) // 2
+
+    # 每行按4字节对齐
+    stride = (width + 3) & ~3
+    blank_row = bytes(stride)
+    right_pad = bytes(stride - left - modules * scale)
+    black, white = bytes([_BLACK]) * scale, bytes([_WHITE]) * scale
+
+    rows = [blank_row] * top
+    for module_row in matrix:
+        row = b"".join(
+            [bytes(left), *(black if dark else white for dark in module_row), right_pad]
+        )
+        rows.extend([row] * scale)
+    rows.extend([blank_row] * (height - len(rows)))
+
+    buffer = b"".join(rows)
+    image = QImage(buffer, width, height, stride, QImage.Format.Format_Indexed8)
+    image.setColorTable([0xFFFFFFFF, 0xFF000000])
+    # QImage不持有外部缓冲区，复制一份使图像独立于buffer的生命周期
+    return image.copy()
+
+
+def render_halfblock(
+    matrix: List[List[bool]], invert: bool = False, ansi: bool = False
+) -> str:
+    """把模块矩阵渲染为半块字符，每个字符表示上下两行模块
+
+    默认用字符前景色画黑色模块（适合浅色背景）；invert 时改画白色模块，
+    适合深色背景的终端；ansi 时显式设置黑字白底，与终端配色无关。
+    """
+    ink = not invert or ansi
+    lines = []
+    for y in range(0, len(matrix), 2):
+        top = matrix[y]
+        bottom = matrix[y + 1] if y + 1 < len(matrix) else [False] * len(top)
+        line = "".join(
+            _HALF_BLOCKS[((upper == ink) << 1) | (lower == ink)]
+            for upper, lower in zip(top, bottom)
+        )
+        if ansi:
+            line = f"{_ANSI_COLORS}{line}{_ANSI_RESET}"
+        lines.append(line)
+    return "\n".join(lines) + "\n"
+
+
+class TerminalQRRenderer:
+    """在终端中显示二维码和一行状态，刷新二维码时原地重绘
+
+    输出不是终端（如重定向到文件）时退化为追加输出。
+    """
+
+    def __init__(
+        self,
+        stream: Optional[TextIO] = None,
+        border: int = TERMINAL_BORDER,
+        ansi: Optional[bool] = None,
+        invert: bool = False,
+    ):
+        self.stream = stream or sys.stdout
+        self.border = border
+        self.interactive = self.stream.isatty()
+        if ansi is None:
+            ansi = self.interactive and "NO_COLOR" not in os.environ
+        self.ansi = ansi
+        self.invert = invert
+        self._lines = 0  # 上一次绘制占用的行数（含状态行）
+
+    def render(self, url: str) -> str:
+        return render_halfblock(
+            qr_matrix(url, self.border), invert=self.invert, ansi=self.ansi
         )
-        qr.add_data(url)
-        qr.make(fit=True)
 
-        # 生成PIL图像
-        img = qr.make_image(fill_color="black", back_color="white")
+    def draw(self, url: str, status: str = "") -> None:
+        """绘制二维码和状态行，覆盖上一次绘制的内容"""
+        parts = []
+        if self.interactive and self._lines:
+            # 光标上移到上次绘制的起点并清除到屏幕末尾
+            parts.append(f"\x1b[{self._lines}F\x1b[J")
+        text = self.render(url)
+        parts.append(text)
+        parts.append(status + "\n")
+        self.stream.write("".join(parts))
+        self.stream.flush()
+        self._lines = text.count("\n") + 1
 
-        # 转换为字节流
-        byte_array = QByteArray()
-        buffer = io.BytesIO()
-        img.save(buffer, format="PNG")
-        byte_array.append(buffer.getvalue())
+    def set_status(self, status: str) -> None:
+        """更新状态行"""
+        if self.interactive and self._lines:
+            self.stream.write(f"\x1b[1F\x1b[K{status}\n")
+        else:
+            self.stream.write(status + "\n")
+        self.stream.flush()
 
-        # 创建QPixmap
-        pixmap = QPixmap()
-        pixmap.loadFromData(byte_array, "PNG")
 
-        # 缩放到指定大小
-        return pixmap.scaled(size[0], size[1])
+class QRCodeGenerator:
+    """二维码生成器"""
+
+    @staticmethod
+    def generate_qr_image(
+        url: str, size: Tuple[int, int] = (200, 200)
+    ) -> "QImage":
+        """生成二维码QImage，相同URL和尺寸的结果会被缓存"""
+        return _render_qr_image(url, size[0], size[1])
+
+    @staticmethod
+    def generate_qr_pixmap(url: str, size: tuple = (200, 200)) -> "QPixmap":
+        """生成二维码QPixmap用于Qt显示"""
+        # Qt仅在图形界面中需要，命令行模式下不导入
+        from PySide6.QtGui import QPixmap
+
+        return QPixmap.fromImage(_render_qr_image(url, size[0], size[1]))
 
     @staticmethod
-    def generate_qr_ascii(url: str) -> str:
-        """生成ASCII二维码字符串"""
-        output = io.StringIO()
-        qr = qrcode.QRCode()
-        qr.add_data(url)
-        qr.print_ascii(out=output, tty=False, invert=False)
-        return output.getvalue()
+    def generate_qr_ascii(
+        url: str,
+        border: int = TERMINAL_BORDER,
+        invert: bool = False,
+        ansi: bool = False,
+    ) -> str:
+        """生成终端显示用的二维码字符串（半块字符，每个字符两行模块）"""
+        return render_halfblock(qr_matrix(url, border), invert=invert, ansi=ansi)